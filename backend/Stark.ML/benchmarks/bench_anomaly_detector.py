@@ -0,0 +1,53 @@
+import time
+import argparse
+import numpy as np
+from ..models.anomaly_detection.real_time_anomaly_detector import RealTimeAnomalyDetector
+
+TARGET_EVENTS_PER_SECOND = 100_000
+
+def _stream(events: int, width: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(events, width)) * rng.uniform(0.5, 5, size=width)
+    outliers = rng.choice(events, size=events // 1000, replace=False)
+    X[outliers, :width // 4] += 10
+    return X
+
+def _report(name: str, events: int, elapsed: float, detector: RealTimeAnomalyDetector):
+    rate = events / elapsed
+    verdict = 'meets' if rate >= TARGET_EVENTS_PER_SECOND else 'below'
+    print(f"{name:<28} {rate:12,.0f} events/s  {1e6 / rate:6.2f} us/event  "
+          f"({verdict} {TARGET_EVENTS_PER_SECOND:,}/s; {detector.get_stats()['anomalies']} flagged)")
+
+def bench_detect_anomalies(X: np.ndarray, micro_batch: int):
+    """The service path: micro-batches of vectors through detect_anomalies"""
+    detector = RealTimeAnomalyDetector(n_features=X.shape[1])
+    detector.partial_fit(X[:detector.warmup_events])
+    stream = list(X)
+    start = time.perf_counter()
+    for i in range(0, len(stream), micro_batch):
+        detector.detect_anomalies(stream[i:i + micro_batch])
+    _report(f"detect_anomalies (batch {micro_batch})", len(X), time.perf_counter() - start, detector)
+
+def bench_score_event(X: np.ndarray):
+    """One event at a time, scoring and updating the state per event"""
+    detector = RealTimeAnomalyDetector(n_features=X.shape[1])
+    detector.partial_fit(X[:detector.warmup_events])
+    start = time.perf_counter()
+    for row in X:
+        detector.score_event(row)
+    _report('score_event', len(X), time.perf_counter() - start, detector)
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming throughput of RealTimeAnomalyDetector')
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--width', type=int, default=128)
+    parser.add_argument('--micro-batches', type=int, nargs='+', default=[64, 256])
+    args = parser.parse_args()
+    
+    X = _stream(args.events, args.width)
+    for micro_batch in args.micro_batches:
+        bench_detect_anomalies(X, micro_batch)
+    bench_score_event(X)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import time
+import argparse
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from ..models.deep_learning.boosting import boosting_summary, build_boosting_stage, compile_boosting_stage
+
+def _dataset(rows: int, width: int, seed: int = 0):
+    """Dense rows shaped like HybridThreatModel's flattened sequence + 768-dim text embedding"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, width)).astype(np.float32)
+    signal = X[:, :16] @ rng.normal(size=16) + 0.5 * X[:, -8:].sum(axis=1)
+    y = (signal + rng.normal(scale=2.0, size=rows)) > 1.0
+    return X, y.astype(int)
+
+def _predict_timings(name: str, model, X_test, batch_sizes, single_rows: int):
+    timings = []
+    for row in X_test[:single_rows]:
+        start = time.perf_counter()
+        model.predict_proba(row[np.newaxis])
+        timings.append(time.perf_counter() - start)
+    single = np.array(timings) * 1000
+    
+    throughput = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(X_test), batch_size):
+            model.predict_proba(X_test[i:i + batch_size])
+        throughput[batch_size] = len(X_test) / (time.perf_counter() - start)
+    
+    print(f"{name:<20} single row p50 {np.percentile(single, 50):.3f}ms p99 {np.percentile(single, 99):.3f}ms")
+    for batch_size, rate in throughput.items():
+        print(f"{'':<20} predict_proba batch {batch_size:<5} {rate:12,.0f} rows/s")
+
+def _bench(kind: str, X_train, y_train, X_test, y_test, batch_sizes, single_rows: int):
+    model = build_boosting_stage(kind)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+    
+    auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    summary = boosting_summary(model)
+    print(f"{kind:<20} train {train_seconds:7.2f}s ({summary['rounds']} rounds)  AUC {auc:.3f}")
+    _predict_timings(kind, model, X_test, batch_sizes, single_rows)
+    
+    compiled = compile_boosting_stage(model)
+    if compiled is not None:
+        np.testing.assert_allclose(compiled.predict_proba(X_test[:8]), model.predict_proba(X_test[:8]), atol=1e-9)
+        _predict_timings(f"{kind} (compiled)", compiled, X_test, batch_sizes, single_rows)
+
+def main():
+    parser = argparse.ArgumentParser(description='Train time and predict latency/throughput of the boosting stages')
+    parser.add_argument('--rows', type=int, default=6000)
+    parser.add_argument('--width', type=int, default=128 + 768, help='flattened sequence + text embedding width')
+    parser.add_argument('--kinds', nargs='+', default=['hist', 'gradient_boosting'])
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 64, 1024])
+    parser.add_argument('--single-rows', type=int, default=200)
+    args = parser.parse_args()
+    
+    X, y = _dataset(args.rows, args.width)
+    split = int(len(X) * 0.8)
+    for kind in args.kinds:
+        _bench(kind, X[:split], y[:split], X[split:], y[split:], args.batch_sizes, args.single_rows)
+
+if __name__ == '__main__':
+    main()
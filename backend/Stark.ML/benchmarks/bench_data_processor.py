@@ -0,0 +1,47 @@
+import time
+import argparse
+import numpy as np
+from ..preprocessing.data_processor import DataProcessor
+
+def _events(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    event_types = ['login', 'logout', 'file_access', 'port_scan']
+    base = np.datetime64('2024-01-01T00:00:00')
+    return [
+        {
+            'user_id': f"user_{int(rng.integers(0, 50))}",
+            'ip_address': f"10.0.0.{int(rng.integers(1, 255))}",
+            'bytes_sent': float(rng.exponential(1000)),
+            'port': int(rng.integers(1, 65535)),
+            'event_type': event_types[i % len(event_types)],
+            'timestamp': str(base + np.timedelta64(int(i * 7), 's'))
+        }
+        for i in range(n)
+    ]
+
+def _per_event(processor: DataProcessor, events, use_plan: bool) -> float:
+    start = time.perf_counter()
+    for event in events:
+        processor.process_security_data(event, use_plan=use_plan)
+    return (time.perf_counter() - start) / len(events)
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-event latency of DataProcessor: DataFrame path vs compiled plan')
+    parser.add_argument('--fit-events', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=2000)
+    args = parser.parse_args()
+    
+    processor = DataProcessor().fit(_events(args.fit_events))
+    events = _events(args.events, seed=1)
+    
+    # Warm both paths before timing
+    _per_event(processor, events[:50], use_plan=False)
+    _per_event(processor, events[:50], use_plan=True)
+    
+    frame = _per_event(processor, events, use_plan=False)
+    plan = _per_event(processor, events, use_plan=True)
+    print(f"DataFrame path: {frame * 1e6:,.1f} us/event")
+    print(f"compiled plan:  {plan * 1e6:,.1f} us/event ({frame / plan:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import time
+import argparse
+import numpy as np
+from ..utils.helpers import generate_event_id, generate_event_ids, validate_input_batch, validate_input_data
+
+def _events(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    event_types = ['login', 'logout', 'file_access', 'port_scan']
+    return [
+        {
+            'timestamp': f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+            'source_ip': f"10.0.{i % 256}.{int(rng.integers(1, 255))}",
+            'event_type': event_types[i % len(event_types)],
+            'user_id': f"user_{i % 500}",
+            'port': int(rng.integers(1, 65535)),
+            'bytes_sent': float(rng.exponential(1000))
+        }
+        for i in range(n)
+    ]
+
+def _rate(fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of input validation and event id generation')
+    parser.add_argument('--events', type=int, default=100_000)
+    args = parser.parse_args()
+    
+    events = _events(args.events)
+    n = len(events)
+    cases = [
+        ('validate_input_data loop', lambda: [validate_input_data(event) for event in events]),
+        ('validate_input_batch', lambda: validate_input_batch(events)),
+        ('generate_event_id sha256', lambda: [generate_event_id(event, algorithm='sha256') for event in events]),
+        ('generate_event_ids blake2b', lambda: generate_event_ids(events))
+    ]
+    try:
+        import xxhash  # noqa: F401
+        cases.append(('generate_event_ids xxh3', lambda: generate_event_ids(events, algorithm='xxh3')))
+    except ImportError:
+        pass
+    
+    for name, fn in cases:
+        print(f"{name:<28} {_rate(fn, n):>12,.0f} events/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import numpy as np
+from ..models.threat_detection.advanced_threat_analyzer import AdvancedThreatAnalyzer
+from ..models.inference.backends import BACKENDS, ThreatClassifierGraph, create_backend, compare_backends
+
+SAMPLE_TEXTS = [
+    'Failed login for user admin from IP 203.0.113.7',
+    'Multiple failed SSH authentication attempts detected on host db-01',
+    'Outbound connection to known command and control domain blocked',
+    'User downloaded 4GB from the finance share outside business hours',
+    'Port scan detected from internal host 10.0.4.12 against 1024 ports',
+    'Privilege escalation attempt via sudo misconfiguration',
+    'New scheduled task created by unsigned binary in temp directory',
+    'Suspicious PowerShell command with encoded payload executed'
+]
+
+def _encode(analyzer: AdvancedThreatAnalyzer, batch_size: int):
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(batch_size)]
+    encoded = analyzer.tokenizer(texts, padding=True, truncation=True, max_length=512, return_tensors='np')
+    return encoded['input_ids'], encoded['attention_mask']
+
+def main():
+    parser = argparse.ArgumentParser(description='Parity and latency of CPU inference backends against eager PyTorch')
+    parser.add_argument('--backends', nargs='+', default=[b for b in BACKENDS if b != 'torch'])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 32])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+    
+    analyzer = AdvancedThreatAnalyzer(backend='torch')
+    graph = ThreatClassifierGraph(analyzer.bert_model, analyzer.threat_classifier)
+    reference = create_backend('torch', graph, 'advanced_threat_analyzer')
+    
+    for name in args.backends:
+        candidate = create_backend(name, graph, 'advanced_threat_analyzer')
+        for batch_size in args.batch_sizes:
+            input_ids, attention_mask = _encode(analyzer, batch_size)
+            report = compare_backends(reference, candidate, input_ids, attention_mask, args.repeats)
+            print(f"[{name} batch={batch_size}] " + ", ".join(f"{k}={v:.4g}" for k, v in report.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import time
+import argparse
+import numpy as np
+from ..models.deep_learning.neural_threat_detector import NeuralThreatDetector
+from ..models.deep_learning.hybrid_threat_model import HybridThreatModel
+from ..models.inference.keras_serving import CompiledPredictor
+
+def _latencies(fn, inputs, warmup: int = 5) -> np.ndarray:
+    for x in inputs[:warmup]:
+        fn(x)
+    timings = []
+    for x in inputs:
+        start = time.perf_counter()
+        fn(x)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+def _report(name: str, model, iterations: int, timesteps: int):
+    rng = np.random.default_rng(0)
+    inputs = [rng.random((1, timesteps, 128), dtype=np.float32) for _ in range(iterations)]
+    
+    predictor = CompiledPredictor(model, (None, 128))
+    predictor.warmup(timesteps)
+    
+    np.testing.assert_allclose(predictor(inputs[0]), model.predict(inputs[0], verbose=0), rtol=1e-5, atol=1e-6)
+    
+    baseline = _latencies(lambda x: model.predict(x, verbose=0), inputs)
+    compiled = _latencies(predictor, inputs)
+    for label, timings in (('model.predict', baseline), ('compiled', compiled)):
+        print(f"{name:24s} {label:14s} p50={np.percentile(timings, 50):.2f}ms "
+              f"p99={np.percentile(timings, 99):.2f}ms")
+    print(f"{name:24s} serving stats: {predictor.get_stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-event latency of model.predict vs compiled serving functions')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--timesteps', type=int, default=16)
+    args = parser.parse_args()
+    
+    _report('NeuralThreatDetector', NeuralThreatDetector().model, args.iterations, args.timesteps)
+    _report('HybridThreatModel.deep', HybridThreatModel().deep_model, args.iterations, args.timesteps)
+
+if __name__ == '__main__':
+    main()
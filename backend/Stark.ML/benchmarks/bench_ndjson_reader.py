@@ -0,0 +1,49 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+from ..utils.helpers import parse_log_entry
+from ..utils.ndjson_reader import NDJSONReader
+
+def _write_log(path: str, lines: int):
+    event_types = ['login', 'logout', 'file_access', 'port_scan']
+    with open(path, 'w') as f:
+        for i in range(lines):
+            f.write(json.dumps({
+                'timestamp': f"2024-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                'source_ip': f"10.0.{i % 256}.{i % 199}",
+                'user_id': f"user_{i % 1000}",
+                'event_type': event_types[i % 4],
+                'port': i % 65535,
+                'bytes_sent': i * 1.5
+            }) + '\n')
+
+def main():
+    parser = argparse.ArgumentParser(description='NDJSON ingestion: line-by-line parse_log_entry vs block reader')
+    parser.add_argument('--lines', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events.ndjson')
+        _write_log(path, args.lines)
+        size_mb = os.path.getsize(path) / 1e6
+        
+        for name, parse in [('json.loads per line', json.loads), ('parse_log_entry per line', parse_log_entry)]:
+            start = time.perf_counter()
+            with open(path) as f:
+                events = [parse(line) for line in f]
+            elapsed = time.perf_counter() - start
+            print(f"{name:<26} {size_mb / elapsed:7.1f} MB/s ({len(events) / elapsed:,.0f} lines/s)")
+        
+        for workers in sorted({0, args.workers}):
+            reader = NDJSONReader(path, workers=workers)
+            start = time.perf_counter()
+            for _ in reader:
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"NDJSONReader workers={workers:<6} {size_mb / elapsed:7.1f} MB/s ({reader.rows / elapsed:,.0f} lines/s)")
+
+if __name__ == '__main__':
+    main()
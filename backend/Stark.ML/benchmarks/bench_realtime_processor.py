@@ -0,0 +1,65 @@
+import time
+import argparse
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from ..preprocessing.real_time_processor import RealTimeProcessor
+from ..preprocessing.streaming_scaler import StreamingScaler
+
+def _events(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    event_types = ['login', 'logout', 'file_access', 'port_scan']
+    base = np.datetime64('2024-01-01T00:00:00')
+    return [
+        {
+            'bytes_sent': float(rng.exponential(1000)),
+            'port': int(rng.integers(1, 65535)),
+            'event_type': event_types[i % len(event_types)],
+            'timestamp': str(base + np.timedelta64(int(i * 7), 's'))
+        }
+        for i in range(n)
+    ]
+
+def bench_scaling(batches: int, batch_size: int, width: int):
+    rng = np.random.default_rng(1)
+    data = [rng.normal(size=(batch_size, width)) for _ in range(batches)]
+    
+    start = time.perf_counter()
+    for batch in data:
+        StandardScaler().fit_transform(batch)
+    refit = time.perf_counter() - start
+    
+    scaler = StreamingScaler(warmup_samples=batch_size * 10)
+    buffer = np.empty((batch_size, width), dtype=np.float32)
+    start = time.perf_counter()
+    for batch in data:
+        if not scaler.frozen:
+            scaler.partial_fit(batch)
+        scaler.transform(batch, out=buffer)
+    streaming = time.perf_counter() - start
+    
+    rows = batches * batch_size
+    print(f"scaling refit per batch:   {rows / refit:,.0f} rows/s")
+    print(f"scaling streaming/frozen:  {rows / streaming:,.0f} rows/s ({refit / streaming:.1f}x)")
+
+def bench_batch_path(events: int):
+    processor = RealTimeProcessor()
+    data = _events(events)
+    start = time.perf_counter()
+    for batch in processor._create_batches(data):
+        processor._process_batch(batch)
+    elapsed = time.perf_counter() - start
+    print(f"_process_batch end to end: {events / elapsed:,.0f} events/s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of RealTimeProcessor scaling and batch path')
+    parser.add_argument('--batches', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--width', type=int, default=64)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+    
+    bench_scaling(args.batches, args.batch_size, args.width)
+    bench_batch_path(args.events)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+import argparse
+import numpy as np
+from ..services.ml_integration_service import MLIntegrationService
+
+def _make_event(i: int):
+    return {
+        'sequence_data': np.random.rand(1, 10, 128),
+        'description': f'Failed login for user user{i % 50} from IP 10.0.0.{i % 255}'
+    }
+
+async def _heartbeat(interval: float, lags: list, stop: asyncio.Event):
+    # Measures how late the loop wakes us up; a blocked loop shows up as lag
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run_benchmark(service: MLIntegrationService, requests: int, concurrency: int) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(0.001, lags, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await service.analyze_security_event(_make_event(i))
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    
+    lags_ms = np.array(lags) * 1000
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'throughput_rps': requests / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies_ms, 50)),
+        'latency_p99_ms': float(np.percentile(latencies_ms, 99)),
+        'loop_lag_p50_ms': float(np.percentile(lags_ms, 50)) if len(lags_ms) else 0.0,
+        'loop_lag_max_ms': float(lags_ms.max()) if len(lags_ms) else 0.0,
+        'batcher': service.batcher.get_stats()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Event loop responsiveness under concurrent analysis load')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+    
+    service = MLIntegrationService(args.max_batch_size, args.max_latency_ms)
+    try:
+        result = asyncio.run(run_benchmark(service, args.requests, args.concurrency))
+    finally:
+        service.shutdown()
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == '__main__':
+    main()
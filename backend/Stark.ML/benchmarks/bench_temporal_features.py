@@ -0,0 +1,87 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from ..preprocessing.temporal_features import (
+    DATA_PROCESSOR_FIELDS, FEATURE_ENGINEER_FIELDS, REAL_TIME_FIELDS, temporal_features
+)
+
+# The per-preprocessor implementations this module replaced, kept for comparison
+
+def legacy_data_processor(values):
+    timestamps = pd.to_datetime(values)
+    return np.column_stack([
+        timestamps.dt.hour,
+        timestamps.dt.dayofweek,
+        timestamps.dt.day,
+        timestamps.dt.month,
+        timestamps.dt.quarter,
+        timestamps.dt.year,
+        timestamps.dt.minute / 60.0
+    ])
+
+def legacy_feature_engineer(values):
+    timestamps = pd.to_datetime(values)
+    return np.column_stack([
+        timestamps.dt.hour,
+        timestamps.dt.dayofweek,
+        timestamps.dt.day,
+        timestamps.dt.month,
+        timestamps.dt.quarter,
+        timestamps.dt.year,
+        timestamps.dt.minute / 60.0,
+        timestamps.dt.second / 3600.0,
+        ((timestamps.dt.hour >= 9) & (timestamps.dt.hour < 17)).astype(int),
+        (timestamps.dt.dayofweek >= 5).astype(int)
+    ])
+
+def legacy_real_time(values):
+    timestamps = pd.to_datetime(values)
+    return np.column_stack([
+        timestamps.dt.hour,
+        timestamps.dt.dayofweek,
+        timestamps.dt.day,
+        timestamps.dt.month,
+        timestamps.dt.quarter
+    ])
+
+def _timestamps(n: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(1_600_000_000, 1_800_000_000, n)
+    return pd.Series(pd.to_datetime(seconds, unit='s').strftime('%Y-%m-%dT%H:%M:%S'))
+
+def _best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Timestamp feature extraction: per-preprocessor pandas vs shared module')
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    values = _timestamps(args.rows)
+    small = values.iloc[:args.batch_size].reset_index(drop=True)
+    cases = [
+        ('DataProcessor', legacy_data_processor, DATA_PROCESSOR_FIELDS),
+        ('SecurityFeatureEngineer', legacy_feature_engineer, FEATURE_ENGINEER_FIELDS),
+        ('RealTimeProcessor', legacy_real_time, REAL_TIME_FIELDS)
+    ]
+    for name, legacy, fields in cases:
+        buffer = np.empty((len(values), len(fields)))
+        old = _best_of(lambda: legacy(values), args.repeats)
+        new = _best_of(lambda: temporal_features(values, fields, out=buffer), args.repeats)
+        print(f"{name:<24} {args.rows} rows: {old * 1e3:8.1f} ms -> {new * 1e3:8.1f} ms ({old / new:.1f}x)")
+        
+        buffer = np.empty((len(small), len(fields)))
+        old = _best_of(lambda: [legacy(small) for _ in range(100)], args.repeats) / 100
+        new = _best_of(lambda: [temporal_features(small, fields, out=buffer) for _ in range(100)], args.repeats) / 100
+        print(f"{'':<24} batch of {args.batch_size}: {old * 1e6:8.1f} us -> {new * 1e6:8.1f} us ({old / new:.1f}x)")
+
+if __name__ == '__main__':
+    main()
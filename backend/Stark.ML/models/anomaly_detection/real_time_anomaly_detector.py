@@ -1,89 +1,297 @@
-import tensorflow as tf
+import math
+import logging
+import threading
 import numpy as np
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
-from sklearn.preprocessing import StandardScaler
-
-class BehavioralAnalyzer:
-    def __init__(self):
-        self.sequence_model = self._build_sequence_model()
-        self.pattern_detector = self._build_pattern_detector()
-        self.scaler = StandardScaler()
-        
-    def _build_sequence_model(self):
-        model = tf.keras.Sequential([
-            Bidirectional(LSTM(256, return_sequences=True, input_shape=(None, 128))),
-            Dropout(0.4),
-            Bidirectional(LSTM(128, return_sequences=True)),
-            Dropout(0.3),
-            Bidirectional(LSTM(64)),
-            Dense(128, activation='relu'),
-            Dropout(0.3),
-            Dense(64, activation='relu'),
-            Dense(32, activation='relu'),
-            Dense(1, activation='sigmoid')
-        ])
-        
-        model.compile(
-            optimizer=tf.keras.optimizers.Adam(1e-4),
-            loss='binary_crossentropy',
-            metrics=['accuracy']
-        )
-        
-        return model
-    
-    def _build_pattern_detector(self):
-        return tf.keras.Sequential([
-            Dense(128, activation='relu', input_shape=(128,)),
-            Dropout(0.3),
-            Dense(64, activation='relu'),
-            Dense(32, activation='relu'),
-            Dense(16, activation='softmax')
-        ])
-
-    def analyze_behavior(self, user_data, historical_patterns):
+from scipy.special import log_ndtr
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ..model_store import ModelStore
+
+LN10 = math.log(10)
+
+
+class RealTimeAnomalyDetector:
+    """
+    Streaming anomaly detector for fixed-width event vectors (128 features
+    by default).
+
+    The detector keeps an exponentially weighted mean and variance per
+    feature, forgetting with a time constant of about `window` events, and
+    scores every event by its squared z-scores against that state before
+    folding it in. Each squared z-score is clipped at clip_z ** 2 so a
+    single wild feature (or a feature that has been constant so far) cannot
+    dominate the score. The clipped sum is close to chi-square with one
+    degree of freedom per feature for in-distribution events; its upper
+    tail probability, via the Wilson-Hilferty approximation, gives the
+    event's surprise, and events with tail probability below threshold are
+    anomalies. By default anomalies are not folded into the state so an
+    attack does not become the baseline.
+
+    State is O(n_features) and independent of stream length; scoring and
+    updating an event is O(n_features). The first warmup_events events only
+    build the baseline and are never flagged.
+    """
+
+    MODEL_NAME = 'real_time_anomaly_detector'
+
+    def __init__(self, n_features: int = 128, window: int = 10000, warmup_events: int = 256,
+                 threshold: float = 1e-4, clip_z: float = 6.0, update_on_anomaly: bool = False,
+                 batch_size: int = 256, model_store: Optional[ModelStore] = None):
+        if not 0 < threshold < 1:
+            raise ValueError("threshold must be a probability between 0 and 1")
+        self.logger = logging.getLogger(__name__)
+        self.model_store = model_store or ModelStore()
+        self.n_features = n_features
+        self.window = window
+        self.warmup_events = warmup_events
+        self.threshold = threshold
+        self.clip_z = clip_z
+        self.update_on_anomaly = update_on_anomaly
+        self.batch_size = batch_size
+        self._threshold_surprise = -math.log10(threshold)
+        self._decay = 1.0 - 1.0 / window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the baseline"""
+        self.n_seen = 0
+        self.n_anomalies = 0
+        self.weight = 0.0
+        self.mean = np.zeros(self.n_features)
+        self.m2 = np.zeros(self.n_features)
+        self._inv_var = np.ones(self.n_features)
+
+    @property
+    def warmed_up(self) -> bool:
+        return self.n_seen >= self.warmup_events
+
+    def detect_anomalies(self, stream: Sequence[Any]) -> List[Dict[str, Any]]:
         """
-        Analyzes user behavior patterns for anomalies
+        Score and learn from a sequence of events, in order. Items are
+        vectors or event dicts carrying 'feature_vector' or 'sequence_data'
+        (the last step is scored); events without either are passed over
+        with a zero score. Events are scored batch_size at a time, each
+        batch against the state left by the previous one. Results of events
+        that were not scored, during warm-up or for lack of a vector, carry
+        scored=False and confidence 0.
         """
-        # Normalize data
-        normalized_data = self.scaler.fit_transform(user_data)
-        
-        # Sequence analysis
-        sequence_score = self.sequence_model.predict(normalized_data)
-        
-        # Pattern analysis
-        pattern_analysis = self.pattern_detector.predict(normalized_data)
-        
-        # Compare with historical patterns
-        deviation_score = self._calculate_pattern_deviation(
-            pattern_analysis, 
-            historical_patterns
-        )
-        
+        try:
+            X, present = self._as_matrix(stream)
+            scores = np.zeros(len(stream))
+            distances = np.zeros(len(stream))
+            flags = np.zeros(len(stream), dtype=bool)
+            scored = np.zeros(len(stream), dtype=bool)
+            rows = np.flatnonzero(present)
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                scores[batch], flags[batch], distances[batch], scored[batch] = self._score_and_update(X[batch])
+            return self._build_results(scores, flags, distances, scored)
+        except Exception as e:
+            self.logger.error(f"Error detecting anomalies: {str(e)}")
+            raise
+
+    def score_event(self, vector) -> Dict[str, Any]:
+        """Score one event against the current state and fold it in"""
+        x = np.asarray(vector, dtype=np.float64).reshape(-1)
+        self._check_width(len(x))
+        with self._lock:
+            delta = x - self.mean
+            squared = delta * delta
+            if not self.warmed_up:
+                self._update_one(delta, squared)
+                return {'is_anomaly': False, 'anomaly_score': 0.0, 'confidence': 0.0, 'distance': 0.0,
+                        'scored': False}
+
+            z = squared * self._inv_var
+            np.minimum(z, self.clip_z * self.clip_z, out=z)
+            distance = float(z.sum()) / self.n_features
+            surprise = float(self._surprise(distance))
+            is_anomaly = surprise >= self._threshold_surprise
+            self.n_anomalies += is_anomaly
+            if self.update_on_anomaly or not is_anomaly:
+                self._update_one(delta, squared)
+            else:
+                self.n_seen += 1
+        score = self._score(surprise)
+        return {'is_anomaly': is_anomaly, 'anomaly_score': score, 'confidence': abs(score - 0.5) * 2,
+                'distance': distance, 'scored': True}
+
+    def score_batch(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        """(anomaly_score, is_anomaly) arrays for the rows of X, scored against the current state without updating it"""
+        X = np.asarray(X, dtype=np.float64)
+        self._check_width(X.shape[1])
+        with self._lock:
+            if not self.warmed_up:
+                return np.zeros(len(X)), np.zeros(len(X), dtype=bool)
+            surprise = self._surprise(self._distances(X))
+        return self._score(surprise), surprise >= self._threshold_surprise
+
+    def partial_fit(self, X) -> 'RealTimeAnomalyDetector':
+        """Fold rows of X into the baseline without scoring them, e.g. to warm up from history"""
+        X = np.asarray(X, dtype=np.float64)
+        self._check_width(X.shape[1])
+        with self._lock:
+            self._merge(X)
+            self.n_seen += len(X)
+        return self
+
+    def get_stats(self) -> Dict[str, Any]:
         return {
-            'risk_score': float(sequence_score.mean()),
-            'pattern_deviation': float(deviation_score),
-            'anomaly_detected': bool(sequence_score.mean() > 0.7),
-            'behavior_patterns': pattern_analysis.tolist(),
-            'analysis_details': {
-                'sequence_confidence': float(abs(sequence_score.mean() - 0.5) * 2),
-                'pattern_confidence': float(1 - deviation_score),
-                'risk_factors': self._identify_risk_factors(pattern_analysis)
-            }
+            'events': self.n_seen,
+            'anomalies': self.n_anomalies,
+            'anomaly_rate': self.n_anomalies / self.n_seen if self.n_seen else 0.0,
+            'warmed_up': self.warmed_up
         }
-    
-    def _calculate_pattern_deviation(self, current, historical):
-        return np.mean(np.abs(current - historical))
-    
-    def _identify_risk_factors(self, patterns):
-        # Analyze patterns for specific risk factors
-        risk_factors = []
-        pattern_means = np.mean(patterns, axis=0)
-        
-        if pattern_means[0] > 0.8:
-            risk_factors.append('Unusual Access Pattern')
-        if pattern_means[1] > 0.7:
-            risk_factors.append('Temporal Anomaly')
-        if pattern_means[2] > 0.6:
-            risk_factors.append('Resource Usage Deviation')
-            
-        return risk_factors
\ No newline at end of file
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'mean': self.mean.copy(),
+                'm2': self.m2.copy(),
+                'counters': {'n_seen': self.n_seen, 'n_anomalies': self.n_anomalies, 'weight': self.weight},
+                'config': {
+                    'n_features': self.n_features, 'window': self.window,
+                    'warmup_events': self.warmup_events, 'threshold': self.threshold,
+                    'clip_z': self.clip_z, 'update_on_anomaly': self.update_on_anomaly,
+                    'batch_size': self.batch_size
+                }
+            }
+
+    def set_state(self, state: Dict[str, Any]) -> 'RealTimeAnomalyDetector':
+        self.__init__(model_store=self.model_store, **state['config'])
+        counters = state['counters']
+        self.n_seen = int(counters['n_seen'])
+        self.n_anomalies = int(counters['n_anomalies'])
+        self.weight = float(counters['weight'])
+        self.mean = np.array(state['mean'], dtype=np.float64)
+        self.m2 = np.array(state['m2'], dtype=np.float64)
+        self._refresh()
+        return self
+
+    def save(self, version: Optional[str] = None) -> str:
+        return self.model_store.save(self.MODEL_NAME, self.get_state(), version)
+
+    def load(self, version: Optional[str] = None) -> str:
+        loaded = self.model_store.load(self.MODEL_NAME, version=version)
+        self.set_state(loaded)
+        return loaded['_metadata']['version']
+
+    def _score_and_update(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+        with self._lock:
+            if not self.warmed_up:
+                self._merge(X)
+                self.n_seen += len(X)
+                return np.zeros(len(X)), np.zeros(len(X), dtype=bool), np.zeros(len(X)), False
+
+            distances = self._distances(X)
+            surprise = self._surprise(distances)
+            flags = surprise >= self._threshold_surprise
+            n_flagged = int(flags.sum())
+            self.n_anomalies += n_flagged
+            self._merge(X if self.update_on_anomaly or not n_flagged else X[~flags])
+            self.n_seen += len(X)
+        return self._score(surprise), flags, distances, True
+
+    def _distances(self, X: np.ndarray) -> np.ndarray:
+        """Mean clipped squared z-score of each row"""
+        Z = X - self.mean
+        np.multiply(Z, Z, out=Z)
+        Z *= self._inv_var
+        np.minimum(Z, self.clip_z * self.clip_z, out=Z)
+        return Z.sum(axis=1) / self.n_features
+
+    def _surprise(self, distance):
+        """-log10 of the chi-square upper tail probability of n_features * distance (Wilson-Hilferty)"""
+        k = self.n_features
+        spread = 2.0 / (9.0 * k)
+        z = (np.cbrt(distance) - (1.0 - spread)) / math.sqrt(spread)
+        return -log_ndtr(-z) / LN10
+
+    def _score(self, surprise):
+        # Monotone in the tail probability, 0.5 exactly at the anomaly threshold
+        return surprise / (surprise + self._threshold_surprise)
+
+    def _update_one(self, delta: np.ndarray, squared: np.ndarray):
+        """
+        Exponentially weighted Welford step for one event, given its
+        deviation from the mean and the square of it. delta * (x - new_mean)
+        equals squared * (1 - 1 / weight), so the square computed for
+        scoring is reused.
+        """
+        self.weight = self.weight * self._decay + 1.0
+        share = 1.0 / self.weight
+        delta *= share
+        self.mean += delta
+        self.m2 *= self._decay
+        squared *= 1.0 - share
+        self.m2 += squared
+        self.n_seen += 1
+        self._refresh()
+
+    def _merge(self, X: np.ndarray):
+        """
+        Fold a batch in with Chan's merge. The batch's rows share one weight,
+        a close approximation of applying _update_one row by row when the
+        batch is much shorter than window.
+        """
+        n = len(X)
+        if n == 0:
+            return
+        decay = self._decay ** n
+        weight_a = self.weight * decay
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        weight = weight_a + n
+        delta = batch_mean - self.mean
+        self.mean += delta * (n / weight)
+        self.m2 = self.m2 * decay + batch_m2 + delta * delta * (weight_a * n / weight)
+        self.weight = weight
+        self._refresh()
+
+    def _refresh(self):
+        if self.weight > 0:
+            # Constant features keep a tiny variance; the clip bounds what they can contribute
+            np.maximum(self.m2, 1e-12 * self.weight, out=self._inv_var)
+            np.divide(self.weight, self._inv_var, out=self._inv_var)
+
+    def _as_matrix(self, stream: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        X = np.zeros((len(stream), self.n_features))
+        present = np.ones(len(stream), dtype=bool)
+        for i, item in enumerate(stream):
+            if isinstance(item, dict):
+                if item.get('feature_vector') is not None:
+                    item = item['feature_vector']
+                elif item.get('sequence_data') is not None:
+                    item = np.asarray(item['sequence_data']).reshape(-1, self.n_features)[-1]
+                else:
+                    present[i] = False
+                    continue
+            row = np.asarray(item, dtype=np.float64).reshape(-1)
+            self._check_width(len(row))
+            X[i] = row
+        return X, present
+
+    def _build_results(self, scores, flags, distances, scored) -> List[Dict[str, Any]]:
+        scores = np.asarray(scores, dtype=np.float64)
+        confidences = np.where(scored, np.abs(scores - 0.5) * 2, 0.0)
+        return [
+            {'is_anomaly': flag, 'anomaly_score': score, 'confidence': confidence, 'distance': distance,
+             'scored': was_scored}
+            for flag, score, confidence, distance, was_scored in zip(
+                np.asarray(flags, dtype=bool).tolist(), scores.tolist(), confidences.tolist(),
+                np.asarray(distances, dtype=np.float64).tolist(), np.asarray(scored, dtype=bool).tolist()
+            )
+        ]
+
+    def _check_width(self, width: int):
+        if width != self.n_features:
+            raise ValueError(f"RealTimeAnomalyDetector expects {self.n_features} features, got {width}")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,266 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+
+def entity_key(entity_id: Hashable) -> bytes:
+    """Fixed-width 16-byte key of a user (or other entity) id"""
+    return hashlib.blake2b(str(entity_id).encode('utf-8'), digest_size=16).digest()
+
+
+class ColdBaselineFile:
+    """
+    Growable on-disk baseline tier backed by numpy memmaps: one float32
+    centroid row, one event count and one 16-byte key per entity. Rows are
+    appended and never reused; the files double in size when full.
+
+    A row's key is written last, so the rows holding a key are exactly the
+    stored ones and the size is recovered from the keys on open. Rows
+    appended since the last flush (e.g. baselines evicted at runtime)
+    survive a restart of the process.
+    """
+
+    def __init__(self, path: str, width: int, initial_capacity: int = 1024):
+        self.path = path
+        self.width = width
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        if meta and meta.get('width') != width:
+            raise ValueError(f"Baselines in {path} have width {meta.get('width')}, expected {width}")
+        self._open(meta.get('capacity', initial_capacity), 'r+' if meta else 'w+')
+        # Rows are appended in order, so the first row without a key ends the table
+        empty = np.flatnonzero(~self.keys.any(axis=1))
+        self.size = int(empty[0]) if len(empty) else self.capacity
+        if not meta:
+            self._write_meta()
+        self.index: Dict[bytes, int] = {
+            self.keys[row].tobytes(): row for row in range(self.size)
+        }
+
+    def get(self, key: bytes) -> Optional[Tuple[np.ndarray, int]]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+        return np.array(self.centroids[row]), int(self.counts[row])
+
+    def put(self, key: bytes, centroid: np.ndarray, count: int):
+        row = self.index.get(key)
+        if row is None:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.centroids[row] = centroid
+            self.counts[row] = count
+            self.keys[row] = np.frombuffer(key, dtype=np.uint8)
+            self.index[key] = row
+            return
+        self.centroids[row] = centroid
+        self.counts[row] = count
+
+    def flush(self):
+        self.centroids.flush()
+        self.counts.flush()
+        self.keys.flush()
+        self._write_meta()
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'width': self.width, 'capacity': self.capacity, 'size': self.size}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _open(self, capacity: int, mode: str):
+        self.capacity = capacity
+        self.centroids = np.memmap(os.path.join(self.path, 'centroids.f32'), dtype=np.float32,
+                                   mode=mode, shape=(capacity, self.width))
+        self.counts = np.memmap(os.path.join(self.path, 'counts.i64'), dtype=np.int64,
+                                mode=mode, shape=(capacity,))
+        self.keys = np.memmap(os.path.join(self.path, 'keys.u8'), dtype=np.uint8,
+                              mode=mode, shape=(capacity, 16))
+
+    def _grow(self):
+        self.centroids.flush()
+        self.counts.flush()
+        self.keys.flush()
+        capacity = self.capacity * 2
+        for name, row_bytes in (('centroids.f32', 4 * self.width), ('counts.i64', 8), ('keys.u8', 16)):
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                f.truncate(capacity * row_bytes)
+        del self.centroids, self.counts, self.keys
+        self._open(capacity, 'r+')
+        # The capacity must be on disk before rows past the old end are
+        self._write_meta()
+
+
+class PatternBaselineStore:
+    """
+    Per-entity behavior baselines: the exponentially weighted centroid of
+    each user's pattern vectors and the number of events behind it.
+
+    Recently used baselines live in preallocated float32 arrays (the hot
+    set, at most hot_capacity entities, LRU). Evicted baselines are written
+    to a memory-mapped cold tier under directory and promoted back on their
+    next lookup, so scoring every active user costs one array gather for
+    the hot ones and a row read for the rest, without loading history.
+    """
+
+    def __init__(self, directory: Optional[str] = None, width: int = 16, alpha: float = 0.1,
+                 hot_capacity: int = 10000):
+        self.directory = directory
+        self.width = width
+        self.alpha = alpha
+        self.hot_capacity = hot_capacity
+        self.logger = logging.getLogger(__name__)
+        self.centroids = np.full((hot_capacity, width), np.nan, dtype=np.float32)
+        self.counts = np.zeros(hot_capacity, dtype=np.int64)
+        self._dirty = np.zeros(hot_capacity, dtype=bool)
+        self._hot: "OrderedDict[bytes, int]" = OrderedDict()
+        self._cold: Optional[ColdBaselineFile] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.cold_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def cold(self) -> Optional[ColdBaselineFile]:
+        # Opened on first use so an analyzer that never spills touches no files
+        if self._cold is None and self.directory is not None:
+            self._cold = ColdBaselineFile(self.directory, self.width)
+        return self._cold
+
+    def __len__(self) -> int:
+        cold = self.cold
+        if cold is None:
+            return len(self._hot)
+        return len(self._hot) + sum(1 for key in cold.index if key not in self._hot)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        key = entity_key(entity_id)
+        return key in self._hot or (self.cold is not None and key in self.cold.index)
+
+    def get_many(self, entity_ids: Sequence[Hashable]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (centroids, counts) of the given entities, shape (n, width) and (n,).
+        Unknown entities get NaN centroids and a count of 0.
+        """
+        centroids = np.full((len(entity_ids), self.width), np.nan, dtype=np.float32)
+        counts = np.zeros(len(entity_ids), dtype=np.int64)
+        with self._lock:
+            for chunk in self._chunks(len(entity_ids)):
+                slots = self._slots(entity_ids[chunk], create=False)
+                known = slots >= 0
+                centroids[chunk][known] = self.centroids[slots[known]]
+                counts[chunk][known] = self.counts[slots[known]]
+        return centroids, counts
+
+    def update_many(self, entity_ids: Sequence[Hashable], patterns: np.ndarray,
+                    weights: Optional[np.ndarray] = None):
+        """
+        Move each entity's centroid toward its pattern by alpha per event.
+        weights gives the number of events behind each pattern (default 1);
+        a pattern covering k events moves the centroid by 1 - (1 - alpha) ** k.
+        Repeated ids in one call are applied in order.
+        """
+        patterns = np.asarray(patterns, dtype=np.float32).reshape(len(entity_ids), self.width)
+        weights = np.ones(len(entity_ids), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        with self._lock:
+            for chunk in self._chunks(len(entity_ids)):
+                slots = self._slots(entity_ids[chunk], create=True)
+                if len(np.unique(slots)) == len(slots):
+                    self._apply(slots, patterns[chunk], weights[chunk])
+                else:
+                    for i in range(len(slots)):
+                        self._apply(slots[i:i + 1], patterns[chunk][i:i + 1], weights[chunk][i:i + 1])
+
+    def flush(self):
+        """Write every changed hot baseline to the cold tier and sync it to disk"""
+        if self.directory is None:
+            return
+        with self._lock:
+            for key, slot in self._hot.items():
+                if self._dirty[slot]:
+                    self.cold.put(key, self.centroids[slot], int(self.counts[slot]))
+                    self._dirty[slot] = False
+            self.cold.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.cold_hits + self.misses
+        return {
+            'hot_entities': len(self._hot),
+            'cold_entities': self._cold.size if self._cold is not None else 0,
+            'hits': self.hits,
+            'cold_hits': self.cold_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.cold_hits) / lookups if lookups else 0.0
+        }
+
+    def _chunks(self, n: int):
+        # A chunk never holds more entities than the hot set, so resolving
+        # one entity's slot cannot evict another entity of the same chunk
+        for start in range(0, n, self.hot_capacity):
+            yield slice(start, start + self.hot_capacity)
+
+    def _slots(self, entity_ids: Sequence[Hashable], create: bool) -> np.ndarray:
+        return np.array([self._slot(entity_key(entity_id), create) for entity_id in entity_ids],
+                        dtype=np.int64)
+
+    def _apply(self, slots: np.ndarray, patterns: np.ndarray, weights: np.ndarray):
+        current = np.nan_to_num(self.centroids[slots])
+        rate = (1.0 - (1.0 - self.alpha) ** weights).astype(np.float32)
+        # A new baseline starts at its first pattern
+        rate[self.counts[slots] == 0] = 1.0
+        self.centroids[slots] = current + rate[:, np.newaxis] * (np.nan_to_num(patterns) - current)
+        self.counts[slots] += weights
+        self._dirty[slots] = True
+
+    def _slot(self, key: bytes, create: bool) -> int:
+        slot = self._hot.get(key)
+        if slot is not None:
+            self._hot.move_to_end(key)
+            self.hits += 1
+            return slot
+
+        stored = self.cold.get(key) if self.cold is not None else None
+        if stored is None:
+            self.misses += 1
+            if not create:
+                return -1
+        else:
+            self.cold_hits += 1
+
+        slot = self._acquire(key)
+        if stored is None:
+            self.centroids[slot] = np.nan
+            self.counts[slot] = 0
+            self._dirty[slot] = True
+        else:
+            self.centroids[slot], self.counts[slot] = stored
+            self._dirty[slot] = False
+        return slot
+
+    def _acquire(self, key: bytes) -> int:
+        if len(self._hot) < self.hot_capacity:
+            slot = len(self._hot)
+        else:
+            evicted, slot = self._hot.popitem(last=False)
+            self.evictions += 1
+            if self._dirty[slot]:
+                if self.cold is None:
+                    self.logger.warning("Dropping an evicted baseline: no directory configured for the cold tier")
+                else:
+                    self.cold.put(evicted, self.centroids[slot], int(self.counts[slot]))
+        self._hot[key] = slot
+        return slot
@@ -1,13 +1,35 @@
+import os
 import tensorflow as tf
 import numpy as np
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
-from sklearn.preprocessing import StandardScaler
+from typing import Any, Dict, Hashable, Mapping, Optional
+from .baseline_store import PatternBaselineStore
+from .distillation import StudentRoutingMixin
+from ..model_store import ModelStore
+from ..inference.keras_serving import CompiledPredictor, DEFAULT_BATCH_BUCKETS
+from ...preprocessing.streaming_scaler import StreamingScaler
 
-class BehavioralAnalyzer:
-    def __init__(self):
+class BehavioralAnalyzer(StudentRoutingMixin):
+    MODEL_NAME = 'behavioral_analyzer'
+    
+    PATTERN_WIDTH = 16
+    ANOMALY_THRESHOLD = 0.7
+    student_threshold = ANOMALY_THRESHOLD
+    
+    def __init__(self, model_store: Optional[ModelStore] = None,
+                 baseline_store: Optional[PatternBaselineStore] = None):
+        self.model_store = model_store or ModelStore()
         self.sequence_model = self._build_sequence_model()
         self.pattern_detector = self._build_pattern_detector()
-        self.scaler = StandardScaler()
+        # Fitted once over the first events rather than on every user's data,
+        # so every user is scored on the same scale
+        self.scaler = StreamingScaler()
+        self.baselines = baseline_store or PatternBaselineStore(
+            os.path.join(self.model_store.model_dir(self.MODEL_NAME), 'baselines'),
+            width=self.PATTERN_WIDTH
+        )
+        self._sequence_predictor = None
+        self._pattern_predictor = None
         
     def _build_sequence_model(self):
         model = tf.keras.Sequential([
@@ -37,42 +59,160 @@ class BehavioralAnalyzer:
             Dropout(0.3),
             Dense(64, activation='relu'),
             Dense(32, activation='relu'),
-            Dense(16, activation='softmax')
+            Dense(self.PATTERN_WIDTH, activation='softmax')
         ])
 
-    def analyze_behavior(self, user_data, historical_patterns):
+    def enable_serving_mode(self, batch_buckets=DEFAULT_BATCH_BUCKETS, warmup: bool = True):
+        """Serve both networks through pre-traced functions instead of model.predict"""
+        self._sequence_predictor = CompiledPredictor(self.sequence_model, (None, 128), batch_buckets)
+        self._pattern_predictor = CompiledPredictor(self.pattern_detector, (128,), batch_buckets)
+        if warmup:
+            self._sequence_predictor.warmup()
+            self._pattern_predictor.warmup()
+        self._compile_student(batch_buckets, warmup)
+    
+    def serving_stats(self):
+        stats = {}
+        if self._sequence_predictor is not None:
+            stats['sequence_model'] = self._sequence_predictor.get_stats()
+            stats['pattern_detector'] = self._pattern_predictor.get_stats()
+        if self.student_router is not None:
+            stats['student'] = self.student_stats()
+        return stats
+    
+    def save(self, version: Optional[str] = None) -> str:
+        """
+        Persist both networks and the fitted scaler as a new version. User
+        baselines are not versioned; they are flushed to their own memory
+        mapped files.
+        """
+        self.baselines.flush()
+        self.teacher_version = self.model_store.save(self.MODEL_NAME, {
+            'sequence_model': self.sequence_model,
+            'pattern_detector': self.pattern_detector,
+            'scaler': self.scaler
+        }, version)
+        return self.teacher_version
+    
+    def load(self, version: Optional[str] = None) -> str:
+        """Restore a stored version (default latest) and return its version id"""
+        if not self.sequence_model.built:
+            self.sequence_model.build((None, None, 128))
+        loaded = self.model_store.load(self.MODEL_NAME, {
+            'sequence_model': self.sequence_model,
+            'pattern_detector': self.pattern_detector
+        }, version)
+        self.scaler = loaded['scaler']
+        self.teacher_version = loaded['_metadata']['version']
+        return self.teacher_version
+
+    def analyze_behavior(self, user_data, historical_patterns=None, user_id: Optional[Hashable] = None,
+                         update_baseline: Optional[bool] = None):
         """
         Analyzes user behavior patterns for anomalies
+        
+        user_data holds one user's recent events as (timesteps, 128) rows.
+        Pattern deviation is measured against historical_patterns when
+        given, otherwise against the stored baseline of user_id. The
+        baseline is updated by default only when user_id is given, so
+        anonymous calls do not share one baseline.
         """
+        if update_baseline is None:
+            update_baseline = user_id is not None
+        if historical_patterns is not None:
+            return self._analyze(
+                {user_id: user_data}, update_baseline and user_id is not None,
+                {user_id: np.asarray(historical_patterns, dtype=np.float32)}
+            )[user_id]
+        return self.analyze_users({user_id: user_data}, update_baseline)[user_id]
+    
+    def analyze_users(self, users: Mapping[Hashable, Any], update_baseline: bool = True) -> Dict[Hashable, Dict]:
+        """
+        Score many users in one pass: one scaler transform and one pattern
+        detector call over everyone's rows, one sequence model call per
+        sequence length, and one baseline lookup and update. Each user's
+        pattern deviation is measured against their stored baseline, which
+        then moves toward the patterns just seen; users without a baseline
+        get a deviation of 0 and start one.
+        """
+        return self._analyze(users, update_baseline)
+    
+    def _analyze(self, users: Mapping[Hashable, Any], update_baseline: bool,
+                 historical: Optional[Mapping[Hashable, np.ndarray]] = None) -> Dict[Hashable, Dict]:
+        user_ids = list(users)
+        if not user_ids:
+            return {}
+        data = [np.asarray(users[user_id], dtype=np.float32).reshape(-1, 128) for user_id in user_ids]
+        lengths = np.array([len(rows) for rows in data])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        
         # Normalize data
-        normalized_data = self.scaler.fit_transform(user_data)
+        rows = np.concatenate(data, axis=0)
+        if not getattr(self.scaler, 'frozen', True):
+            self.scaler.partial_fit(rows)
+        normalized_data = self.scaler.transform(rows).astype(np.float32, copy=False)
         
-        # Sequence analysis
-        sequence_score = self.sequence_model.predict(normalized_data)
+        # Sequence analysis, users grouped by sequence length so each group is one call
+        sequence_scores = np.empty(len(user_ids))
+        groups = {}
+        for i, length in enumerate(lengths):
+            groups.setdefault(length, []).append(i)
+        for length, indices in groups.items():
+            batch = np.stack([normalized_data[offsets[i]:offsets[i] + length] for i in indices])
+            sequence_scores[indices] = np.asarray(self._predict_sequences(batch)).reshape(-1)
         
         # Pattern analysis
-        pattern_analysis = self.pattern_detector.predict(normalized_data)
+        pattern_analysis = np.asarray(
+            self._predict(self.pattern_detector, self._pattern_predictor, normalized_data), dtype=np.float32
+        )
         
         # Compare with historical patterns
-        deviation_score = self._calculate_pattern_deviation(
-            pattern_analysis, 
-            historical_patterns
-        )
+        if historical is None:
+            baselines, baseline_counts = self.baselines.get_many(user_ids)
+            deviation_scores = self._calculate_pattern_deviation(pattern_analysis, baselines, lengths)
+            deviation_scores[baseline_counts == 0] = 0.0
+        else:
+            baseline_counts = np.zeros(len(user_ids), dtype=np.int64)
+            deviation_scores = np.array([
+                np.mean(np.abs(pattern_analysis[offsets[i]:offsets[i] + lengths[i]] - historical[user_id]))
+                for i, user_id in enumerate(user_ids)
+            ])
+        
+        if update_baseline:
+            pattern_means = np.add.reduceat(pattern_analysis, offsets, axis=0) / lengths[:, np.newaxis]
+            self.baselines.update_many(user_ids, pattern_means, weights=lengths)
         
-        return {
-            'risk_score': float(sequence_score.mean()),
-            'pattern_deviation': float(deviation_score),
-            'anomaly_detected': bool(sequence_score.mean() > 0.7),
-            'behavior_patterns': pattern_analysis.tolist(),
-            'analysis_details': {
-                'sequence_confidence': float(abs(sequence_score.mean() - 0.5) * 2),
-                'pattern_confidence': float(1 - deviation_score),
-                'risk_factors': self._identify_risk_factors(pattern_analysis)
+        results = {}
+        for i, user_id in enumerate(user_ids):
+            patterns = pattern_analysis[offsets[i]:offsets[i] + lengths[i]]
+            sequence_score = float(sequence_scores[i])
+            deviation_score = float(deviation_scores[i])
+            results[user_id] = {
+                'risk_score': sequence_score,
+                'pattern_deviation': deviation_score,
+                'anomaly_detected': bool(sequence_score > self.ANOMALY_THRESHOLD),
+                'behavior_patterns': patterns.tolist(),
+                'analysis_details': {
+                    'sequence_confidence': float(abs(sequence_score - 0.5) * 2),
+                    'pattern_confidence': float(1 - deviation_score),
+                    'risk_factors': self._identify_risk_factors(patterns),
+                    'baseline_events': int(baseline_counts[i])
+                }
             }
-        }
+        return results
+    
+    def _predict(self, model, predictor, data):
+        return predictor(data) if predictor is not None else model.predict(data)
     
-    def _calculate_pattern_deviation(self, current, historical):
-        return np.mean(np.abs(current - historical))
+    def _predict_teacher(self, sequences):
+        return self._predict(self.sequence_model, self._sequence_predictor, sequences)
+    
+    def _calculate_pattern_deviation(self, current, baselines, lengths):
+        """Mean absolute difference between each user's pattern rows and their baseline"""
+        differences = np.abs(current - np.repeat(baselines, lengths, axis=0))
+        return np.add.reduceat(differences.sum(axis=1), np.concatenate(([0], np.cumsum(lengths)[:-1]))) / (
+            lengths * self.PATTERN_WIDTH
+        )
     
     def _identify_risk_factors(self, patterns):
         # Analyze patterns for specific risk factors
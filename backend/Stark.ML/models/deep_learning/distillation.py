@@ -0,0 +1,224 @@
+import abc
+import time
+import logging
+import tensorflow as tf
+import numpy as np
+from tensorflow.keras.layers import Conv1D, Dense, GlobalMaxPooling1D, GRU
+from typing import Any, Callable, Dict, Optional, Tuple
+from ..inference.keras_serving import CompiledPredictor, DEFAULT_BATCH_BUCKETS
+from ..inference.student_routing import StudentRouter, compare_to_teacher
+
+STUDENT_KINDS = ('tcn', 'gru')
+STUDENT_SUFFIX = '_student'
+
+logger = logging.getLogger(__name__)
+
+
+def build_student(kind: str = 'tcn', feature_dim: int = 128, units: int = 64) -> tf.keras.Model:
+    """
+    Small sequence classifier to distill a stacked BiLSTM teacher into.
+    'tcn' is three causal dilated convolutions (receptive field 15 steps)
+    with global max pooling, so every step runs in parallel; 'gru' is a
+    single unidirectional GRU layer.
+    """
+    if kind == 'tcn':
+        layers = [
+            Conv1D(units, 3, padding='causal', dilation_rate=1, activation='relu', input_shape=(None, feature_dim)),
+            Conv1D(units, 3, padding='causal', dilation_rate=2, activation='relu'),
+            Conv1D(units, 3, padding='causal', dilation_rate=4, activation='relu'),
+            GlobalMaxPooling1D()
+        ]
+    elif kind == 'gru':
+        layers = [GRU(units, input_shape=(None, feature_dim))]
+    else:
+        raise ValueError(f"Unknown student kind {kind!r}, expected one of {STUDENT_KINDS}")
+
+    model = tf.keras.Sequential(layers + [
+        Dense(32, activation='relu'),
+        Dense(1, activation='sigmoid')
+    ])
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss='binary_crossentropy',
+        metrics=[tf.keras.metrics.AUC()]
+    )
+    return model
+
+
+def train_student(teacher_predict: Callable[[np.ndarray], np.ndarray], X: np.ndarray,
+                  labels: Optional[np.ndarray] = None, kind: str = 'tcn', feature_dim: int = 128,
+                  hard_label_weight: float = 0.0, epochs: int = 10, batch_size: int = 256,
+                  validation_fraction: float = 0.2, threshold: float = 0.5,
+                  escalation_margin: Optional[float] = 0.1, seed: Optional[int] = None) -> Tuple[tf.keras.Model, Dict[str, Any]]:
+    """
+    Fit a student on the teacher's scores for X, shape (n, timesteps,
+    feature_dim). Targets are the teacher's probabilities, blended with the
+    true labels by hard_label_weight when labels are given; binary cross
+    entropy on a blended target equals the weighted sum of the soft and
+    hard losses. The last validation_fraction of rows is held out and the
+    returned report compares student and teacher there (see
+    compare_to_teacher), including CPU time per event of each.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n_validation = int(len(X) * validation_fraction)
+    split = len(X) - n_validation
+
+    teacher_scores = np.asarray(teacher_predict(X), dtype=np.float32).reshape(-1)
+    targets = teacher_scores
+    if labels is not None and hard_label_weight:
+        targets = (1 - hard_label_weight) * teacher_scores + hard_label_weight * np.asarray(labels, dtype=np.float32)
+
+    if seed is not None:
+        tf.random.set_seed(seed)
+    student = build_student(kind, feature_dim)
+    history = student.fit(
+        X[:split], targets[:split],
+        batch_size=batch_size,
+        epochs=epochs,
+        validation_data=(X[split:], targets[split:]) if n_validation else None,
+        callbacks=[tf.keras.callbacks.EarlyStopping(patience=3, restore_best_weights=True)] if n_validation else None,
+        verbose=0
+    )
+
+    held_out = slice(split, None) if n_validation else slice(None)
+    X_eval = X[held_out]
+    teacher_cpu = _cpu_seconds(teacher_predict, X_eval)
+    student_cpu = _cpu_seconds(lambda data: student.predict(data, batch_size=batch_size, verbose=0), X_eval)
+    student_scores = student.predict(X_eval, batch_size=batch_size, verbose=0).reshape(-1)
+
+    report = compare_to_teacher(
+        teacher_scores[held_out], student_scores, threshold,
+        labels=None if labels is None else np.asarray(labels)[held_out],
+        escalation_margin=escalation_margin
+    )
+    report.update({
+        'kind': kind,
+        'epochs_run': len(history.history['loss']),
+        'teacher_cpu_ms_per_event': teacher_cpu * 1000 / len(X_eval),
+        'student_cpu_ms_per_event': student_cpu * 1000 / len(X_eval),
+        'cpu_speedup': teacher_cpu / student_cpu if student_cpu else None
+    })
+    logger.info(f"Distilled {kind} student: agreement {report['agreement']:.3f}, "
+                f"CPU speedup {report['cpu_speedup'] or 0:.1f}x")
+    return student, report
+
+
+def _cpu_seconds(predict: Callable[[np.ndarray], np.ndarray], X: np.ndarray) -> float:
+    predict(X[:1])  # build and trace outside the measurement
+    start = time.process_time()
+    predict(X)
+    return time.process_time() - start
+
+
+class StudentRoutingMixin(abc.ABC):
+    """
+    Distilled student support for a model with a Keras sequence network.
+
+    The host class provides MODEL_NAME, model_store, student_threshold (the
+    score its decisions are taken at) and _predict_teacher(sequences), and
+    calls _predict_sequences wherever it used to call the teacher. With a
+    student enabled, sequences are scored by the student and rows within
+    escalation_margin of student_threshold are escalated to the teacher.
+
+    The host sets teacher_version to the stored version its weights were
+    last saved as or loaded from. Students record the teacher version they
+    were distilled from, so a student is only paired with its own teacher.
+    A host class without _predict_teacher cannot be instantiated.
+    """
+
+    student: Optional[tf.keras.Model] = None
+    student_kind: Optional[str] = None
+    student_report: Optional[Dict[str, Any]] = None
+    student_router: Optional[StudentRouter] = None
+    teacher_version: Optional[str] = None
+    student_teacher_version: Optional[str] = None
+    _student_predictor: Optional[CompiledPredictor] = None
+    student_threshold = 0.5
+    student_feature_dim = 128
+
+    def distill_student(self, X: np.ndarray, labels: Optional[np.ndarray] = None, kind: str = 'tcn',
+                        escalation_margin: float = 0.1, **options) -> Dict[str, Any]:
+        """Train a student on this model's scores for X, route predictions through it and return its report"""
+        student, report = train_student(
+            self._predict_teacher, X, labels, kind, self.student_feature_dim,
+            threshold=self.student_threshold, escalation_margin=escalation_margin, **options
+        )
+        self.enable_student(student, kind, escalation_margin)
+        self.student_report = report
+        self.student_teacher_version = self.teacher_version
+        return report
+
+    def enable_student(self, student: tf.keras.Model, kind: str = 'tcn', escalation_margin: float = 0.1):
+        self.student = student
+        self.student_kind = kind
+        self._student_predictor = None
+        self.student_router = StudentRouter(self._predict_student, self._predict_teacher,
+                                            self.student_threshold, escalation_margin)
+
+    def disable_student(self):
+        """Serve the teacher alone again; the student is kept"""
+        self.student_router = None
+
+    def save_student(self, version: Optional[str] = None) -> str:
+        if self.student is None:
+            raise RuntimeError("No student to save; run distill_student first")
+        return self.model_store.save(self.MODEL_NAME + STUDENT_SUFFIX, {'model': self.student}, version, metadata={
+            'kind': self.student_kind,
+            'feature_dim': self.student_feature_dim,
+            'escalation_margin': self.student_router.escalation_margin if self.student_router else 0.1,
+            'teacher_version': self.student_teacher_version,
+            'report': self.student_report or {}
+        })
+
+    def load_student(self, version: Optional[str] = None, escalation_margin: Optional[float] = None) -> str:
+        """Restore a stored student (default latest) and route predictions through it"""
+        loaded = self.model_store.load(self.MODEL_NAME + STUDENT_SUFFIX, version=version)
+        metadata = loaded['_metadata']
+        student = build_student(metadata['kind'], metadata['feature_dim'])
+        student.set_weights(loaded['model'])
+        self.enable_student(student, metadata['kind'],
+                            escalation_margin if escalation_margin is not None else metadata['escalation_margin'])
+        self.student_report = metadata.get('report')
+        self.student_teacher_version = metadata.get('teacher_version')
+        if self.student_teacher_version != self.teacher_version:
+            logger.warning(f"Student {metadata['version']} was distilled from teacher version "
+                           f"{self.student_teacher_version}, serving teacher version {self.teacher_version}")
+        return metadata['version']
+
+    def has_stored_student(self) -> bool:
+        return self.model_store.latest_version(self.MODEL_NAME + STUDENT_SUFFIX) is not None
+
+    def stored_student_version(self, teacher_version: Optional[str] = None) -> Optional[str]:
+        """Newest stored student distilled from teacher_version (default the current one), if any"""
+        teacher_version = teacher_version or self.teacher_version
+        if teacher_version is None:
+            return None
+        name = self.MODEL_NAME + STUDENT_SUFFIX
+        for version in reversed(self.model_store.list_versions(name)):
+            if self.model_store.read_metadata(name, version).get('teacher_version') == teacher_version:
+                return version
+        return None
+
+    def student_stats(self) -> Dict[str, Any]:
+        return self.student_router.get_stats() if self.student_router else {}
+
+    def _compile_student(self, batch_buckets=DEFAULT_BATCH_BUCKETS, warmup: bool = True):
+        if self.student is None:
+            return
+        self._student_predictor = CompiledPredictor(self.student, (None, self.student_feature_dim), batch_buckets)
+        if warmup:
+            self._student_predictor.warmup()
+
+    def _predict_student(self, sequences: np.ndarray) -> np.ndarray:
+        if self._student_predictor is not None:
+            return self._student_predictor(sequences)
+        return self.student.predict(sequences, verbose=0)
+
+    def _predict_sequences(self, sequences: np.ndarray) -> np.ndarray:
+        if self.student_router is not None:
+            return self.student_router(sequences)
+        return self._predict_teacher(sequences)
+
+    @abc.abstractmethod
+    def _predict_teacher(self, sequences: np.ndarray) -> np.ndarray:
+        """Teacher scores of sequences, shape (n, timesteps, student_feature_dim)"""
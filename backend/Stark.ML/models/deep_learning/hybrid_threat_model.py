@@ -1,15 +1,55 @@
 import tensorflow as tf
 import torch
 import numpy as np
-from transformers import BertModel, BertTokenizer
-from sklearn.ensemble import GradientBoostingClassifier
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+from .boosting import boosting_summary, build_boosting_stage, compile_boosting_stage
+from .distillation import StudentRoutingMixin
+from .threat_cascade import FULL_STAGE, ThreatCascade, tabular_features
+from ..encoders.bert_encoder import get_bert_encoder
+from ..encoders.embedding_cache import EmbeddingCache
+from ..inference.backends import MeanPooledEncoderGraph, create_backend, default_backend_name
+from ..model_store import ModelStore
+from ..inference.keras_serving import CompiledPredictor, DEFAULT_BATCH_BUCKETS
+from ...preprocessing.sequence_builder import SequenceAssembler
 
-class HybridThreatModel:
-    def __init__(self):
+class HybridThreatModel(StudentRoutingMixin):
+    MODEL_NAME = 'hybrid_threat_model'
+    
+    def __init__(self, embedding_cache: Optional[EmbeddingCache] = None, backend: Optional[str] = None,
+                 model_store: Optional[ModelStore] = None,
+                 sequence_assembler: Optional[SequenceAssembler] = None,
+                 cascade: Optional[ThreatCascade] = None,
+                 boosting: Union[str, Any] = 'gradient_boosting'):
+        self.model_store = model_store or ModelStore()
+        self.sequence_assembler = sequence_assembler
+        self.cascade = cascade
         self.deep_model = self._build_deep_model()
-        self.bert = BertModel.from_pretrained('bert-base-uncased')
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        self.gradient_boost = GradientBoostingClassifier(n_estimators=200)
+        self.encoder = get_bert_encoder('bert-base-uncased')
+        self.embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache()
+        self.backend_name = backend or default_backend_name()
+        self._text_backend = None
+        self._deep_predictor = None
+        self.gradient_boost = build_boosting_stage(boosting)
+        self._boost_predictor = None
+    
+    @property
+    def bert(self):
+        return self.encoder.model
+    
+    @property
+    def tokenizer(self):
+        return self.encoder.tokenizer
+    
+    @property
+    def text_backend(self):
+        """Backend producing mean-pooled BERT embeddings; built on first use"""
+        if self._text_backend is None:
+            self._text_backend = create_backend(
+                self.backend_name,
+                MeanPooledEncoderGraph(self.bert),
+                'hybrid_text_encoder'
+            )
+        return self._text_backend
         
     def _build_deep_model(self):
         model = tf.keras.Sequential([
@@ -39,31 +79,164 @@ class HybridThreatModel:
         
         return model
     
+    def enable_serving_mode(self, batch_buckets=DEFAULT_BATCH_BUCKETS, warmup: bool = True):
+        """Serve the deep model through pre-traced functions instead of model.predict"""
+        self._deep_predictor = CompiledPredictor(self.deep_model, (None, 128), batch_buckets)
+        if warmup:
+            self._deep_predictor.warmup()
+        self._compile_student(batch_buckets, warmup)
+    
+    def serving_stats(self):
+        stats = {'deep_model': self._deep_predictor.get_stats()} if self._deep_predictor else {}
+        if self.student_router is not None:
+            stats['student'] = self.student_stats()
+        return stats
+    
+    def _predict_deep(self, sequences):
+        return self._predict_sequences(sequences)
+    
+    def _predict_teacher(self, sequences):
+        if self._deep_predictor is not None:
+            return self._deep_predictor(sequences)
+        return self.deep_model.predict(sequences)
+    
+    def save(self, version: Optional[str] = None) -> str:
+        """Persist the deep model, gradient boosting stage and fitted cascade, if any, as a new version"""
+        artifacts = {
+            'deep_model': self.deep_model,
+            'gradient_boost': self.gradient_boost
+        }
+        if self.cascade is not None and self.cascade.fitted:
+            artifacts['cascade'] = self.cascade.get_state()
+        self.teacher_version = self.model_store.save(self.MODEL_NAME, artifacts, version)
+        self.embedding_cache.flush()
+        return self.teacher_version
+    
+    def load(self, version: Optional[str] = None) -> str:
+        """Restore a stored version (default latest) and return its version id"""
+        loaded = self.model_store.load(self.MODEL_NAME, {'deep_model': self.deep_model}, version)
+        self.gradient_boost = loaded['gradient_boost']
+        self._boost_predictor = compile_boosting_stage(self.gradient_boost)
+        if 'cascade' in loaded:
+            self.cascade = (self.cascade or ThreatCascade()).set_state(loaded['cascade'])
+        self.teacher_version = loaded['_metadata']['version']
+        return self.teacher_version
+    
+    def fit_boosting(self, events, labels) -> Dict[str, Any]:
+        """
+        Fit the final boosting stage on labelled events. Their sequences
+        must share one length, as the stage takes the flattened sequence
+        alongside the text embedding.
+        """
+        sequences = np.concatenate([self._extract_sequence_features(event) for event in events], axis=0)
+        text = self._extract_text_features_batch([event['description'] for event in events])
+        self.gradient_boost.fit(np.concatenate([sequences.reshape(len(events), -1), text], axis=1),
+                                np.asarray(labels))
+        self._boost_predictor = compile_boosting_stage(self.gradient_boost)
+        return boosting_summary(self.gradient_boost)
+    
+    def fit_cascade(self, events, labels,
+                    bands: Optional[Mapping[str, Optional[Tuple[float, float]]]] = None) -> ThreatCascade:
+        """
+        Fit the early-exit stages on a labelled replay set and score through
+        them from now on. bands overrides the uncertainty band of each stage.
+        """
+        sequences = [self._extract_sequence_features(event) for event in events]
+        tabular = np.concatenate([tabular_features(seq) for seq in sequences], axis=0)
+        text = self._extract_text_features_batch([event['description'] for event in events])
+        cascade = ThreatCascade(bands).fit(tabular, text, np.asarray(labels))
+        self.cascade = cascade
+        return cascade
+    
     def analyze_threat(self, event_data):
         """
         Comprehensive threat analysis using multiple models
         """
-        # Deep learning analysis
-        sequence_features = self._extract_sequence_features(event_data)
-        deep_score = self.deep_model.predict(sequence_features)
+        return self.analyze_threat_batch([event_data])[0]
+    
+    def analyze_threat_batch(self, events):
+        """
+        Threat analysis for a batch of events with one forward pass per model
         
-        # BERT analysis for text
-        text_features = self._extract_text_features(event_data['description'])
+        With a fitted cascade, events first go through its cheap stages and
+        only those left in every stage's uncertainty band take the full
+        path. Each result's 'decided_by' names the stage that scored it.
+        """
+        if not events:
+            return []
+        
+        sequences = [self._extract_sequence_features(event) for event in events]
+        descriptions = [event['description'] for event in events]
+        results = [None] * len(events)
+        pending = list(range(len(events)))
+        text_features = None
         
-        # Combine features
-        combined_features = np.concatenate([
-            sequence_features.reshape(1, -1),
-            text_features
-        ], axis=1)
+        if self.cascade is not None and self.cascade.fitted:
+            tabular = np.concatenate([tabular_features(seq) for seq in sequences], axis=0)
+            cascade_result = self.cascade.run(
+                tabular, lambda indices: self._extract_text_features_batch([descriptions[i] for i in indices])
+            )
+            for idx, stage in enumerate(cascade_result.stages):
+                if stage is not None:
+                    text = cascade_result.text[idx] if cascade_result.has_text[idx] else None
+                    results[idx] = self._build_early_result(
+                        cascade_result.scores[idx], stage, sequences[idx][0], text
+                    )
+            pending = cascade_result.pending.tolist()
+            self.cascade.record_full(len(pending))
+            if cascade_result.text is not None:
+                text_features = cascade_result.text
+                missing = [idx for idx in pending if not cascade_result.has_text[idx]]
+                if missing:
+                    text_features[missing] = self._extract_text_features_batch([descriptions[i] for i in missing])
         
-        # Final prediction using gradient boosting
-        final_score = self.gradient_boost.predict_proba(combined_features)[0][1]
+        if pending:
+            if text_features is None:
+                # BERT analysis for text, one padded batch for the events left
+                text_features = np.zeros((len(events), self.embedding_cache.dim), dtype=np.float32)
+                text_features[pending] = self._extract_text_features_batch([descriptions[i] for i in pending])
+            self._analyze_full(sequences, text_features, pending, results)
+        return results
+    
+    def _analyze_full(self, sequences, text_features, pending, results):
+        """Deep model and gradient boosting over the pending events, filling results in place"""
+        # Events can only share a deep model / boosting call when their
+        # sequences have the same shape, so group them by sequence length
+        groups = {}
+        for idx in pending:
+            groups.setdefault(sequences[idx].shape[1], []).append(idx)
         
+        for indices in groups.values():
+            sequence_batch = np.concatenate([sequences[i] for i in indices], axis=0)
+            
+            # Deep learning analysis
+            deep_scores = self._predict_deep(sequence_batch)
+            
+            # Combine features
+            combined_features = np.concatenate([
+                sequence_batch.reshape(len(indices), -1),
+                text_features[indices]
+            ], axis=1)
+            
+            # Final prediction using gradient boosting
+            final_scores = (self._boost_predictor or self.gradient_boost).predict_proba(combined_features)[:, 1]
+            
+            for row, idx in enumerate(indices):
+                results[idx] = self._build_result(
+                    float(deep_scores[row][0]),
+                    float(final_scores[row]),
+                    sequence_batch[row],
+                    text_features[idx],
+                    combined_features[row]
+                )
+    
+    def _build_result(self, deep_score, final_score, sequence_features, text_features, combined_features):
         return {
             'threat_score': float(final_score),
-            'deep_learning_score': float(deep_score[0][0]),
+            'deep_learning_score': float(deep_score),
             'confidence': self._calculate_confidence(deep_score, final_score),
             'risk_level': self._determine_risk_level(final_score),
+            'decided_by': FULL_STAGE,
             'analysis_details': {
                 'sequence_risk': float(sequence_features.mean()),
                 'text_risk': float(text_features.mean()),
@@ -71,21 +244,78 @@ class HybridThreatModel:
             }
         }
     
+    def _build_early_result(self, score, stage, sequence_features, text_features):
+        """Result of an event decided by a cascade stage; the deep model never ran for it"""
+        features = sequence_features.reshape(-1)
+        if text_features is not None:
+            features = np.concatenate([features, text_features])
+        return {
+            'threat_score': float(score),
+            'deep_learning_score': None,
+            'confidence': float(abs(score - 0.5) * 2),
+            'risk_level': self._determine_risk_level(score),
+            'decided_by': stage,
+            'analysis_details': {
+                'sequence_risk': float(sequence_features.mean()),
+                'text_risk': float(text_features.mean()) if text_features is not None else None,
+                'anomaly_score': self._calculate_anomaly_score(features)
+            }
+        }
+    
     def _extract_sequence_features(self, data):
-        # Implementation for sequence feature extraction
+        # Events without a prebuilt sequence are appended to their entity's
+        # rolling window when an assembler is configured
+        if 'sequence_data' not in data and self.sequence_assembler is not None:
+            entity_id = data.get('user_id')
+            if entity_id is None:
+                entity_id = data.get('ip_address')
+            if entity_id is None:
+                # Anonymous events get a window of their own, padded like a new entity's
+                window = np.zeros((1, self.sequence_assembler.window, self.sequence_assembler.feature_dim),
+                                  dtype=np.float32)
+                window[0, -1] = data['feature_vector']
+                return window
+            window = self.sequence_assembler.push(entity_id, data['feature_vector'])
+            # Copy: later events for the same entity in this batch move the view
+            return window[np.newaxis].copy()
         return np.array(data['sequence_data']).reshape(1, -1, 128)
     
     def _extract_text_features(self, text):
+        return self._extract_text_features_batch([text])
+    
+    def _extract_text_features_batch(self, texts):
+        features = np.empty((len(texts), self.embedding_cache.dim), dtype=np.float32)
+        
+        # Serve repeated descriptions from the cache and encode each distinct
+        # missing text once
+        pending = {}
+        for idx, text in enumerate(texts):
+            key = self.embedding_cache.make_key(text)
+            cached = self.embedding_cache.get(key) if key not in pending else None
+            if cached is not None:
+                features[idx] = cached
+            else:
+                pending.setdefault(key, (text, []))[1].append(idx)
+        
+        if pending:
+            encoded_texts = self._encode_texts([text for text, _ in pending.values()])
+            for (key, (_, indices)), embedding in zip(pending.items(), encoded_texts):
+                self.embedding_cache.put(key, embedding)
+                features[indices] = embedding
+        
+        return features
+    
+    def _encode_texts(self, texts):
         encoded = self.tokenizer(
-            text,
+            texts,
             padding=True,
             truncation=True,
-            return_tensors='pt'
+            return_tensors='np'
         )
         
-        with torch.no_grad():
-            outputs = self.bert(**encoded)
-            return outputs.last_hidden_state.mean(dim=1).numpy()
+        # Mean over real tokens only so padding in the batch does not
+        # change an event's embedding
+        return self.text_backend.run(encoded['input_ids'], encoded['attention_mask'])
     
     def _calculate_confidence(self, deep_score, final_score):
         return float(np.mean([
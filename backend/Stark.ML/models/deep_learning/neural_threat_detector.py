@@ -2,13 +2,126 @@ import tensorflow as tf
 import numpy as np
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
 from tensorflow.keras.models import Sequential
-from typing import Dict, Any, List
+from collections.abc import Sequence
+from typing import Dict, Any, List, Optional
+from .distillation import StudentRoutingMixin
+from ..model_store import ModelStore
+from ..inference.keras_serving import CompiledPredictor, DEFAULT_BATCH_BUCKETS
+from ...preprocessing.training_data import FeatureShardStore
 
-class NeuralThreatDetector:
-    def __init__(self):
+RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+RISK_BINS = np.array([0.4, 0.6, 0.8])
+CONFIDENCE_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH'])
+CONFIDENCE_BINS = np.array([0.5, 0.8])
+
+class ThreatAnalysisBatch(Sequence):
+    """
+    Columnar per-prediction analysis. Arrays are computed once for the whole
+    batch; indexing or iterating yields the per-row dict format lazily.
+    """
+    
+    def __init__(self, threat_scores: np.ndarray, confidence_scores: np.ndarray, threshold: float):
+        self.raw_score = threat_scores
+        self.confidence = confidence_scores
+        # right=True keeps the strict '>' comparisons: a score of exactly 0.8 is HIGH.
+        # Scores are compared in float64 like the per-row thresholds, so a float32
+        # score of 0.8f (just above 0.8) stays CRITICAL
+        self.risk_code = np.digitize(threat_scores.astype(np.float64), RISK_BINS, right=True).astype(np.int8)
+        self.confidence_code = np.digitize(confidence_scores.astype(np.float64), CONFIDENCE_BINS, right=True).astype(np.int8)
+        self.requires_attention = threat_scores > threshold
+        self.normalized_risk = threat_scores * confidence_scores
+    
+    @property
+    def risk_level(self) -> np.ndarray:
+        return RISK_LEVELS[self.risk_code]
+    
+    @property
+    def confidence_level(self) -> np.ndarray:
+        return CONFIDENCE_LEVELS[self.confidence_code]
+    
+    def __len__(self) -> int:
+        return len(self.raw_score)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return {
+            'risk_level': str(RISK_LEVELS[self.risk_code[idx]]),
+            'confidence_level': str(CONFIDENCE_LEVELS[self.confidence_code[idx]]),
+            'requires_attention': bool(self.requires_attention[idx]),
+            'score_details': {
+                'raw_score': float(self.raw_score[idx]),
+                'confidence': float(self.confidence[idx]),
+                'normalized_risk': float(self.normalized_risk[idx])
+            }
+        }
+    
+    def to_list(self) -> List[Dict]:
+        """Materialize every row as a dict, with Python scalars throughout"""
+        risk = RISK_LEVELS[self.risk_code].tolist()
+        confidence_level = CONFIDENCE_LEVELS[self.confidence_code].tolist()
+        return [
+            {
+                'risk_level': r,
+                'confidence_level': c,
+                'requires_attention': attention,
+                'score_details': {
+                    'raw_score': raw,
+                    'confidence': conf,
+                    'normalized_risk': norm
+                }
+            }
+            for r, c, attention, raw, conf, norm in zip(
+                risk, confidence_level, self.requires_attention.tolist(),
+                self.raw_score.tolist(), self.confidence.tolist(), self.normalized_risk.tolist()
+            )
+        ]
+    
+    def to_records(self) -> np.ndarray:
+        """Structured numpy array with one record per prediction"""
+        records = np.empty(len(self), dtype=[
+            ('raw_score', np.float32),
+            ('confidence', np.float32),
+            ('normalized_risk', np.float32),
+            ('risk_level', 'U8'),
+            ('confidence_level', 'U6'),
+            ('requires_attention', np.bool_)
+        ])
+        records['raw_score'] = self.raw_score
+        records['confidence'] = self.confidence
+        records['normalized_risk'] = self.normalized_risk
+        records['risk_level'] = self.risk_level
+        records['confidence_level'] = self.confidence_level
+        records['requires_attention'] = self.requires_attention
+        return records
+    
+    def to_arrow(self):
+        """Arrow record batch; requires pyarrow"""
+        import pyarrow as pa
+        
+        return pa.RecordBatch.from_arrays([
+            pa.array(self.raw_score),
+            pa.array(self.confidence),
+            pa.array(self.normalized_risk),
+            pa.DictionaryArray.from_arrays(pa.array(self.risk_code), pa.array(RISK_LEVELS)),
+            pa.DictionaryArray.from_arrays(pa.array(self.confidence_code), pa.array(CONFIDENCE_LEVELS)),
+            pa.array(self.requires_attention)
+        ], names=['raw_score', 'confidence', 'normalized_risk', 'risk_level', 'confidence_level',
+                  'requires_attention'])
+
+class NeuralThreatDetector(StudentRoutingMixin):
+    MODEL_NAME = 'neural_threat_detector'
+    
+    def __init__(self, model_store: Optional[ModelStore] = None):
         self.model = self._build_model()
         self.threshold = 0.85
         self.feature_dim = 128
+        self.model_store = model_store or ModelStore()
+        self._predictor = None
+    
+    @property
+    def student_threshold(self) -> float:
+        return self.threshold
         
     def _build_model(self) -> Sequential:
         model = Sequential([
@@ -37,17 +150,25 @@ class NeuralThreatDetector:
         
         return model
     
-    def train(self, X_train: np.ndarray, y_train: np.ndarray, epochs: int = 50, batch_size: int = 32) -> Dict:
-        """Train the neural threat detector"""
+    def train(self, X_train, y_train: Optional[np.ndarray] = None, epochs: int = 50, batch_size: int = 32,
+              validation_data=None) -> Dict:
+        """
+        Train the neural threat detector. X_train is either an in-memory
+        array with y_train, or a tf.data.Dataset of (features, labels)
+        batches, in which case validation_data should be a dataset as well.
+        """
+        if isinstance(X_train, tf.data.Dataset):
+            fit_args = {'x': X_train, 'validation_data': validation_data}
+        else:
+            fit_args = {'x': X_train, 'y': y_train, 'batch_size': batch_size, 'validation_split': 0.2}
+        
         history = self.model.fit(
-            X_train, y_train,
+            **fit_args,
             epochs=epochs,
-            batch_size=batch_size,
-            validation_split=0.2,
             callbacks=[
                 tf.keras.callbacks.EarlyStopping(patience=5),
                 tf.keras.callbacks.ModelCheckpoint(
-                    'best_model.h5',
+                    self.model_store.checkpoint_path(self.MODEL_NAME),
                     save_best_only=True
                 )
             ]
@@ -55,14 +176,63 @@ class NeuralThreatDetector:
         
         return {
             'training_accuracy': history.history['accuracy'][-1],
-            'validation_accuracy': history.history['val_accuracy'][-1],
+            'validation_accuracy': history.history.get('val_accuracy', [None])[-1],
             'training_loss': history.history['loss'][-1],
-            'validation_loss': history.history['val_loss'][-1]
+            'validation_loss': history.history.get('val_loss', [None])[-1]
         }
     
-    def predict_threat(self, data: np.ndarray) -> Dict[str, Any]:
-        """Predict threats from input data"""
-        predictions = self.model.predict(data)
+    def train_from_store(self, store: FeatureShardStore, epochs: int = 50, batch_size: int = 32,
+                         validation_fraction: float = 0.2, seed: Optional[int] = None) -> Dict:
+        """Train out of core from a FeatureShardStore, holding out its last shards for validation"""
+        train_shards, validation_shards = store.split(validation_fraction)
+        return self.train(
+            store.dataset(batch_size, train_shards, shuffle=True, seed=seed),
+            epochs=epochs,
+            validation_data=store.dataset(batch_size, validation_shards, shuffle=False) if validation_shards else None
+        )
+    
+    def save(self, version: Optional[str] = None) -> str:
+        """Persist model weights and threshold as a new version"""
+        self.teacher_version = self.model_store.save(
+            self.MODEL_NAME,
+            {'model': self.model},
+            version,
+            metadata={'threshold': self.threshold, 'feature_dim': self.feature_dim}
+        )
+        return self.teacher_version
+    
+    def load(self, version: Optional[str] = None) -> str:
+        """Restore a stored version (default latest) and return its version id"""
+        if not self.model.built:
+            self.model.build((None, None, self.feature_dim))
+        loaded = self.model_store.load(self.MODEL_NAME, {'model': self.model}, version)
+        self.threshold = loaded['_metadata'].get('threshold', self.threshold)
+        self.teacher_version = loaded['_metadata']['version']
+        return self.teacher_version
+    
+    def enable_serving_mode(self, batch_buckets=DEFAULT_BATCH_BUCKETS, warmup: bool = True):
+        """Serve predictions through pre-traced functions instead of model.predict"""
+        self._predictor = CompiledPredictor(self.model, (None, self.feature_dim), batch_buckets)
+        if warmup:
+            self._predictor.warmup()
+        self._compile_student(batch_buckets, warmup)
+    
+    def serving_stats(self) -> Dict[str, Any]:
+        stats = {'model': self._predictor.get_stats()} if self._predictor else {}
+        if self.student_router is not None:
+            stats['student'] = self.student_stats()
+        return stats
+    
+    def _predict_teacher(self, data: np.ndarray) -> np.ndarray:
+        return self._predictor(data) if self._predictor is not None else self.model.predict(data)
+    
+    def predict_threat(self, data: np.ndarray, columnar: bool = False) -> Dict[str, Any]:
+        """
+        Predict threats from input data. With columnar=True the scores are
+        returned as numpy arrays and 'analysis' is a ThreatAnalysisBatch
+        instead of a list of dicts.
+        """
+        predictions = self._predict_sequences(data)
         threat_scores = predictions.flatten()
         
         # Calculate confidence scores
@@ -71,38 +241,21 @@ class NeuralThreatDetector:
         # Generate detailed analysis
         analysis = self._generate_analysis(threat_scores, confidence_scores)
         
+        if columnar:
+            return {
+                'threat_scores': threat_scores,
+                'is_threat': analysis.requires_attention,
+                'confidence': confidence_scores,
+                'analysis': analysis
+            }
+        
         return {
             'threat_scores': threat_scores.tolist(),
-            'is_threat': (threat_scores > self.threshold).tolist(),
+            'is_threat': analysis.requires_attention.tolist(),
             'confidence': confidence_scores.tolist(),
-            'analysis': analysis
+            'analysis': analysis.to_list()
         }
     
-    def _generate_analysis(self, threat_scores: np.ndarray, confidence_scores: np.ndarray) -> List[Dict]:
-        """Generate detailed analysis for each prediction"""
-        analysis = []
-        
-        for threat_score, confidence in zip(threat_scores, confidence_scores):
-            analysis.append({
-                'risk_level': self._get_risk_level(threat_score),
-                'confidence_level': self._get_confidence_level(confidence),
-                'requires_attention': threat_score > self.threshold,
-                'score_details': {
-                    'raw_score': float(threat_score),
-                    'confidence': float(confidence),
-                    'normalized_risk': float(threat_score * confidence)
-                }
-            })
-        
-        return analysis
-    
-    def _get_risk_level(self, score: float) -> str:
-        if score > 0.8: return 'CRITICAL'
-        if score > 0.6: return 'HIGH'
-        if score > 0.4: return 'MEDIUM'
-        return 'LOW'
-    
-    def _get_confidence_level(self, confidence: float) -> str:
-        if confidence > 0.8: return 'HIGH'
-        if confidence > 0.5: return 'MEDIUM'
-        return 'LOW'
\ No newline at end of file
+    def _generate_analysis(self, threat_scores: np.ndarray, confidence_scores: np.ndarray) -> ThreatAnalysisBatch:
+        """Generate detailed analysis for all predictions at once"""
+        return ThreatAnalysisBatch(threat_scores, confidence_scores, self.threshold)
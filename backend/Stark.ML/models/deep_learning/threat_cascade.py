@@ -0,0 +1,176 @@
+import threading
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from .boosting import build_boosting_stage
+
+TABULAR_STAGE = 'tabular'
+TEXT_STAGE = 'text'
+FULL_STAGE = 'full'
+DEFAULT_BANDS = {TABULAR_STAGE: (0.05, 0.95), TEXT_STAGE: (0.1, 0.9)}
+
+
+def tabular_features(sequences: np.ndarray) -> np.ndarray:
+    """Per-feature mean, standard deviation and last step of (n, timesteps, width) sequences"""
+    sequences = np.asarray(sequences, dtype=np.float32)
+    return np.concatenate([sequences.mean(axis=1), sequences.std(axis=1), sequences[:, -1]], axis=1)
+
+
+class CascadeStage:
+    """
+    One cheap scoring stage. Events whose score falls outside band
+    (strictly below its low or above its high end) are decided here; the
+    rest move on to the next stage. A band of None switches the stage off.
+    """
+
+    def __init__(self, name: str, model, band: Optional[Tuple[float, float]], uses_text: bool = False):
+        self.name = name
+        self.model = model
+        self.band = band
+        self.uses_text = uses_text
+
+    def score(self, tabular: np.ndarray, text: Optional[np.ndarray]) -> np.ndarray:
+        features = np.concatenate([tabular, text], axis=1) if self.uses_text else tabular
+        return self.model.predict_proba(features)[:, 1]
+
+    def decides(self, scores: np.ndarray) -> np.ndarray:
+        low, high = self.band
+        return (scores < low) | (scores > high)
+
+
+class CascadeResult:
+    """
+    Outcome of ThreatCascade.run: the score and deciding stage of every
+    event decided early (pending events have NaN scores and stage None),
+    and the text embeddings computed along the way so later stages do not
+    encode the same descriptions again.
+    """
+
+    def __init__(self, n: int):
+        self.scores = np.full(n, np.nan)
+        self.stages: List[Optional[str]] = [None] * n
+        self.text: Optional[np.ndarray] = None
+        self.has_text = np.zeros(n, dtype=bool)
+
+    @property
+    def pending(self) -> np.ndarray:
+        return np.flatnonzero(np.isnan(self.scores))
+
+
+class ThreatCascade:
+    """
+    Early-exit scoring ahead of HybridThreatModel's full CNN-LSTM + BERT +
+    gradient boosting path.
+
+    Stage 'tabular' is a small histogram gradient-boosted ensemble on summary
+    statistics of the event sequence and needs neither network. Stage
+    'text' adds the description embedding, usually an embedding-cache
+    hit, to a logistic regression. Only events whose score lands inside a
+    stage's uncertainty band continue; whatever is left after the last
+    stage takes the full path. bands maps stage name to (low, high) or
+    None to skip the stage; wider bands send more traffic downstream.
+    """
+
+    def __init__(self, bands: Optional[Mapping[str, Optional[Tuple[float, float]]]] = None,
+                 tabular_model=None, text_model=None):
+        bands = dict(DEFAULT_BANDS, **(bands or {}))
+        self.stages = [
+            CascadeStage(TABULAR_STAGE,
+                         tabular_model or build_boosting_stage('hist', n_estimators=50, max_depth=3),
+                         bands[TABULAR_STAGE]),
+            CascadeStage(TEXT_STAGE, text_model or LogisticRegression(max_iter=1000),
+                         bands[TEXT_STAGE], uses_text=True)
+        ]
+        self.fitted = False
+        self._lock = threading.Lock()
+        self._decided = {name: 0 for name in self.stage_names}
+
+    @property
+    def stage_names(self) -> List[str]:
+        return [stage.name for stage in self.stages] + [FULL_STAGE]
+
+    @property
+    def bands(self) -> Dict[str, Optional[Tuple[float, float]]]:
+        return {stage.name: stage.band for stage in self.stages}
+
+    def set_bands(self, bands: Mapping[str, Optional[Tuple[float, float]]]) -> 'ThreatCascade':
+        for stage in self.stages:
+            if stage.name in bands:
+                stage.band = bands[stage.name]
+        return self
+
+    def fit(self, tabular: np.ndarray, text: np.ndarray, labels: np.ndarray) -> 'ThreatCascade':
+        """Fit every stage on a labelled replay set"""
+        for stage in self.stages:
+            features = np.concatenate([tabular, text], axis=1) if stage.uses_text else tabular
+            stage.model.fit(features, labels)
+        self.fitted = True
+        return self
+
+    def run(self, tabular: np.ndarray, text_fn: Callable[[Sequence[int]], np.ndarray]) -> CascadeResult:
+        """
+        Score events through the cheap stages. text_fn(indices) returns the
+        text embeddings of the given events and is called at most once,
+        for the events still pending when the first text stage is reached.
+        """
+        if not self.fitted:
+            raise RuntimeError("ThreatCascade has not been fitted; call fit on a labelled replay set first")
+        result = CascadeResult(len(tabular))
+        pending = np.arange(len(tabular))
+        for stage in self.stages:
+            if stage.band is None or not len(pending):
+                continue
+            text = None
+            if stage.uses_text:
+                missing = pending[~result.has_text[pending]]
+                if len(missing):
+                    embeddings = np.asarray(text_fn(missing.tolist()))
+                    if result.text is None:
+                        result.text = np.zeros((len(tabular), embeddings.shape[1]), dtype=np.float32)
+                    result.text[missing] = embeddings
+                    result.has_text[missing] = True
+                text = result.text[pending]
+
+            scores = stage.score(tabular[pending], text)
+            decided = stage.decides(scores)
+            result.scores[pending[decided]] = scores[decided]
+            for idx in pending[decided].tolist():
+                result.stages[idx] = stage.name
+            with self._lock:
+                self._decided[stage.name] += int(decided.sum())
+            pending = pending[~decided]
+        return result
+
+    def record_full(self, n: int):
+        with self._lock:
+            self._decided[FULL_STAGE] += n
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = sum(self._decided.values())
+        return {
+            'events': total,
+            'decided_by': dict(self._decided),
+            'early_exit_rate': 1 - self._decided[FULL_STAGE] / total if total else 0.0,
+            'bands': self.bands
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'bands': self.bands, 'models': {stage.name: stage.model for stage in self.stages},
+                'fitted': self.fitted}
+
+    def set_state(self, state: Dict[str, Any]) -> 'ThreatCascade':
+        for stage in self.stages:
+            stage.model = state['models'][stage.name]
+            band = state['bands'].get(stage.name)
+            stage.band = tuple(band) if band is not None else None
+        self.fitted = state['fitted']
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,127 @@
+import os
+import threading
+import logging
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+from typing import Dict, Optional
+
+DEFAULT_MODEL_NAME = 'bert-base-uncased'
+STATE_FILE = 'model_state.pt'
+
+
+def _default_cache_dir() -> str:
+    return os.environ.get(
+        'BERT_CACHE_DIR',
+        os.path.join(os.environ.get('MODEL_PATH', 'models'), 'bert')
+    )
+
+
+class BertEncoder:
+    """
+    Lazily loaded, eval-mode BERT model and tokenizer shared by every model
+    in the process. Weights are loaded on first access of model/tokenizer.
+    """
+
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None, use_mmap: bool = True):
+        self.model_name = model_name
+        self.cache_dir = cache_dir if cache_dir is not None else _default_cache_dir()
+        self.use_mmap = use_mmap
+        self.logger = logging.getLogger(__name__)
+        self._model = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> BertModel:
+        if self._model is None:
+            self.load()
+        return self._model
+
+    @property
+    def tokenizer(self) -> BertTokenizerFast:
+        if self._tokenizer is None:
+            self.load()
+        return self._tokenizer
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def local_dir(self) -> str:
+        return os.path.join(self.cache_dir, self.model_name.replace('/', '--'))
+
+    def load(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            try:
+                tokenizer, model = self._load_local() if self._has_local_copy() else self._load_remote()
+            except Exception as e:
+                self.logger.error(f"Error loading BERT encoder {self.model_name}: {str(e)}")
+                raise
+
+            model.eval()
+            for param in model.parameters():
+                param.requires_grad = False
+            self._tokenizer = tokenizer
+            self._model = model
+
+    def _has_local_copy(self) -> bool:
+        return os.path.exists(os.path.join(self.local_dir, STATE_FILE))
+
+    def _load_local(self):
+        tokenizer = BertTokenizerFast.from_pretrained(self.local_dir)
+        config = BertConfig.from_pretrained(self.local_dir)
+        state_path = os.path.join(self.local_dir, STATE_FILE)
+
+        if self.use_mmap:
+            try:
+                # Tensors stay backed by the file mapping, so forked workers
+                # and sibling processes share the same page cache
+                state = torch.load(state_path, mmap=True, weights_only=True)
+                model = BertModel(config)
+                model.load_state_dict(state, assign=True)
+                return tokenizer, model
+            except TypeError:
+                self.logger.warning("torch does not support mmap loading, reading weights into memory")
+
+        model = BertModel(config)
+        model.load_state_dict(torch.load(state_path, map_location='cpu'))
+        return tokenizer, model
+
+    def _load_remote(self):
+        tokenizer = BertTokenizerFast.from_pretrained(self.model_name)
+        model = BertModel.from_pretrained(self.model_name)
+        self._write_local_copy(tokenizer, model)
+        return tokenizer, model
+
+    def _write_local_copy(self, tokenizer: BertTokenizerFast, model: BertModel):
+        try:
+            os.makedirs(self.local_dir, exist_ok=True)
+            tokenizer.save_pretrained(self.local_dir)
+            model.config.save_pretrained(self.local_dir)
+            tmp_path = os.path.join(self.local_dir, STATE_FILE + '.tmp')
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, os.path.join(self.local_dir, STATE_FILE))
+        except OSError as e:
+            self.logger.warning(f"Could not cache BERT weights in {self.local_dir}: {str(e)}")
+
+
+_encoders: Dict[str, BertEncoder] = {}
+_registry_lock = threading.Lock()
+
+
+def get_bert_encoder(model_name: str = DEFAULT_MODEL_NAME) -> BertEncoder:
+    """Return the process-wide encoder for model_name without loading it"""
+    with _registry_lock:
+        if model_name not in _encoders:
+            _encoders[model_name] = BertEncoder(model_name)
+        return _encoders[model_name]
+
+
+def preload(model_name: str = DEFAULT_MODEL_NAME) -> BertEncoder:
+    """Load the encoder eagerly, e.g. in a parent process before forking workers"""
+    encoder = get_bert_encoder(model_name)
+    encoder.load()
+    return encoder
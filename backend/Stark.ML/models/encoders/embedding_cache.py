@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(
+    r'\b(?:\d{1,3}\.){3}\d{1,3}\b'          # IPv4 addresses
+    r'|\b[0-9a-f]{8,}\b'                     # hashes, hex ids
+    r'|\b\d+\b'                              # plain numbers
+)
+
+
+def normalize_text(text: str, mask_literals: bool = False) -> str:
+    """
+    Normalize a description for cache keying. Lowercasing and whitespace
+    collapsing do not change what the uncased BERT tokenizer sees; masking
+    literals (IPs, numbers, hex ids) trades exactness for hit rate.
+    """
+    text = _WHITESPACE.sub(' ', text.strip().lower())
+    if mask_literals:
+        text = _LITERALS.sub('<*>', text)
+    return text
+
+
+class DiskEmbeddingStore:
+    """
+    Fixed-capacity on-disk embedding tier backed by numpy memmaps. Slots are
+    reused in ring order once the store is full. Every slot keeps the
+    expiry time it was written with (inf for none); expired slots read as
+    misses. The fill level and next ring slot live in a memmapped counter
+    updated by every put, so entries survive a restart without a flush;
+    flush() only forces the pages to disk.
+    """
+
+    def __init__(self, path: str, dim: int, capacity: int = 100000):
+        self.path = path
+        self.dim = dim
+        self.capacity = capacity
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        reuse = meta.get('dim') == dim and meta.get('capacity') == capacity
+        mode = 'r+' if reuse else 'w+'
+
+        self.vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32,
+                                 mode=mode, shape=(capacity, dim))
+        self.keys = np.memmap(os.path.join(path, 'keys.u8'), dtype=np.uint8,
+                              mode=mode, shape=(capacity, 16))
+        expires_path = os.path.join(path, 'expires.f64')
+        has_expiry = reuse and os.path.exists(expires_path)
+        self.expires = np.memmap(expires_path, dtype=np.float64,
+                                 mode='r+' if has_expiry else 'w+', shape=(capacity,))
+        if not has_expiry:
+            self.expires[:] = np.inf
+        # [size, next_slot]
+        counters_path = os.path.join(path, 'counters.i64')
+        has_counters = reuse and os.path.exists(counters_path)
+        self.counters = np.memmap(counters_path, dtype=np.int64, mode='r+' if has_counters else 'w+', shape=(2,))
+        if not has_counters:
+            self.counters[:] = (meta.get('size', 0), meta.get('next_slot', 0)) if reuse else (0, 0)
+        if not reuse:
+            self._write_meta()
+        self.index: Dict[bytes, int] = {
+            self.keys[slot].tobytes(): slot for slot in range(self.size)
+        }
+
+    @property
+    def size(self) -> int:
+        return int(self.counters[0])
+
+    @property
+    def next_slot(self) -> int:
+        return int(self.counters[1])
+
+    def get(self, key: bytes, now: float = -np.inf) -> Optional[Tuple[np.ndarray, float]]:
+        """Vector and expiry time of key, or None when missing or expired at now"""
+        slot = self.index.get(key)
+        if slot is None or self.expires[slot] <= now:
+            return None
+        return np.array(self.vectors[slot]), float(self.expires[slot])
+
+    def put(self, key: bytes, vector: np.ndarray, expires_at: Optional[float] = None):
+        slot = self.index.get(key)
+        if slot is None:
+            slot = self.next_slot
+            if self.size == self.capacity:
+                self.index.pop(self.keys[slot].tobytes(), None)
+            self.vectors[slot] = vector
+            self.expires[slot] = np.inf if expires_at is None else expires_at
+            self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            self.counters[:] = (min(self.size + 1, self.capacity), (slot + 1) % self.capacity)
+            self.index[key] = slot
+            return
+        self.vectors[slot] = vector
+        self.expires[slot] = np.inf if expires_at is None else expires_at
+
+    def flush(self):
+        self.vectors.flush()
+        self.keys.flush()
+        self.expires.flush()
+        self.counters.flush()
+        self._write_meta()
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                'dim': self.dim,
+                'capacity': self.capacity,
+                'size': self.size,
+                'next_slot': self.next_slot
+            }, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+
+class EmbeddingCache:
+    """
+    Bounded in-memory cache of text embeddings keyed on a hash of the
+    normalized text, with LRU eviction, optional TTL and an optional
+    memmap-backed disk tier that survives restarts. The disk tier stores
+    each entry's expiry, so clock must be wall time for the TTL to hold
+    across restarts. Returned vectors are read-only.
+    """
+
+    def __init__(self, max_memory_mb: float = 64.0, ttl_seconds: Optional[float] = None,
+                 disk_path: Optional[str] = None, disk_capacity: int = 100000,
+                 dim: int = 768, mask_literals: bool = False,
+                 clock: Callable[[], float] = time.time):
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self.dim = dim
+        self.mask_literals = mask_literals
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = DiskEmbeddingStore(disk_path, dim, disk_capacity) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def make_key(self, text: str) -> bytes:
+        normalized = normalize_text(text, self.mask_literals)
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                self._remove(key)
+
+            if self._disk is not None:
+                stored = self._disk.get(key, now)
+                if stored is not None:
+                    vector, expires_at = stored
+                    vector.setflags(write=False)
+                    self.disk_hits += 1
+                    self.hits += 1
+                    # Keep the expiry it was written with rather than starting a new TTL
+                    self._insert(key, vector, None if np.isinf(expires_at) else expires_at)
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, vector: np.ndarray):
+        # Own copy, so neither the caller nor readers can change the cached vector
+        vector = np.array(vector, dtype=np.float32).reshape(-1)
+        vector.setflags(write=False)
+        with self._lock:
+            expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+            self._insert(key, vector, expires_at)
+            if self._disk is not None:
+                self._disk.put(key, vector, expires_at)
+
+    def flush(self):
+        """Persist the disk tier, if configured"""
+        with self._lock:
+            if self._disk is not None:
+                self._disk.flush()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'memory_bytes': self._bytes
+        }
+
+    def _insert(self, key: bytes, vector: np.ndarray, expires_at: Optional[float]):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (vector, expires_at)
+        self._bytes += vector.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: bytes):
+        vector, _ = self._entries.pop(key)
+        self._bytes -= vector.nbytes
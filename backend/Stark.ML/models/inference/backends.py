@@ -0,0 +1,210 @@
+import os
+import time
+import hashlib
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, Optional
+
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+
+
+def default_backend_name() -> str:
+    return os.environ.get('INFERENCE_BACKEND', 'torch')
+
+
+def default_export_dir() -> str:
+    return os.path.join(os.environ.get('MODEL_PATH', 'models'), 'onnx')
+
+
+def weights_digest(graph: nn.Module) -> str:
+    """Short hash of the graph's parameters and buffers, used to key exported files"""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, tensor in graph.state_dict().items():
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _write_atomically(path: str, write):
+    """
+    Call write(tmp_path) and move the result to path. Concurrent writers
+    each use their own temp file, so readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def export_onnx(graph: nn.Module, export_path: str) -> str:
+    """Export graph to export_path unless an export already exists there"""
+    if os.path.exists(export_path):
+        return export_path
+    graph.eval()
+    dummy_ids = torch.ones((2, 16), dtype=torch.long)
+    dummy_mask = torch.ones((2, 16), dtype=torch.long)
+    dynamic_axes = {
+        'input_ids': {0: 'batch', 1: 'sequence'},
+        'attention_mask': {0: 'batch', 1: 'sequence'},
+        'output': {0: 'batch'}
+    }
+
+    def write(path):
+        with torch.no_grad():
+            torch.onnx.export(
+                graph,
+                (dummy_ids, dummy_mask),
+                path,
+                input_names=['input_ids', 'attention_mask'],
+                output_names=['output'],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+    return _write_atomically(export_path, write)
+
+
+class ThreatClassifierGraph(nn.Module):
+    """BERT pooled output followed by the threat classifier head, as probabilities"""
+
+    def __init__(self, bert: nn.Module, classifier: nn.Module):
+        super().__init__()
+        self.bert = bert
+        self.classifier = classifier
+
+    def forward(self, input_ids, attention_mask):
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        return torch.softmax(self.classifier(outputs.pooler_output), dim=1)
+
+
+class MeanPooledEncoderGraph(nn.Module):
+    """BERT last hidden state averaged over non-padding tokens"""
+
+    def __init__(self, bert: nn.Module):
+        super().__init__()
+        self.bert = bert
+
+    def forward(self, input_ids, attention_mask):
+        hidden = self.bert(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        return (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+
+
+class TorchBackend:
+    """Eager PyTorch execution, optionally with int8 dynamic quantization of Linear layers"""
+
+    def __init__(self, graph: nn.Module, quantize: bool = False):
+        graph.eval()
+        if quantize:
+            graph = torch.quantization.quantize_dynamic(graph, {nn.Linear}, dtype=torch.qint8)
+        self.graph = graph
+        self.name = 'torch-int8' if quantize else 'torch'
+
+    def run(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            return self.graph(
+                torch.from_numpy(np.asarray(input_ids, dtype=np.int64)),
+                torch.from_numpy(np.asarray(attention_mask, dtype=np.int64))
+            ).numpy()
+
+
+class OnnxRuntimeBackend:
+    """
+    Exports the graph to ONNX and runs it with onnxruntime on CPU. An
+    existing export at export_path is reused, so the path must identify
+    the weights (create_backend keys it by weights_digest).
+    """
+
+    def __init__(self, graph: nn.Module, export_path: str, quantize: bool = False,
+                 intra_op_threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The onnx backends require the onnxruntime package") from e
+
+        self.name = 'onnx-int8' if quantize else 'onnx'
+        self.export_path = export_path
+        model_path = export_onnx(graph, export_path)
+        if quantize:
+            model_path = self._quantize(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.output_name = self.session.get_outputs()[0].name
+
+    def run(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.session.run([self.output_name], {
+            'input_ids': np.asarray(input_ids, dtype=np.int64),
+            'attention_mask': np.asarray(attention_mask, dtype=np.int64)
+        })[0]
+
+    def _quantize(self, model_path: str) -> str:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = model_path[:-len('.onnx')] + '.int8.onnx'
+        if os.path.exists(quantized_path):
+            return quantized_path
+        return _write_atomically(quantized_path,
+                                 lambda path: quantize_dynamic(model_path, path, weight_type=QuantType.QInt8))
+
+
+def create_backend(name: str, graph: nn.Module, export_name: str,
+                   export_dir: Optional[str] = None):
+    """
+    Build an inference backend for graph. Backends snapshot the weights at
+    creation time, so rebuild them after training or loading new weights.
+    ONNX exports are named <export_name>-<weights digest>.onnx, so workers
+    sharing export_dir reuse one export per set of weights.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {BACKENDS}")
+
+    if name.startswith('torch'):
+        return TorchBackend(graph, quantize=name == 'torch-int8')
+
+    export_path = os.path.join(export_dir or default_export_dir(),
+                               f"{export_name}-{weights_digest(graph)}.onnx")
+    return OnnxRuntimeBackend(graph, export_path, quantize=name == 'onnx-int8')
+
+
+def compare_backends(reference, candidate, input_ids: np.ndarray, attention_mask: np.ndarray,
+                     repeats: int = 20) -> Dict[str, float]:
+    """
+    Accuracy parity and latency of a candidate backend against a reference
+    on the same inputs. Argmax agreement is only meaningful for
+    classification outputs.
+    """
+    expected = reference.run(input_ids, attention_mask)
+    actual = candidate.run(input_ids, attention_mask)
+
+    def timed(backend):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            backend.run(input_ids, attention_mask)
+            timings.append(time.perf_counter() - start)
+        return np.array(timings)
+
+    ref_times = timed(reference)
+    cand_times = timed(candidate)
+    batch = len(input_ids)
+
+    return {
+        'max_abs_diff': float(np.max(np.abs(expected - actual))),
+        'mean_abs_diff': float(np.mean(np.abs(expected - actual))),
+        'argmax_agreement': float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1))),
+        'reference_latency_ms': float(np.median(ref_times) * 1000),
+        'candidate_latency_ms': float(np.median(cand_times) * 1000),
+        'reference_throughput': float(batch / np.median(ref_times)),
+        'candidate_throughput': float(batch / np.median(cand_times)),
+        'speedup': float(np.median(ref_times) / np.median(cand_times))
+    }
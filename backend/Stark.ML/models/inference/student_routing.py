@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, Optional
+from sklearn.metrics import roc_auc_score
+
+
+class StudentRouter:
+    """
+    Serve a distilled student model and escalate only borderline rows to
+    the teacher. A row is borderline when the student's score lies within
+    escalation_margin of the decision threshold; those rows are re-scored
+    by the teacher in one call and take its score. A margin of 0 (or no
+    teacher) serves the student alone.
+
+    Callable like CompiledPredictor, so it can stand in for a model's
+    predictor: data in, (n, 1) scores out.
+    """
+
+    def __init__(self, student: Callable[[np.ndarray], np.ndarray],
+                 teacher: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 threshold: float = 0.5, escalation_margin: float = 0.1):
+        self.student = student
+        self.teacher = teacher
+        self.threshold = threshold
+        self.escalation_margin = escalation_margin
+        self.calls = 0
+        self.events = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, data: np.ndarray) -> np.ndarray:
+        data = np.asarray(data)
+        scores = np.array(self.student(data), dtype=np.float32).reshape(len(data), -1)
+        escalate = self.borderline(scores[:, 0])
+        n_escalated = int(escalate.sum())
+        if n_escalated:
+            scores[escalate] = np.asarray(self.teacher(data[escalate]), dtype=np.float32).reshape(n_escalated, -1)
+        with self._lock:
+            self.calls += 1
+            self.events += len(data)
+            self.escalated += n_escalated
+        return scores
+
+    def borderline(self, scores: np.ndarray) -> np.ndarray:
+        if self.teacher is None or not self.escalation_margin:
+            return np.zeros(len(scores), dtype=bool)
+        return np.abs(scores - self.threshold) < self.escalation_margin
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'events': self.events,
+            'escalated': self.escalated,
+            'escalation_rate': self.escalated / self.events if self.events else 0.0
+        }
+
+
+def compare_to_teacher(teacher_scores: np.ndarray, student_scores: np.ndarray, threshold: float = 0.5,
+                       labels: Optional[np.ndarray] = None,
+                       escalation_margin: Optional[float] = None) -> Dict[str, Any]:
+    """
+    How closely a student reproduces its teacher on held-out data:
+    decision agreement at threshold, mean absolute score difference, and
+    the student's AUC at recovering the teacher's decisions. With labels,
+    both models' AUC on the true labels; with escalation_margin, the share
+    of rows a StudentRouter would escalate and the agreement after
+    escalation. AUCs are None when only one class is present.
+    """
+    teacher_scores = np.asarray(teacher_scores, dtype=np.float64).reshape(-1)
+    student_scores = np.asarray(student_scores, dtype=np.float64).reshape(-1)
+    teacher_decisions = teacher_scores > threshold
+    report = {
+        'events': len(teacher_scores),
+        'agreement': float(np.mean(teacher_decisions == (student_scores > threshold))),
+        'mean_abs_diff': float(np.mean(np.abs(teacher_scores - student_scores))),
+        'auc_vs_teacher': _auc(teacher_decisions, student_scores)
+    }
+    if labels is not None:
+        labels = np.asarray(labels).reshape(-1)
+        report['teacher_auc'] = _auc(labels, teacher_scores)
+        report['student_auc'] = _auc(labels, student_scores)
+    if escalation_margin is not None:
+        escalate = np.abs(student_scores - threshold) < escalation_margin
+        routed = np.where(escalate, teacher_scores, student_scores)
+        report['escalation_rate'] = float(escalate.mean())
+        report['routed_agreement'] = float(np.mean(teacher_decisions == (routed > threshold)))
+    return report
+
+
+def _auc(labels: np.ndarray, scores: np.ndarray) -> Optional[float]:
+    if len(np.unique(labels)) < 2:
+        return None
+    return float(roc_auc_score(labels, scores))
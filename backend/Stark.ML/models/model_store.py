@@ -0,0 +1,221 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import numpy as np
+import joblib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FILE = 'manifest.json'
+LATEST_FILE = 'LATEST'
+
+
+class ModelIntegrityError(Exception):
+    """Raised when a stored artifact does not match its recorded checksum"""
+
+
+def default_model_path() -> str:
+    return os.environ.get('MODEL_PATH', 'models')
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_keras(obj: Any) -> bool:
+    return hasattr(obj, 'get_weights') and hasattr(obj, 'set_weights')
+
+
+def _is_torch(obj: Any) -> bool:
+    return hasattr(obj, 'state_dict') and hasattr(obj, 'load_state_dict')
+
+
+class ModelStore:
+    """
+    Versioned artifact store under MODEL_PATH. Each save writes a new
+    version directory holding Keras weights (one .npy per tensor), PyTorch
+    state dicts and joblib-pickled estimators, plus a manifest with the
+    size and SHA-256 checksum of every file. Loads read arrays through
+    memory maps so startup does not parse weight files and workers share
+    the page cache.
+
+    Loads only compare file sizes by default; hashing every artifact would
+    read each file in full and undo the memory-mapped warm start. Pass
+    verify=True (to the store or to load) to check the checksums as well.
+
+        <root>/<model_name>/<version>/manifest.json
+        <root>/<model_name>/LATEST
+    """
+
+    def __init__(self, root: Optional[str] = None, verify: bool = False):
+        self.root = root if root is not None else default_model_path()
+        self.verify = verify
+        self.logger = logging.getLogger(__name__)
+
+    def model_dir(self, model_name: str) -> str:
+        return os.path.join(self.root, model_name)
+
+    def checkpoint_path(self, model_name: str, filename: str = 'best_model.h5') -> str:
+        path = os.path.join(self.model_dir(model_name), 'checkpoints')
+        os.makedirs(path, exist_ok=True)
+        return os.path.join(path, filename)
+
+    def list_versions(self, model_name: str) -> List[str]:
+        model_dir = self.model_dir(model_name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if os.path.exists(os.path.join(model_dir, entry, MANIFEST_FILE))
+        )
+
+    def latest_version(self, model_name: str) -> Optional[str]:
+        latest = os.path.join(self.model_dir(model_name), LATEST_FILE)
+        if not os.path.exists(latest):
+            return None
+        with open(latest) as f:
+            return f.read().strip() or None
+
+    def save(self, model_name: str, artifacts: Dict[str, Any], version: Optional[str] = None,
+             metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Write all artifacts as a new version and point LATEST at it"""
+        version = version or datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+        final_dir = os.path.join(self.model_dir(model_name), version)
+        if os.path.exists(final_dir):
+            raise FileExistsError(f"Version {version} of {model_name} already exists")
+        tmp_dir = final_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        try:
+            manifest = {
+                'model_name': model_name,
+                'version': version,
+                'created_at': datetime.utcnow().isoformat() + 'Z',
+                'metadata': metadata or {},
+                'artifacts': {
+                    name: self._save_artifact(tmp_dir, name, obj)
+                    for name, obj in artifacts.items()
+                }
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_dir, final_dir)
+        except Exception as e:
+            self.logger.error(f"Error saving {model_name} version {version}: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        latest_tmp = os.path.join(self.model_dir(model_name), LATEST_FILE + '.tmp')
+        with open(latest_tmp, 'w') as f:
+            f.write(version)
+        os.replace(latest_tmp, os.path.join(self.model_dir(model_name), LATEST_FILE))
+        return version
+
+    def load(self, model_name: str, targets: Optional[Dict[str, Any]] = None,
+             version: Optional[str] = None, verify: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Load a version (default LATEST). Keras models and torch modules given
+        in targets receive their weights in place; other artifacts are
+        returned as loaded objects. The manifest metadata is returned under
+        the '_metadata' key. verify overrides the store's checksum setting.
+        """
+        targets = targets or {}
+        verify = self.verify if verify is None else verify
+        version, manifest = self._read_manifest(model_name, version)
+        version_dir = os.path.join(self.model_dir(model_name), version)
+
+        loaded = {'_metadata': dict(manifest.get('metadata', {}), version=version)}
+        for name, entry in manifest['artifacts'].items():
+            self._verify(version_dir, entry, checksums=verify)
+            loaded[name] = self._load_artifact(version_dir, entry, targets.get(name))
+        return loaded
+
+    def read_metadata(self, model_name: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Metadata of a version (default LATEST) without loading its artifacts"""
+        version, manifest = self._read_manifest(model_name, version)
+        return dict(manifest.get('metadata', {}), version=version)
+
+    def _read_manifest(self, model_name: str, version: Optional[str]):
+        version = version or self.latest_version(model_name)
+        if version is None:
+            raise FileNotFoundError(f"No stored versions of {model_name} in {self.root}")
+        with open(os.path.join(self.model_dir(model_name), version, MANIFEST_FILE)) as f:
+            return version, json.load(f)
+
+    def _save_artifact(self, directory: str, name: str, obj: Any) -> Dict[str, Any]:
+        if _is_keras(obj):
+            os.makedirs(os.path.join(directory, name))
+            files = []
+            for idx, weight in enumerate(obj.get_weights()):
+                rel = os.path.join(name, f"{idx:04d}.npy")
+                np.save(os.path.join(directory, rel), weight)
+                files.append(rel)
+            kind = 'keras'
+        elif _is_torch(obj):
+            import torch
+
+            files = [f"{name}.pt"]
+            torch.save(obj.state_dict(), os.path.join(directory, files[0]))
+            kind = 'torch'
+        elif isinstance(obj, np.ndarray):
+            files = [f"{name}.npy"]
+            np.save(os.path.join(directory, files[0]), obj)
+            kind = 'numpy'
+        else:
+            files = [f"{name}.joblib"]
+            joblib.dump(obj, os.path.join(directory, files[0]))
+            kind = 'joblib'
+
+        return {
+            'kind': kind,
+            'files': files,
+            'sizes': {rel: os.path.getsize(os.path.join(directory, rel)) for rel in files},
+            'sha256': {rel: _sha256(os.path.join(directory, rel)) for rel in files}
+        }
+
+    def _verify(self, directory: str, entry: Dict[str, Any], checksums: bool):
+        # Manifests written before sizes were recorded only carry checksums
+        for rel, expected in entry.get('sizes', {}).items():
+            if os.path.getsize(os.path.join(directory, rel)) != expected:
+                raise ModelIntegrityError(f"Size mismatch for {rel} in {directory}")
+        if not checksums:
+            return
+        for rel, expected in entry['sha256'].items():
+            actual = _sha256(os.path.join(directory, rel))
+            if actual != expected:
+                raise ModelIntegrityError(f"Checksum mismatch for {rel} in {directory}")
+
+    def _load_artifact(self, directory: str, entry: Dict[str, Any], target: Any) -> Any:
+        paths = [os.path.join(directory, rel) for rel in entry['files']]
+        kind = entry['kind']
+
+        if kind == 'keras':
+            weights = [np.load(path, mmap_mode='r') for path in paths]
+            if target is None:
+                return weights
+            target.set_weights(weights)
+            return target
+        if kind == 'torch':
+            import torch
+
+            try:
+                state = torch.load(paths[0], mmap=True, weights_only=True)
+            except TypeError:
+                state = torch.load(paths[0], map_location='cpu')
+            if target is None:
+                return state
+            try:
+                target.load_state_dict(state, assign=True)
+            except TypeError:
+                target.load_state_dict(state)
+            return target
+        if kind == 'numpy':
+            return np.load(paths[0], mmap_mode='r')
+        return joblib.load(paths[0], mmap_mode='r')
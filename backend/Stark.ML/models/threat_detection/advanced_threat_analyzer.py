@@ -1,26 +1,61 @@
 import torch
 import torch.nn as nn
-from transformers import BertModel, BertTokenizer
+from transformers import BertModel, BertTokenizerFast
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
+from ..encoders.bert_encoder import get_bert_encoder
+from ..inference.backends import ThreatClassifierGraph, create_backend, default_backend_name
+from ..model_store import ModelStore
+
+THREAT_LEVELS = ['LOW', 'GUARDED', 'ELEVATED', 'HIGH', 'SEVERE']
 
 class AdvancedThreatAnalyzer:
-    def __init__(self):
-        self.bert_model = self._initialize_bert()
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        self.threat_classifier = self._build_classifier()
+    MODEL_NAME = 'advanced_threat_analyzer'
+    
+    def __init__(self, backend: Optional[str] = None, model_store: Optional[ModelStore] = None):
         self.logger = logging.getLogger(__name__)
+        self.model_store = model_store or ModelStore()
+        self.encoder = get_bert_encoder('bert-base-uncased')
+        self.threat_classifier = self._build_classifier()
+        self.threat_classifier.eval()
+        self.backend_name = backend or default_backend_name()
+        self._backend = None
         
-    def _initialize_bert(self) -> BertModel:
-        try:
-            model = BertModel.from_pretrained('bert-base-uncased')
-            for param in model.parameters():
-                param.requires_grad = True
-            return model
-        except Exception as e:
-            self.logger.error(f"Error initializing BERT model: {str(e)}")
-            raise
+    @property
+    def bert_model(self) -> BertModel:
+        # Shared, frozen eval-mode instance; loaded on first use
+        return self.encoder.model
+    
+    @property
+    def tokenizer(self) -> BertTokenizerFast:
+        return self.encoder.tokenizer
+        
+    @property
+    def inference_backend(self):
+        """Backend running BERT and the classifier head; built on first use"""
+        if self._backend is None:
+            self._backend = create_backend(
+                self.backend_name,
+                ThreatClassifierGraph(self.bert_model, self.threat_classifier),
+                'advanced_threat_analyzer'
+            )
+        return self._backend
+    
+    def reset_backend(self):
+        """Drop the backend so it is rebuilt from the current weights"""
+        self._backend = None
+        
+    def save(self, version: Optional[str] = None) -> str:
+        """Persist the classifier head; BERT weights come from the shared encoder cache"""
+        return self.model_store.save(self.MODEL_NAME, {'threat_classifier': self.threat_classifier}, version)
+    
+    def load(self, version: Optional[str] = None) -> str:
+        """Restore a stored version (default latest) and return its version id"""
+        loaded = self.model_store.load(self.MODEL_NAME, {'threat_classifier': self.threat_classifier}, version)
+        self.threat_classifier.eval()
+        self.reset_backend()
+        return loaded['_metadata']['version']
         
     def _build_classifier(self) -> nn.Sequential:
         return nn.Sequential(
@@ -36,71 +71,93 @@ class AdvancedThreatAnalyzer:
         )
     
     def analyze(self, text_data: str) -> Dict[str, Any]:
+        return self.analyze_batch([text_data])[0]
+    
+    def analyze_batch(self, texts: List[str], batch_size: int = 64) -> List[Dict[str, Any]]:
+        """
+        Analyze many texts at once. Texts are sorted by token length and run
+        in chunks padded only to the longest text in the chunk; results are
+        returned in input order.
+        """
+        if not texts:
+            return []
         try:
-            # Tokenize input
-            encoded = self.tokenizer(
-                text_data,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors='pt'
-            )
-            
-            with torch.no_grad():
-                # Get BERT embeddings
-                outputs = self.bert_model(
-                    input_ids=encoded['input_ids'],
-                    attention_mask=encoded['attention_mask']
-                )
-                
-                # Get pooled output
-                pooled_output = outputs.pooler_output
-                
-                # Get threat classification
-                threat_logits = self.threat_classifier(pooled_output)
-                threat_probs = torch.softmax(threat_logits, dim=1)
-                
-            # Generate detailed analysis
-            analysis_result = self._generate_detailed_analysis(threat_probs)
-            
-            return {
-                'threat_probabilities': threat_probs.numpy().tolist(),
-                'threat_level': self._get_threat_level(threat_probs),
-                'confidence_score': float(torch.max(threat_probs).item()),
-                'detailed_analysis': analysis_result
-            }
-            
+            probs = self._predict_probabilities(texts, batch_size)
+            return self._build_results(probs)
         except Exception as e:
             self.logger.error(f"Error during threat analysis: {str(e)}")
             raise
     
-    def _generate_detailed_analysis(self, probs: torch.Tensor) -> Dict[str, Any]:
-        threat_levels = ['LOW', 'GUARDED', 'ELEVATED', 'HIGH', 'SEVERE']
-        probs_np = probs.numpy()[0]
+    def _predict_probabilities(self, texts: List[str], batch_size: int) -> np.ndarray:
+        # Tokenize input without padding; padding happens per length bucket
+        encoded = self.tokenizer(
+            list(texts),
+            truncation=True,
+            max_length=512,
+            return_attention_mask=False
+        )
+        input_ids = encoded['input_ids']
+        lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(input_ids))
+        order = np.argsort(lengths, kind='stable')
+        pad_id = self.tokenizer.pad_token_id
         
-        return {
-            'threat_distribution': {
-                level: float(prob) 
-                for level, prob in zip(threat_levels, probs_np)
-            },
-            'primary_threat_level': threat_levels[np.argmax(probs_np)],
-            'confidence_metrics': {
-                'entropy': float(-np.sum(probs_np * np.log(probs_np + 1e-10))),
-                'max_probability': float(np.max(probs_np)),
-                'probability_spread': float(np.max(probs_np) - np.mean(probs_np))
-            },
-            'recommendation': self._generate_recommendation(probs_np)
-        }
+        backend = self.inference_backend
+        
+        probs = np.empty((len(texts), len(THREAT_LEVELS)), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            max_len = int(lengths[chunk[-1]])
+            
+            ids = np.full((len(chunk), max_len), pad_id, dtype=np.int64)
+            mask = np.zeros((len(chunk), max_len), dtype=np.int64)
+            for row, idx in enumerate(chunk):
+                ids[row, :lengths[idx]] = input_ids[idx]
+                mask[row, :lengths[idx]] = 1
+            
+            # BERT pooled output and threat classification in one backend call
+            probs[chunk] = backend.run(ids, mask)
+        
+        return probs
+    
+    def _build_results(self, probs: np.ndarray) -> List[Dict[str, Any]]:
+        # Confidence metrics for the whole batch at once
+        level_idx = np.argmax(probs, axis=1)
+        max_probs = probs[np.arange(len(probs)), level_idx]
+        entropy = -np.sum(probs * np.log(probs + 1e-10), axis=1)
+        spread = max_probs - probs.mean(axis=1)
+        
+        results = []
+        for row, level, max_prob, row_entropy, row_spread in zip(
+                probs.tolist(), level_idx.tolist(), max_probs.tolist(), entropy.tolist(), spread.tolist()):
+            threat_level = THREAT_LEVELS[level]
+            results.append({
+                'threat_probabilities': [row],
+                'threat_level': threat_level,
+                'confidence_score': max_prob,
+                'detailed_analysis': {
+                    'threat_distribution': dict(zip(THREAT_LEVELS, row)),
+                    'primary_threat_level': threat_level,
+                    'confidence_metrics': {
+                        'entropy': row_entropy,
+                        'max_probability': max_prob,
+                        'probability_spread': row_spread
+                    },
+                    'recommendation': self._recommendation_for(threat_level, max_prob)
+                }
+            })
+        return results
+    
+    def _generate_detailed_analysis(self, probs: torch.Tensor) -> Dict[str, Any]:
+        return self._build_results(probs.numpy())[0]['detailed_analysis']
     
     def _get_threat_level(self, probs: torch.Tensor) -> str:
-        levels = ['LOW', 'GUARDED', 'ELEVATED', 'HIGH', 'SEVERE']
         max_prob_idx = torch.argmax(probs, dim=1)
-        return levels[max_prob_idx]
+        return THREAT_LEVELS[max_prob_idx]
     
     def _generate_recommendation(self, probs: np.ndarray) -> Dict[str, Any]:
-        max_prob = np.max(probs)
-        threat_level = ['LOW', 'GUARDED', 'ELEVATED', 'HIGH', 'SEVERE'][np.argmax(probs)]
-        
+        return self._recommendation_for(THREAT_LEVELS[np.argmax(probs)], float(np.max(probs)))
+    
+    def _recommendation_for(self, threat_level: str, max_prob: float) -> Dict[str, Any]:
         recommendations = {
             'SEVERE': ['Immediate action required', 'Isolate affected systems', 'Engage incident response team'],
             'HIGH': ['Escalate to security team', 'Increase monitoring', 'Prepare incident response'],
@@ -1,117 +1,206 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from typing import Dict, List, Union, Tuple
+from sklearn.preprocessing import StandardScaler
+from typing import Dict, List, Optional, Union, Tuple
 import logging
+from .feature_schema import CategoricalSchema
+from .profile_store import ProfileStore
+from .temporal_features import DATA_PROCESSOR_FIELDS, epoch_seconds, temporal_features
+
+USER_PATTERN_COLUMNS = ['user_id', 'timestamp', 'event_type']
+NETWORK_PATTERN_COLUMNS = ['ip_address', 'timestamp', 'port']
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, categorical_schema: Optional[CategoricalSchema] = None,
+                 profile_store: Optional[ProfileStore] = None):
         self.scalers = {}
-        self.encoders = {}
+        self.categorical_schema = categorical_schema
+        # With a profile store, behavioral features describe each entity's
+        # whole history instead of the rows sharing the current batch
+        self.profile_store = profile_store
+        self.numerical_columns: Optional[List[str]] = None
+        self.behavioral_groups: Optional[List[str]] = None
+        self.has_timestamp = True
+        self.fitted = False
+        self._feature_plan = None
         self.logger = logging.getLogger(__name__)
-        
-    def process_security_data(self, raw_data: Union[Dict, List[Dict]]) -> np.ndarray:
+    
+    def fit(self, raw_data: Union[Dict, List[Dict]]) -> 'DataProcessor':
         """
-        Comprehensive preprocessing for security event data
+        Fit the column layout, categorical schema and all scalers once on
+        representative data; afterwards process_security_data only transforms
         """
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame(raw_data) if isinstance(raw_data, dict) else pd.DataFrame(raw_data)
-            
-            # Process different types of features
-            numerical_features = self._process_numerical(df)
-            categorical_features = self._process_categorical(df)
-            temporal_features = self._process_temporal(df)
-            behavioral_features = self._process_behavioral(df)
-            
-            # Combine all features
-            processed_data = np.concatenate([
-                numerical_features,
-                categorical_features,
-                temporal_features,
-                behavioral_features
-            ], axis=1)
-            
-            return processed_data
-            
+            df = self._to_frame(raw_data)
+            self.numerical_columns = list(df.select_dtypes(include=[np.number]).columns)
+            self.behavioral_groups = [col for col in ('user_id', 'ip_address') if col in df.columns]
+            self.has_timestamp = 'timestamp' in df.columns
+            if self.categorical_schema is None:
+                self.fit_schema(df)
+            live_profiles = self.profile_store
+            if live_profiles is not None:
+                # Fit the profile scaler on a scratch copy; fitting must not count events
+                self.profile_store = live_profiles.copy()
+            try:
+                self._process_frame(df, fit=True)
+            finally:
+                self.profile_store = live_profiles
+            self.fitted = True
+            self._feature_plan = None
+            return self
         except Exception as e:
-            self.logger.error(f"Error processing security data: {str(e)}")
+            self.logger.error(f"Error fitting data processor: {str(e)}")
             raise
+    
+    @property
+    def feature_plan(self):
+        """Compiled DataFrame-free transform; available once fitted"""
+        if not self.fitted:
+            raise RuntimeError("DataProcessor must be fitted before compiling a feature plan")
+        if self._feature_plan is None:
+            from .feature_plan import FeaturePlan
+            self._feature_plan = FeaturePlan.from_processor(self)
+        return self._feature_plan
+    
+    def process_security_data(self, raw_data: Union[Dict, List[Dict], pd.DataFrame], use_plan: bool = True) -> np.ndarray:
+        """
+        Comprehensive preprocessing for security event data.
         
-    def _process_numerical(self, df: pd.DataFrame) -> np.ndarray:
-        numerical_cols = df.select_dtypes(include=[np.number]).columns
+        Once fitted, events go through the compiled feature plan unless
+        use_plan=False; the output matches the DataFrame path column for
+        column. Unfitted processors refit their scalers on every call.
+        """
+        try:
+            if self.fitted and use_plan:
+                return self.feature_plan.transform(raw_data)
+            return self._process_frame(self._to_frame(raw_data), fit=not self.fitted)
+        
+        except Exception as e:
+            self.logger.error(f"Error processing security data: {str(e)}")
+            raise
+    
+    def _to_frame(self, raw_data: Union[Dict, List[Dict]]) -> pd.DataFrame:
+        # Convert to DataFrame; a single event becomes a one-row frame
+        df = pd.DataFrame([raw_data]) if isinstance(raw_data, dict) else pd.DataFrame(raw_data)
+        if self.fitted:
+            required = self.numerical_columns + list(self.categorical_schema.columns) + [
+                col for group in self.behavioral_groups
+                for col in (USER_PATTERN_COLUMNS if group == 'user_id' else NETWORK_PATTERN_COLUMNS)
+            ]
+            missing = [col for col in dict.fromkeys(required) if col not in df.columns]
+            for col in missing:
+                df[col] = np.nan
+        return df
+    
+    def _process_frame(self, df: pd.DataFrame, fit: bool) -> np.ndarray:
+        # Process different types of features
+        numerical_features = self._process_numerical(df, fit)
+        categorical_features = self._process_categorical(df)
+        temporal_features = self._process_temporal(df, fit)
+        behavioral_features = self._process_behavioral(df, fit)
         
-        if not numerical_cols.empty:
-            if 'numerical' not in self.scalers:
-                self.scalers['numerical'] = StandardScaler()
-            return self.scalers['numerical'].fit_transform(df[numerical_cols])
-        return np.array([])
+        # Combine all features
+        return np.concatenate([
+            numerical_features,
+            categorical_features,
+            temporal_features,
+            behavioral_features
+        ], axis=1)
+    
+    def _scale(self, name: str, features, fit: bool) -> np.ndarray:
+        if name not in self.scalers:
+            self.scalers[name] = StandardScaler()
+        if fit:
+            return self.scalers[name].fit_transform(features)
+        return self.scalers[name].transform(features)
+    
+    def _process_numerical(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        if self.fitted:
+            numerical_cols = self.numerical_columns
+        else:
+            numerical_cols = list(df.select_dtypes(include=[np.number]).columns)
         
+        if numerical_cols:
+            return self._scale('numerical', df[numerical_cols].to_numpy(dtype=np.float64), fit)
+        return np.empty((len(df), 0))
+    
+    def fit_schema(self, raw_data: Union[Dict, List[Dict]], **schema_options) -> CategoricalSchema:
+        """Freeze per-column vocabularies used for categorical codes"""
+        df = raw_data if isinstance(raw_data, pd.DataFrame) else self._to_frame(raw_data)
+        columns = list(df.select_dtypes(include=['object']).columns)
+        self.categorical_schema = CategoricalSchema(columns, **schema_options).fit(df)
+        self._feature_plan = None
+        return self.categorical_schema
+    
     def _process_categorical(self, df: pd.DataFrame) -> np.ndarray:
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        encoded_features = []
-        
-        for col in categorical_cols:
-            if col not in self.encoders:
-                self.encoders[col] = LabelEncoder()
-            encoded = self.encoders[col].fit_transform(df[col])
-            encoded_features.append(encoded.reshape(-1, 1))
-            
-        return np.concatenate(encoded_features, axis=1) if encoded_features else np.array([])
+        if self.categorical_schema is None:
+            self.logger.warning("No categorical schema fitted, freezing vocabulary from the first batch")
+            self.fit_schema(df)
+        if not self.categorical_schema.columns:
+            return np.empty((len(df), 0))
         
-    def _process_temporal(self, df: pd.DataFrame) -> np.ndarray:
-        if 'timestamp' not in df.columns:
+        # Stable integer codes per column; unseen values map to the OOV code
+        return self.categorical_schema.encode_codes(df)
+    
+    def _process_temporal(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        if 'timestamp' not in df.columns or (self.fitted and not self.has_timestamp):
             return np.zeros((len(df), 1))
-            
-        timestamps = pd.to_datetime(df['timestamp'])
-        temporal_features = np.column_stack([
-            timestamps.dt.hour,
-            timestamps.dt.dayofweek,
-            timestamps.dt.day,
-            timestamps.dt.month,
-            timestamps.dt.quarter,
-            timestamps.dt.year,
-            timestamps.dt.minute / 60.0  # Normalized minutes
-        ])
         
-        if 'temporal' not in self.scalers:
-            self.scalers['temporal'] = StandardScaler()
-        return self.scalers['temporal'].fit_transform(temporal_features)
+        # hour, day of week, day, month, quarter, year, normalized minutes
+        features = temporal_features(df['timestamp'], DATA_PROCESSOR_FIELDS)
         
-    def _process_behavioral(self, df: pd.DataFrame) -> np.ndarray:
+        return self._scale('temporal', features, fit)
+    
+    def _process_behavioral(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
         """Process behavioral patterns and user activity"""
+        if self.profile_store is not None:
+            profiles = self._scale('profiles', self.profile_store.update_many(df.to_dict('records')), fit)
+            return _impute_missing(profiles)
+        
         behavioral_features = []
+        groups = self.behavioral_groups if self.fitted else [
+            col for col in ('user_id', 'ip_address') if col in df.columns
+        ]
         
-        if 'user_id' in df.columns:
-            user_activity = self._extract_user_patterns(df)
+        if 'user_id' in groups:
+            user_activity = self._extract_user_patterns(df, fit)
             behavioral_features.append(user_activity)
-            
-        if 'ip_address' in df.columns:
-            network_patterns = self._extract_network_patterns(df)
+        
+        if 'ip_address' in groups:
+            network_patterns = self._extract_network_patterns(df, fit)
             behavioral_features.append(network_patterns)
-            
+        
         return np.concatenate(behavioral_features, axis=1) if behavioral_features else np.zeros((len(df), 1))
     
-    def _extract_user_patterns(self, df: pd.DataFrame) -> np.ndarray:
-        """Extract user behavior patterns"""
-        user_stats = df.groupby('user_id').agg({
-            'timestamp': ['count', 'min', 'max'],
-            'event_type': 'nunique'
-        }).reset_index()
+    def _extract_user_patterns(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        """Extract user behavior patterns, one row per event"""
+        epoch = pd.Series(epoch_seconds(df['timestamp']), index=df.index)
+        keys = df['user_id']
+        user_stats = np.column_stack([
+            epoch.groupby(keys).transform('count'),
+            epoch.groupby(keys).transform('min'),
+            epoch.groupby(keys).transform('max'),
+            df['event_type'].groupby(keys).transform('nunique')
+        ]).astype(np.float64)
         
-        if 'user_patterns' not in self.scalers:
-            self.scalers['user_patterns'] = StandardScaler()
-        
-        return self.scalers['user_patterns'].fit_transform(user_stats.drop('user_id', axis=1))
+        return _impute_missing(self._scale('user_patterns', user_stats, fit))
     
-    def _extract_network_patterns(self, df: pd.DataFrame) -> np.ndarray:
-        """Extract network behavior patterns"""
-        network_stats = df.groupby('ip_address').agg({
-            'timestamp': ['count', 'min', 'max'],
-            'port': ['nunique', 'mean']
-        }).reset_index()
-        
-        if 'network_patterns' not in self.scalers:
-            self.scalers['network_patterns'] = StandardScaler()
+    def _extract_network_patterns(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        """Extract network behavior patterns, one row per event"""
+        epoch = pd.Series(epoch_seconds(df['timestamp']), index=df.index)
+        keys = df['ip_address']
+        ports = pd.to_numeric(df['port'], errors='coerce')
+        network_stats = np.column_stack([
+            epoch.groupby(keys).transform('count'),
+            epoch.groupby(keys).transform('min'),
+            epoch.groupby(keys).transform('max'),
+            ports.groupby(keys).transform('nunique'),
+            ports.groupby(keys).transform('mean')
+        ]).astype(np.float64)
         
-        return self.scalers['network_patterns'].fit_transform(network_stats.drop('ip_address', axis=1))
\ No newline at end of file
+        return _impute_missing(self._scale('network_patterns', network_stats, fit))
+
+def _impute_missing(scaled: np.ndarray) -> np.ndarray:
+    """Rows without a user, IP or timestamp carry NaN stats; impute the fitted mean (0 once scaled)"""
+    scaled[np.isnan(scaled)] = 0.0
+    return scaled
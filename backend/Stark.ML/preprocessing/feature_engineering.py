@@ -1,49 +1,59 @@
 import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 import logging
+from .group_stats import GroupStats
+from .feature_schema import CategoricalSchema
+from .temporal_features import FEATURE_ENGINEER_FIELDS, temporal_features
 
 class SecurityFeatureEngineer(BaseEstimator, TransformerMixin):
-    def __init__(self):
+    def __init__(self, max_categories: int = 256):
         self.logger = logging.getLogger(__name__)
+        self.max_categories = max_categories
         self.feature_names = []
         self.categorical_features = []
         self.numerical_features = []
+        self.categorical_schema = None
         
     def fit(self, X: pd.DataFrame, y=None):
         """Fit the feature engineer to the data"""
         try:
             self._identify_features(X)
+            # Vocabularies are frozen here so every later chunk encodes to the same width
+            self.categorical_schema = CategoricalSchema(
+                self.categorical_features, max_categories=self.max_categories
+            ).fit(X)
             return self
         except Exception as e:
             self.logger.error(f"Error in feature engineering fit: {str(e)}")
             raise
             
     def transform(self, X: pd.DataFrame) -> np.ndarray:
-        """Transform the data with engineered features"""
+        """Transform the data with engineered features, one row per event"""
         try:
-            features = []
-            
             # Basic features
             basic_features = self._extract_basic_features(X)
-            features.append(basic_features)
+            time_width = len(FEATURE_ENGINEER_FIELDS) if 'timestamp' in X.columns else 0
+            behavioral_width = self._behavioral_width(X)
+            statistical_width = self._statistical_width(X)
+            
+            # Every other block is written straight into the preallocated output
+            offset = basic_features.shape[1]
+            combined_features = np.empty((len(X), offset + time_width + behavioral_width + statistical_width))
+            combined_features[:, :offset] = basic_features
             
             # Time-based features
-            if 'timestamp' in X.columns:
-                time_features = self._extract_time_features(X)
-                features.append(time_features)
+            if time_width:
+                self._extract_time_features(X, out=combined_features[:, offset:offset + time_width])
+                offset += time_width
             
             # Behavioral features
-            behavioral_features = self._extract_behavioral_features(X)
-            features.append(behavioral_features)
+            self._extract_behavioral_features(X, out=combined_features[:, offset:offset + behavioral_width])
+            offset += behavioral_width
             
             # Statistical features
-            statistical_features = self._extract_statistical_features(X)
-            features.append(statistical_features)
-            
-            # Combine all features
-            combined_features = np.concatenate(features, axis=1)
+            self._extract_statistical_features(X, out=combined_features[:, offset:])
             
             return combined_features
             
@@ -66,76 +76,75 @@ class SecurityFeatureEngineer(BaseEstimator, TransformerMixin):
                 features.append(X[col].values.reshape(-1, 1))
                 
         # Process categorical features
-        for col in self.categorical_features:
-            if col in X.columns:
-                # One-hot encoding for categorical features
-                dummies = pd.get_dummies(X[col], prefix=col)
-                features.append(dummies.values)
+        if self.categorical_schema is not None and self.categorical_schema.columns:
+            # Fixed-width one-hot encoding over the fitted vocabularies
+            features.append(self.categorical_schema.encode_one_hot(X, dtype=np.float64))
                 
-        return np.concatenate(features, axis=1) if features else np.array([])
+        return np.concatenate(features, axis=1) if features else np.empty((len(X), 0))
         
-    def _extract_time_features(self, X: pd.DataFrame) -> np.ndarray:
+    def _extract_time_features(self, X: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Extract time-based features"""
-        timestamps = pd.to_datetime(X['timestamp'])
+        # Calendar fields, normalized minutes and seconds, business-hours (9 AM - 5 PM) and weekend flags
+        return temporal_features(X['timestamp'], FEATURE_ENGINEER_FIELDS, out=out)
         
-        time_features = np.column_stack([
-            timestamps.dt.hour,
-            timestamps.dt.dayofweek,
-            timestamps.dt.day,
-            timestamps.dt.month,
-            timestamps.dt.quarter,
-            timestamps.dt.year,
-            timestamps.dt.minute / 60.0,  # Normalized minutes
-            timestamps.dt.second / 3600.0,  # Normalized seconds
-            self._is_business_hours(timestamps),
-            self._is_weekend(timestamps)
-        ])
+    def _behavioral_width(self, X: pd.DataFrame) -> int:
+        width = 4 * ('user_id' in X.columns) + 5 * ('ip_address' in X.columns)
+        return width or 1
         
-        return time_features
+    def _statistical_width(self, X: pd.DataFrame) -> int:
+        if 'user_id' not in X.columns:
+            return 1
+        return 6 * len([col for col in self.numerical_features if col in X.columns]) or 1
         
-    def _extract_behavioral_features(self, X: pd.DataFrame) -> np.ndarray:
-        """Extract behavioral patterns"""
-        behavioral_features = []
+    def _extract_behavioral_features(self, X: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Extract behavioral patterns of each event's user and IP"""
+        if out is None:
+            out = np.empty((len(X), self._behavioral_width(X)))
+        if 'user_id' not in X.columns and 'ip_address' not in X.columns:
+            out[:] = 0
+            return out
         
+        timestamps = _column(X, 'timestamp')
+        col = 0
         if 'user_id' in X.columns:
             # User activity patterns
-            user_stats = X.groupby('user_id').agg({
-                'timestamp': ['count', 'nunique'],
-                'event_type': 'nunique',
-                'ip_address': 'nunique'
-            }).reset_index()
-            behavioral_features.append(user_stats.drop('user_id', axis=1).values)
+            users = GroupStats(X['user_id'])
+            for stats in (users.count(timestamps), users.nunique(timestamps),
+                          users.nunique(_column(X, 'event_type')), users.nunique(_column(X, 'ip_address'))):
+                users.broadcast(stats, out[:, col])
+                col += 1
             
         if 'ip_address' in X.columns:
             # Network patterns
-            ip_stats = X.groupby('ip_address').agg({
-                'timestamp': ['count', 'nunique'],
-                'port': ['nunique', 'mean'],
-                'protocol': 'nunique'
-            }).reset_index()
-            behavioral_features.append(ip_stats.drop('ip_address', axis=1).values)
+            ips = GroupStats(X['ip_address'])
+            ports = pd.to_numeric(_column(X, 'port'), errors='coerce')
+            port_mean = ips.describe(ports)[:, 0]
+            for stats in (ips.count(timestamps), ips.nunique(timestamps), ips.nunique(ports),
+                          port_mean, ips.nunique(_column(X, 'protocol'))):
+                ips.broadcast(stats, out[:, col])
+                col += 1
             
-        return np.concatenate(behavioral_features, axis=1) if behavioral_features else np.zeros((len(X), 1))
+        return out
         
-    def _extract_statistical_features(self, X: pd.DataFrame) -> np.ndarray:
-        """Extract statistical features"""
-        statistical_features = []
+    def _extract_statistical_features(self, X: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-user mean, std, min, max and quartiles of each numerical feature"""
+        if out is None:
+            out = np.empty((len(X), self._statistical_width(X)))
+        columns = [col for col in self.numerical_features if col in X.columns]
+        if 'user_id' not in X.columns or not columns:
+            out[:] = 0
+            return out
         
-        for col in self.numerical_features:
-            if col in X.columns:
-                stats = X.groupby('user_id')[col].agg([
-                    'mean', 'std', 'min', 'max',
-                    lambda x: np.percentile(x, 25),
-                    lambda x: np.percentile(x, 75)
-                ]).reset_index()
-                statistical_features.append(stats.drop('user_id', axis=1).values)
+        users = GroupStats(X['user_id'])
+        for i, col in enumerate(columns):
+            stats = users.describe(X[col].to_numpy(dtype=np.float64, na_value=np.nan), quantiles=(0.25, 0.75))
+            for j in range(stats.shape[1]):
+                users.broadcast(stats[:, j], out[:, 6 * i + j])
                 
-        return np.concatenate(statistical_features, axis=1) if statistical_features else np.zeros((len(X), 1))
-        
-    def _is_business_hours(self, timestamps: pd.Series) -> np.ndarray:
-        """Check if timestamp is during business hours (9 AM - 5 PM)"""
-        return ((timestamps.dt.hour >= 9) & (timestamps.dt.hour < 17)).astype(int)
-        
-    def _is_weekend(self, timestamps: pd.Series) -> np.ndarray:
-        """Check if timestamp is during weekend"""
-        return (timestamps.dt.dayofweek >= 5).astype(int)
\ No newline at end of file
+        return out
+
+def _column(X: pd.DataFrame, name: str) -> pd.Series:
+    """Column by name, or all missing when the frame does not have it"""
+    if name in X.columns:
+        return X[name]
+    return pd.Series(np.nan, index=X.index)
\ No newline at end of file
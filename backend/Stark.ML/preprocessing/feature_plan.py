@@ -0,0 +1,174 @@
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from .temporal_features import parse_timestamp, to_epoch_seconds, to_utc
+
+NAN = float('nan')
+
+
+class FeaturePlan:
+    """
+    DataFrame-free transform compiled from a fitted DataProcessor.
+
+    Every block of the DataFrame path is reduced to plain Python over the
+    event dicts, writing into one preallocated (n, width) row block, and all
+    scalers are folded into a single offset/scale pair applied in one numpy
+    op. Output matches DataProcessor.process_security_data(use_plan=False)
+    column for column.
+    """
+
+    def __init__(self, numerical_columns: List[str], schema, has_timestamp: bool,
+                 behavioral_groups: List[str], offset: np.ndarray, scale: np.ndarray,
+                 profile_store=None):
+        self.numerical_columns = list(numerical_columns)
+        self.schema = schema
+        self.categorical_columns = list(schema.columns) if schema is not None else []
+        self.has_timestamp = has_timestamp
+        self.behavioral_groups = list(behavioral_groups)
+        self.profile_store = profile_store
+        self.offset = offset
+        self.scale = scale
+        self.width = len(offset)
+
+    @classmethod
+    def from_processor(cls, processor) -> 'FeaturePlan':
+        blocks = []
+
+        def scaled(name, width):
+            if width == 0:
+                return
+            scaler = processor.scalers[name]
+            blocks.append((scaler.mean_, scaler.scale_))
+
+        def passthrough(width):
+            blocks.append((np.zeros(width), np.ones(width)))
+
+        schema = processor.categorical_schema
+        scaled('numerical', len(processor.numerical_columns))
+        passthrough(len(schema.columns) if schema is not None else 0)
+        if processor.has_timestamp:
+            scaled('temporal', 7)
+        else:
+            passthrough(1)
+        if processor.profile_store is not None:
+            scaled('profiles', processor.profile_store.width)
+        else:
+            if 'user_id' in processor.behavioral_groups:
+                scaled('user_patterns', 4)
+            if 'ip_address' in processor.behavioral_groups:
+                scaled('network_patterns', 5)
+            if not processor.behavioral_groups:
+                passthrough(1)
+
+        offset = np.concatenate([np.asarray(b[0], dtype=np.float64) for b in blocks])
+        scale = np.concatenate([np.asarray(b[1], dtype=np.float64) for b in blocks])
+        return cls(processor.numerical_columns, schema, processor.has_timestamp,
+                   processor.behavioral_groups, offset, scale, processor.profile_store)
+
+    def transform(self, raw_data: Union[Dict, List[Dict], pd.DataFrame]) -> np.ndarray:
+        if isinstance(raw_data, pd.DataFrame):
+            events = raw_data.to_dict('records')
+        else:
+            events = [raw_data] if isinstance(raw_data, dict) else raw_data
+        n = len(events)
+        out = np.zeros((n, self.width), dtype=np.float64)
+
+        stamps = [parse_timestamp(event.get('timestamp')) for event in events]
+        for i, event in enumerate(events):
+            out[i, :self._behavioral_offset] = self._row(event, stamps[i])
+
+        col = self._behavioral_offset
+        if self.profile_store is not None:
+            self.profile_store.update_many(events, out=out[:, col:])
+        else:
+            if 'user_id' in self.behavioral_groups:
+                self._group_stats(out[:, col:col + 4], events, stamps, 'user_id', 'event_type', _to_label)
+                col += 4
+            if 'ip_address' in self.behavioral_groups:
+                self._group_stats(out[:, col:col + 5], events, stamps, 'ip_address', 'port', _to_number)
+
+        out -= self.offset
+        out /= self.scale
+        # Behavioral stats of rows without a key are imputed as in DataProcessor
+        behavioral = out[:, self._behavioral_offset:]
+        behavioral[np.isnan(behavioral)] = 0.0
+        return out
+
+    @property
+    def _behavioral_offset(self) -> int:
+        n_categorical = len(self.categorical_columns)
+        n_temporal = 7 if self.has_timestamp else 1
+        return len(self.numerical_columns) + n_categorical + n_temporal
+
+    def _row(self, event: Dict[str, Any], stamp: Optional[datetime]) -> list:
+        row = [_to_number(event.get(col)) for col in self.numerical_columns]
+        code = self.schema.code if self.categorical_columns else None
+        row.extend(code(col, event.get(col, NAN)) for col in self.categorical_columns)
+        if not self.has_timestamp:
+            row.append(0.0)
+        elif stamp is None:
+            row.extend([NAN] * 7)
+        else:
+            stamp = to_utc(stamp)
+            row.extend([
+                stamp.hour,
+                stamp.weekday(),
+                stamp.day,
+                stamp.month,
+                (stamp.month - 1) // 3 + 1,
+                stamp.year,
+                stamp.minute / 60.0
+            ])
+        return row
+
+    @staticmethod
+    def _group_stats(out: np.ndarray, events: List[Dict], stamps: List[Optional[datetime]],
+                     key: str, field: str, convert):
+        """
+        Per-row transform of count/min/max epoch and nunique (plus mean for
+        numeric fields) over the rows sharing the same key in this batch
+        """
+        groups: Dict[Any, list] = {}
+        keys = []
+        for i, event in enumerate(events):
+            k = event.get(key)
+            if k is None or (isinstance(k, float) and math.isnan(k)):
+                keys.append(None)
+                continue
+            keys.append(k)
+            groups.setdefault(k, []).append(i)
+
+        numeric = convert is _to_number
+        stats = {}
+        for k, rows in groups.items():
+            epochs = [to_epoch_seconds(stamps[i]) for i in rows if stamps[i] is not None]
+            values = [convert(events[i].get(field)) for i in rows]
+            values = [v for v in values if v is not None and v == v]
+            row = [
+                len(epochs),
+                min(epochs) if epochs else NAN,
+                max(epochs) if epochs else NAN,
+                len(set(values))
+            ]
+            if numeric:
+                row.append(math.fsum(values) / len(values) if values else NAN)
+            stats[k] = row
+
+        for i, k in enumerate(keys):
+            out[i] = stats[k] if k is not None else NAN
+
+
+def _to_number(value: Any) -> float:
+    if value is None:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _to_label(value: Any) -> Any:
+    return value
+
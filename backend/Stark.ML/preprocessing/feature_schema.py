@@ -0,0 +1,174 @@
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+Batch = Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence], pd.DataFrame]
+
+
+def column_values(batch: Batch, column: str) -> list:
+    """Values of one column from a list of event dicts or a column mapping"""
+    if isinstance(batch, (pd.DataFrame, Mapping)):
+        return list(batch[column]) if column in batch else [None] * _batch_len(batch)
+    return [event.get(column) for event in batch]
+
+
+def _batch_len(batch: Batch) -> int:
+    if isinstance(batch, pd.DataFrame):
+        return len(batch)
+    if isinstance(batch, Mapping):
+        return len(next(iter(batch.values()))) if batch else 0
+    return len(batch)
+
+
+class CategoricalSchema:
+    """
+    Frozen per-column vocabularies for categorical features.
+
+    Each column gets max(1, hash_buckets) out-of-vocabulary slots followed by
+    its vocabulary (the max_categories most frequent values, sorted). Unseen
+    values go to the single OOV slot, or are spread over the OOV slots by a
+    stable hash when hash_buckets > 0. Output width is fixed at fit time, so
+    every batch encodes to the same columns regardless of which categories
+    it happens to contain.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None, max_categories: Optional[int] = 256,
+                 min_frequency: int = 1, hash_buckets: int = 0):
+        self.columns = list(columns) if columns is not None else None
+        self.max_categories = max_categories
+        self.min_frequency = min_frequency
+        self.hash_buckets = hash_buckets
+        self.vocabularies: Dict[str, List[Any]] = {}
+        self._indexes: Dict[str, pd.Index] = {}
+        self._lookups: Dict[str, Dict[Any, int]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.vocabularies) or self.columns == []
+
+    @property
+    def oov_slots(self) -> int:
+        return max(1, self.hash_buckets)
+
+    @property
+    def width(self) -> int:
+        """Width of the one-hot encoding"""
+        return sum(self.oov_slots + len(self.vocabularies[col]) for col in self.columns or [])
+
+    @classmethod
+    def infer_columns(cls, batch: Batch, exclude: Iterable[str] = ()) -> List[str]:
+        """Columns holding string values in a sample batch"""
+        exclude = set(exclude)
+        if isinstance(batch, pd.DataFrame):
+            candidates = batch.select_dtypes(include=['object']).columns
+            return [col for col in candidates if col not in exclude]
+        if isinstance(batch, Mapping):
+            return [col for col, values in batch.items()
+                    if col not in exclude and any(isinstance(v, str) for v in values)]
+        columns = {}
+        for event in batch:
+            for col, value in event.items():
+                if isinstance(value, str) and col not in exclude:
+                    columns.setdefault(col, None)
+        return list(columns)
+
+    def fit(self, batch: Batch) -> 'CategoricalSchema':
+        if self.columns is None:
+            self.columns = self.infer_columns(batch)
+        for col in self.columns:
+            counts = Counter(v for v in column_values(batch, col) if v is not None and v == v)
+            frequent = [v for v, c in counts.most_common(self.max_categories) if c >= self.min_frequency]
+            self.vocabularies[col] = sorted(frequent, key=lambda v: (type(v).__name__, v))
+        self._build_indexes()
+        return self
+
+    def encode_codes(self, batch: Batch, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        One integer code per column: 0..oov_slots-1 for unseen values,
+        followed by vocabulary positions. Shape (n, len(columns)).
+        """
+        n = _batch_len(batch)
+        if out is None:
+            out = np.empty((n, len(self.columns)), dtype=np.int64)
+        for j, col in enumerate(self.columns):
+            out[:, j] = self._codes(col, column_values(batch, col))
+        return out
+
+    def encode_one_hot(self, batch: Batch, out: Optional[np.ndarray] = None,
+                       dtype=np.float32) -> np.ndarray:
+        """One-hot encode into a fixed-width (n, width) matrix"""
+        n = _batch_len(batch)
+        if out is None:
+            out = np.zeros((n, self.width), dtype=dtype)
+        else:
+            out[...] = 0
+        rows = np.arange(n)
+        offset = 0
+        for col in self.columns:
+            out[rows, offset + self._codes(col, column_values(batch, col))] = 1
+            offset += self.oov_slots + len(self.vocabularies[col])
+        return out
+
+    def feature_names(self) -> List[str]:
+        names = []
+        for col in self.columns:
+            names.extend(f"{col}__oov{i}" for i in range(self.oov_slots))
+            names.extend(f"{col}={value}" for value in self.vocabularies[col])
+        return names
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            'columns': self.columns,
+            'vocabularies': self.vocabularies,
+            'max_categories': self.max_categories,
+            'min_frequency': self.min_frequency,
+            'hash_buckets': self.hash_buckets
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> 'CategoricalSchema':
+        self.columns = list(state['columns'])
+        self.vocabularies = {col: list(vocab) for col, vocab in state['vocabularies'].items()}
+        self.max_categories = state['max_categories']
+        self.min_frequency = state['min_frequency']
+        self.hash_buckets = state['hash_buckets']
+        self._build_indexes()
+        return self
+
+    def __getstate__(self):
+        return self.get_state()
+
+    def __setstate__(self, state):
+        self.logger = logging.getLogger(__name__)
+        self.set_state(state)
+
+    def code(self, col: str, value: Any) -> int:
+        """Code of a single value; the scalar counterpart of encode_codes"""
+        code = self._lookups[col].get(value)
+        if code is not None:
+            return code
+        if self.hash_buckets:
+            return zlib.crc32(str(value).encode('utf-8')) % self.hash_buckets
+        return 0
+
+    def _build_indexes(self):
+        self._indexes = {col: pd.Index(vocab, dtype=object) for col, vocab in self.vocabularies.items()}
+        self._lookups = {
+            col: {value: i + self.oov_slots for i, value in enumerate(vocab)}
+            for col, vocab in self.vocabularies.items()
+        }
+
+    def _codes(self, col: str, values: list) -> np.ndarray:
+        positions = self._indexes[col].get_indexer(pd.Index(values, dtype=object))
+        codes = positions + self.oov_slots
+        missing = np.flatnonzero(positions < 0)
+        if len(missing) and self.hash_buckets:
+            codes[missing] = [
+                zlib.crc32(str(values[i]).encode('utf-8')) % self.hash_buckets for i in missing
+            ]
+        elif len(missing):
+            codes[missing] = 0
+        return codes
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence
+
+
+class GroupStats:
+    """
+    Grouping of rows by one key column, shared by every aggregate computed
+    over it. Keys are factorized once; counts are bincounts over the codes,
+    and describe() sorts rows by (group, value) once so that moments,
+    extremes and all quantiles come from contiguous segments in a single
+    pass. broadcast() maps per-group results back onto the original rows;
+    rows with a missing key belong to no group and receive NaN.
+    """
+
+    def __init__(self, keys):
+        codes, uniques = pd.factorize(keys)
+        self.codes = codes
+        self.n_groups = len(uniques)
+        self.valid = codes >= 0
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def broadcast(self, group_values: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-row view of per-group results, written into out when given"""
+        if out is None:
+            out = np.empty(len(self.codes), dtype=np.float64)
+        out[self.valid] = group_values[self.codes[self.valid]]
+        out[~self.valid] = np.nan
+        return out
+
+    def count(self, values) -> np.ndarray:
+        """Non-null values per group"""
+        present = self.valid & pd.notna(values)
+        return np.bincount(self.codes[present], minlength=self.n_groups).astype(np.float64)
+
+    def nunique(self, values) -> np.ndarray:
+        """Distinct non-null values per group"""
+        value_codes, uniques = pd.factorize(values)
+        present = self.valid & (value_codes >= 0)
+        pairs = self.codes[present].astype(np.int64) * (len(uniques) + 1) + value_codes[present]
+        pairs.sort()
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        distinct = pairs[first] // (len(uniques) + 1)
+        return np.bincount(distinct, minlength=self.n_groups).astype(np.float64)
+
+    def describe(self, values, quantiles: Sequence[float] = ()) -> np.ndarray:
+        """
+        mean, std (ddof=1), min, max and the requested quantiles (linear
+        interpolation, as np.percentile) per group in one sort, ignoring NaN.
+        Returns an (n_groups, 4 + len(quantiles)) array.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full((self.n_groups, 4 + len(quantiles)), np.nan)
+        present = self.valid & ~np.isnan(values)
+        codes = self.codes[present]
+        values = values[present]
+        if len(values) == 0:
+            return result
+
+        # Sort by (group, value): every group becomes a contiguous ascending run
+        order = np.lexsort((values, codes))
+        codes = codes[order]
+        values = values[order]
+        counts = np.bincount(codes, minlength=self.n_groups)
+        groups = np.flatnonzero(counts)
+        n = counts[groups]
+        starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+        ends = starts + n - 1
+
+        sums = np.add.reduceat(values, starts)
+        mean = sums / n
+        deviations = values - np.repeat(mean, n)
+        sq = np.add.reduceat(deviations * deviations, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.where(n > 1, np.sqrt(sq / (n - 1)), np.nan)
+
+        result[groups, 0] = mean
+        result[groups, 1] = std
+        result[groups, 2] = values[starts]
+        result[groups, 3] = values[ends]
+        for j, q in enumerate(quantiles):
+            position = starts + q * (n - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, ends)
+            fraction = position - lower
+            result[groups, 4 + j] = values[lower] + (values[upper] - values[lower]) * fraction
+        return result
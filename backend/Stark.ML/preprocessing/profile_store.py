@@ -0,0 +1,329 @@
+import math
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence
+from .feature_plan import _to_number
+from .temporal_features import parse_timestamp, to_epoch_seconds
+from ..models.model_store import ModelStore
+
+# first_seen, last_seen, gap_mean, gap_var, value_mean, value_var
+STAT_FIELDS = ('first_seen', 'last_seen', 'gap_mean', 'gap_var', 'value_mean', 'value_var')
+
+
+def _hll_alpha(m: int) -> float:
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+class ProfileTable:
+    """
+    Running profiles for one entity key (user or IP) in array-backed tables.
+
+    Every entity owns a row in preallocated arrays: event count, first and
+    last seen, EWMA mean and variance of the gap between its events and of
+    an optional numeric field, and HyperLogLog registers approximating the
+    number of distinct values of another field. Tables grow by doubling;
+    with max_entities set, the least recently seen entity's row is reused.
+    """
+
+    def __init__(self, distinct_field: str, value_field: Optional[str] = None, alpha: float = 0.05,
+                 hll_precision: int = 8, max_entities: Optional[int] = None, initial_capacity: int = 1024):
+        if not 4 <= hll_precision <= 16:
+            raise ValueError("hll_precision must be between 4 and 16")
+        self.distinct_field = distinct_field
+        self.value_field = value_field
+        self.alpha = alpha
+        self.hll_precision = hll_precision
+        self.max_entities = max_entities
+        self.registers_per_entity = 1 << hll_precision
+        self._hll_alpha = _hll_alpha(self.registers_per_entity)
+        self._hash_bits = 64 - hll_precision
+
+        capacity = min(initial_capacity, max_entities) if max_entities else initial_capacity
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.stats = np.full((capacity, len(STAT_FIELDS)), np.nan)
+        self.distinct = np.zeros(capacity, dtype=np.float64)
+        self.registers = np.zeros((capacity, self.registers_per_entity), dtype=np.uint8)
+        self._slots: "OrderedDict[Hashable, int]" = OrderedDict()
+        self.evictions = 0
+
+    @property
+    def width(self) -> int:
+        return 8 if self.value_field else 6
+
+    def feature_names(self, prefix: str) -> List[str]:
+        names = ['count', 'first_seen', 'last_seen', f'distinct_{self.distinct_field}', 'gap_mean', 'gap_std']
+        if self.value_field:
+            names += [f'{self.value_field}_mean', f'{self.value_field}_std']
+        return [f'{prefix}__{name}' for name in names]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def update(self, key: Hashable, epoch: Optional[float], distinct_value: Any = None,
+               value: Optional[float] = None) -> int:
+        """Fold one event into the entity's profile and return its row"""
+        slot = self._acquire(key)
+        stats = self.stats[slot]
+        count = self.counts[slot]
+        self.counts[slot] = count + 1
+
+        if epoch is not None:
+            last_seen = stats[1]
+            if count == 0 or math.isnan(last_seen):
+                stats[0] = stats[1] = epoch
+            else:
+                self._ewma(stats, 2, max(epoch - last_seen, 0.0))
+                stats[0] = min(stats[0], epoch)
+                stats[1] = max(last_seen, epoch)
+
+        if value is not None and value == value:
+            self._ewma(stats, 4, value)
+
+        if distinct_value is not None and distinct_value == distinct_value:
+            self._add_distinct(slot, distinct_value)
+        return slot
+
+    def features(self, key: Hashable, out: np.ndarray) -> np.ndarray:
+        """
+        Write the entity's features into out; unknown entities get NaN. Gap
+        statistics read 0 until the entity's second timestamped event.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            out[:] = np.nan
+            out[0] = 0
+            out[3] = 0
+            return out
+        stats = self.stats[slot]
+        out[0] = self.counts[slot]
+        out[1] = stats[0]
+        out[2] = stats[1]
+        out[3] = self.distinct[slot]
+        out[4] = stats[2] if stats[2] == stats[2] else 0.0
+        out[5] = math.sqrt(stats[3]) if stats[3] == stats[3] else 0.0
+        if self.value_field:
+            out[6] = stats[4]
+            out[7] = math.sqrt(stats[5]) if stats[5] == stats[5] else np.nan
+        return out
+
+    def get_state(self) -> Dict[str, Any]:
+        n = len(self._slots)
+        # Compact the live rows into slot order so the snapshot holds no gaps
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=n)
+        return {
+            'keys': list(self._slots.keys()),
+            'counts': self.counts[slots],
+            'stats': self.stats[slots],
+            'distinct': self.distinct[slots],
+            'registers': self.registers[slots],
+            'config': {
+                'distinct_field': self.distinct_field,
+                'value_field': self.value_field,
+                'alpha': self.alpha,
+                'hll_precision': self.hll_precision,
+                'max_entities': self.max_entities
+            }
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> 'ProfileTable':
+        config = state['config']
+        self.__init__(config['distinct_field'], config['value_field'], config['alpha'],
+                      config['hll_precision'], config['max_entities'],
+                      initial_capacity=max(len(state['keys']), 1))
+        n = len(state['keys'])
+        self.counts[:n] = state['counts']
+        self.stats[:n] = state['stats']
+        self.distinct[:n] = state['distinct']
+        self.registers[:n] = state['registers']
+        self._slots = OrderedDict((key, i) for i, key in enumerate(state['keys']))
+        return self
+
+    def _ewma(self, stats: np.ndarray, column: int, x: float):
+        mean = stats[column]
+        if mean != mean:
+            stats[column] = x
+            stats[column + 1] = 0.0
+            return
+        diff = x - mean
+        increment = self.alpha * diff
+        stats[column] = mean + increment
+        stats[column + 1] = (1 - self.alpha) * (stats[column + 1] + diff * increment)
+
+    def _add_distinct(self, slot: int, value: Any):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        h = int.from_bytes(digest, 'little')
+        index = h >> self._hash_bits
+        rest = h & ((1 << self._hash_bits) - 1)
+        rank = self._hash_bits - rest.bit_length() + 1
+        registers = self.registers[slot]
+        if rank > registers[index]:
+            registers[index] = rank
+            # The estimate only changes with a register, so lookups stay O(1)
+            self.distinct[slot] = self._estimate(registers)
+
+    def _estimate(self, registers: np.ndarray) -> float:
+        m = self.registers_per_entity
+        estimate = self._hll_alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum()
+        zeros = m - np.count_nonzero(registers)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(estimate)
+
+    def _acquire(self, key: Hashable) -> int:
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            return slot
+
+        n = len(self._slots)
+        if self.max_entities and n >= self.max_entities:
+            _, slot = self._slots.popitem(last=False)
+            self.evictions += 1
+            self._reset(slot)
+        else:
+            if n >= len(self.counts):
+                self._grow()
+            slot = n
+        self._slots[key] = slot
+        return slot
+
+    def _reset(self, slot: int):
+        self.counts[slot] = 0
+        self.stats[slot] = np.nan
+        self.distinct[slot] = 0
+        self.registers[slot] = 0
+
+    def _grow(self):
+        capacity = len(self.counts) * 2
+        if self.max_entities:
+            capacity = min(capacity, self.max_entities)
+        extra = capacity - len(self.counts)
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.stats = np.concatenate([self.stats, np.full((extra, len(STAT_FIELDS)), np.nan)])
+        self.distinct = np.concatenate([self.distinct, np.zeros(extra)])
+        self.registers = np.concatenate([
+            self.registers, np.zeros((extra, self.registers_per_entity), dtype=np.uint8)
+        ])
+
+
+class ProfileStore:
+    """
+    Persistent, incrementally updated behavioral profiles keyed by user_id
+    and ip_address. Each event is folded into its user's and IP's profile
+    in O(1) and the updated profiles are returned as its behavioral
+    features, so they describe the entity's whole history rather than
+    whatever rows happen to share the current batch.
+
+    User profiles track distinct event types; IP profiles track distinct
+    ports and the EWMA mean and spread of the port. Both track event
+    count, first/last seen and the EWMA of the gap between events.
+    """
+
+    MODEL_NAME = 'profile_store'
+
+    def __init__(self, alpha: float = 0.05, hll_precision: int = 8, max_entities: Optional[int] = None,
+                 model_store: Optional[ModelStore] = None):
+        self.logger = logging.getLogger(__name__)
+        self.model_store = model_store or ModelStore()
+        self.tables = {
+            'user_id': ProfileTable('event_type', alpha=alpha, hll_precision=hll_precision,
+                                    max_entities=max_entities),
+            'ip_address': ProfileTable('port', value_field='port', alpha=alpha,
+                                       hll_precision=hll_precision, max_entities=max_entities)
+        }
+        self.width = sum(table.width for table in self.tables.values())
+        self._lock = threading.Lock()
+
+    def feature_names(self) -> List[str]:
+        return [name for key, table in self.tables.items() for name in table.feature_names(key)]
+
+    def update(self, event: Mapping[str, Any]) -> np.ndarray:
+        """Fold one event into its profiles and return its feature row"""
+        return self.update_many([event])[0]
+
+    def update_many(self, events: Sequence[Mapping[str, Any]], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Update profiles event by event, in order; row i holds the profiles as
+        they stand right after event i
+        """
+        if out is None:
+            out = np.empty((len(events), self.width))
+        with self._lock:
+            for i, event in enumerate(events):
+                stamp = parse_timestamp(event.get('timestamp'))
+                epoch = to_epoch_seconds(stamp) if stamp is not None else None
+                col = 0
+                for key_field, table in self.tables.items():
+                    key = event.get(key_field)
+                    if _is_missing(key):
+                        out[i, col:col + table.width] = np.nan
+                    else:
+                        value = _to_number(event.get(table.value_field)) if table.value_field else None
+                        table.update(key, epoch, event.get(table.distinct_field), value)
+                        table.features(key, out[i, col:col + table.width])
+                    col += table.width
+        return out
+
+    def lookup(self, event: Mapping[str, Any]) -> np.ndarray:
+        """Current profiles of the event's entities without updating them"""
+        out = np.empty(self.width)
+        col = 0
+        with self._lock:
+            for key_field, table in self.tables.items():
+                key = event.get(key_field)
+                if _is_missing(key):
+                    out[col:col + table.width] = np.nan
+                else:
+                    table.features(key, out[col:col + table.width])
+                col += table.width
+        return out
+
+    def copy(self) -> 'ProfileStore':
+        """Independent in-memory copy of the current profiles"""
+        return ProfileStore(model_store=self.model_store).set_state(self.get_state())
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {key: table.get_state() for key, table in self.tables.items()}
+
+    def set_state(self, state: Dict[str, Any]) -> 'ProfileStore':
+        with self._lock:
+            for key, table_state in state.items():
+                self.tables[key].set_state(table_state)
+            self.width = sum(table.width for table in self.tables.values())
+        return self
+
+    def save(self, version: Optional[str] = None) -> str:
+        """Snapshot every table; arrays are stored as .npy and memory mapped on load"""
+        artifacts = {}
+        for key, table_state in self.get_state().items():
+            for name, value in table_state.items():
+                artifacts[f'{key}.{name}'] = value
+        return self.model_store.save(self.MODEL_NAME, artifacts, version)
+
+    def load(self, version: Optional[str] = None) -> str:
+        loaded = self.model_store.load(self.MODEL_NAME, version=version)
+        state: Dict[str, Dict[str, Any]] = {}
+        for name, value in loaded.items():
+            if name == '_metadata':
+                continue
+            key, field = name.split('.', 1)
+            state.setdefault(key, {})[field] = value
+        self.set_state(state)
+        return loaded['_metadata']['version']
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
@@ -1,61 +1,131 @@
+import logging
+import threading
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 import tensorflow as tf
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import Optional
+from .streaming_scaler import StreamingScaler
+from .feature_schema import CategoricalSchema
+from .stream_pipeline import map_bounded
+from .temporal_features import REAL_TIME_FIELDS, temporal_features
+from ..models.model_store import ModelStore
+
+_worker_processor = None
+
+def _init_feature_worker(schema_state):
+    global _worker_processor
+    _worker_processor = RealTimeProcessor(
+        categorical_schema=CategoricalSchema().set_state(schema_state),
+        max_workers=1
+    )
+
+def _extract_features_in_worker(batch):
+    return len(batch), _worker_processor._extract_features(batch)
 
 class RealTimeProcessor:
-    def __init__(self):
-        self.scaler = StandardScaler()
+    MODEL_NAME = 'real_time_processor'
+    
+    def __init__(self, scaler_warmup_samples: Optional[int] = 10000,
+                 model_store: Optional[ModelStore] = None,
+                 categorical_schema: Optional[CategoricalSchema] = None,
+                 max_workers: int = 4, max_in_flight: int = 8, ordered: bool = True,
+                 use_processes: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.model_store = model_store or ModelStore()
+        self.categorical_schema = categorical_schema
+        self._schema_lock = threading.Lock()
+        # Fit once over the first events, then transform every batch identically
+        self.scaler = StreamingScaler(warmup_samples=scaler_warmup_samples)
         self.feature_extractors = []
         self.batch_size = 32
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self.use_processes = use_processes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
         
     def process_stream(self, data_stream):
         """
-        Real-time data processing pipeline
+        Real-time data processing pipeline.
+        
+        At most max_in_flight batches are pending at once, so a fast source is
+        throttled rather than buffered without limit. Results are yielded in
+        stream order unless ordered=False, every batch is drained when the
+        stream ends, and the first processing error is raised. With
+        use_processes=True the pandas feature extraction runs in a process
+        pool and only scaling happens in this process.
         """
-        processed_batches = []
+        batches = self._create_batches(data_stream)
+        if not self.use_processes:
+            yield from map_bounded(self.executor, self._process_batch, batches,
+                                   self.max_in_flight, self.ordered)
+            return
+        
+        first = next(batches, None)
+        if first is None:
+            return
+        # Workers need a frozen schema so every process encodes identically
+        if self.categorical_schema is None:
+            self.fit_schema(first)
         
-        for batch in self._create_batches(data_stream):
-            # Process batch asynchronously
-            future = self.executor.submit(self._process_batch, batch)
-            processed_batches.append(future)
-            
-            # Yield results as they become available
-            for future in processed_batches:
-                if future.done():
-                    yield future.result()
-                    processed_batches.remove(future)
+        with ProcessPoolExecutor(self.max_workers, initializer=_init_feature_worker,
+                                 initargs=(self.categorical_schema.get_state(),)) as pool:
+            for batch_size, features in map_bounded(pool, _extract_features_in_worker, chain([first], batches),
+                                                    self.max_in_flight, self.ordered):
+                yield self._scale_features(features, batch_size)
     
     def _process_batch(self, batch):
+        return self._scale_features(self._extract_features(batch), len(batch))
+    
+    def _extract_features(self, batch):
         # Convert to DataFrame
         df = pd.DataFrame(batch)
         
         # Extract features
         numerical_features = self._process_numerical(df)
-        categorical_features = self._process_categorical(df)
+        categorical_features = self._process_categorical(batch)
         temporal_features = self._extract_temporal_features(df)
         
-        # Combine features
-        combined_features = np.concatenate([
+        # Combine features into the float32 buffer that is later scaled in place
+        return np.concatenate([
             numerical_features,
             categorical_features,
             temporal_features
-        ], axis=1)
-        
-        # Scale features
-        scaled_features = self.scaler.fit_transform(combined_features)
+        ], axis=1, dtype=self.scaler.dtype)
+    
+    def _scale_features(self, combined_features, batch_size):
+        # Scale in place: the batch's feature buffer is the output, so no
+        # second array is allocated. Each batch keeps its own buffer because
+        # the result is handed to the consumer.
+        if not self.scaler.frozen:
+            self.scaler.partial_fit(combined_features)
+        scaled_features = self.scaler.transform(combined_features, out=combined_features)
         
         return {
             'features': scaled_features,
             'metadata': {
-                'batch_size': len(batch),
+                'batch_size': batch_size,
                 'timestamp': pd.Timestamp.now(),
                 'feature_dims': scaled_features.shape[1]
             }
         }
     
+    def save_state(self, version: Optional[str] = None) -> str:
+        """Persist the fitted scaler statistics"""
+        artifacts = {'scaler': self.scaler.get_state()}
+        if self.categorical_schema is not None:
+            artifacts['categorical_schema'] = self.categorical_schema.get_state()
+        return self.model_store.save(self.MODEL_NAME, artifacts, version)
+    
+    def load_state(self, version: Optional[str] = None) -> str:
+        loaded = self.model_store.load(self.MODEL_NAME, version=version)
+        self.scaler.set_state(loaded['scaler'])
+        if 'categorical_schema' in loaded:
+            self.categorical_schema = CategoricalSchema().set_state(loaded['categorical_schema'])
+        return loaded['_metadata']['version']
+    
     def _create_batches(self, data_stream):
         batch = []
         for event in data_stream:
@@ -70,19 +140,25 @@ class RealTimeProcessor:
         numerical_cols = df.select_dtypes(include=[np.number]).columns
         return df[numerical_cols].fillna(0).values
     
-    def _process_categorical(self, df):
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        return pd.get_dummies(df[categorical_cols]).values
+    def fit_schema(self, events, **schema_options) -> CategoricalSchema:
+        """Freeze the categorical vocabularies from a representative sample of events"""
+        schema_options.setdefault('hash_buckets', 16)
+        columns = CategoricalSchema.infer_columns(events, exclude=['timestamp'])
+        self.categorical_schema = CategoricalSchema(columns, **schema_options).fit(events)
+        return self.categorical_schema
+    
+    def _process_categorical(self, batch):
+        if self.categorical_schema is None:
+            with self._schema_lock:
+                if self.categorical_schema is None:
+                    self.logger.warning("No categorical schema fitted, freezing vocabulary from the first batch")
+                    self.fit_schema(batch)
+        # Fixed-width one-hot via integer lookup, no per-batch DataFrame
+        return self.categorical_schema.encode_one_hot(batch)
     
     def _extract_temporal_features(self, df):
         if 'timestamp' not in df.columns:
             return np.zeros((len(df), 1))
         
-        timestamps = pd.to_datetime(df['timestamp'])
-        return np.column_stack([
-            timestamps.dt.hour,
-            timestamps.dt.dayofweek,
-            timestamps.dt.day,
-            timestamps.dt.month,
-            timestamps.dt.quarter
-        ])
\ No newline at end of file
+        # hour, day of week, day, month, quarter
+        return temporal_features(df['timestamp'], REAL_TIME_FIELDS)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import time
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, List, Optional
+
+
+class SequenceAssembler:
+    """
+    Per-entity (user or IP) ring buffers of the last N feature vectors,
+    emitting (timesteps, feature_dim) windows for the sequence models.
+
+    Every entity owns a slot of shape (2 * window, feature_dim) in one
+    preallocated float32 array. Each vector is written twice, at head and
+    head + window, so the latest window is always the contiguous slice
+    [head, head + window) and can be returned as a view without copying
+    history. Entities with fewer than N events are zero-padded at the front.
+    Least recently seen entities are evicted when the slot table is full,
+    and evict_idle() drops entities that have gone quiet.
+    """
+
+    def __init__(self, window: int = 32, feature_dim: int = 128, max_entities: Optional[int] = None,
+                 max_memory_mb: float = 512.0, idle_ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.feature_dim = feature_dim
+        slot_bytes = 2 * window * feature_dim * np.dtype(np.float32).itemsize
+        capacity = int(max_memory_mb * 1024 * 1024 // slot_bytes)
+        self.capacity = min(capacity, max_entities) if max_entities else capacity
+        if self.capacity < 1:
+            raise ValueError("Memory cap is too small for a single sequence window")
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self._buffers = np.zeros((self.capacity, 2 * window, feature_dim), dtype=np.float32)
+        self._heads = np.zeros(self.capacity, dtype=np.int64)
+        self._counts = np.zeros(self.capacity, dtype=np.int64)
+        self._last_seen = np.zeros(self.capacity, dtype=np.float64)
+        self._slots: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._free: List[int] = list(range(self.capacity - 1, -1, -1))
+        self._offsets = np.arange(window)
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._slots
+
+    def push(self, entity_id: Hashable, vector: np.ndarray) -> np.ndarray:
+        """
+        Append a feature vector for entity_id and return its current window as
+        a read-only view; the view changes as further events arrive.
+        """
+        slot = self._acquire(entity_id)
+        head = self._heads[slot]
+        buffer = self._buffers[slot]
+        buffer[head] = vector
+        buffer[head + self.window] = vector
+        head = (head + 1) % self.window
+        self._heads[slot] = head
+        self._counts[slot] += 1
+        self._last_seen[slot] = self.clock()
+
+        view = buffer[head:head + self.window]
+        view.flags.writeable = False
+        return view
+
+    def push_many(self, entity_ids: Iterable[Hashable], vectors: np.ndarray):
+        for entity_id, vector in zip(entity_ids, vectors):
+            self.push(entity_id, vector)
+
+    def get_window(self, entity_id: Hashable) -> Optional[np.ndarray]:
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return None
+        head = self._heads[slot]
+        view = self._buffers[slot, head:head + self.window]
+        view.flags.writeable = False
+        return view
+
+    def batch_windows(self, entity_ids: List[Hashable]) -> np.ndarray:
+        """
+        Gather windows for several entities into one (batch, window,
+        feature_dim) array; unknown entities get an all-zero window.
+        """
+        batch = np.zeros((len(entity_ids), self.window, self.feature_dim), dtype=np.float32)
+        rows, slots = [], []
+        for row, entity_id in enumerate(entity_ids):
+            slot = self._slots.get(entity_id)
+            if slot is not None:
+                rows.append(row)
+                slots.append(slot)
+        if slots:
+            slots = np.asarray(slots)
+            positions = self._heads[slots][:, None] + self._offsets
+            batch[rows] = self._buffers[slots[:, None], positions]
+        return batch
+
+    def event_count(self, entity_id: Hashable) -> int:
+        slot = self._slots.get(entity_id)
+        return 0 if slot is None else int(self._counts[slot])
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop entities not seen within idle_ttl_seconds; returns the number evicted"""
+        if self.idle_ttl_seconds is None:
+            return 0
+        cutoff = (now if now is not None else self.clock()) - self.idle_ttl_seconds
+        evicted = 0
+        # _slots is kept in least-recently-seen order
+        while self._slots:
+            entity_id, slot = next(iter(self._slots.items()))
+            if self._last_seen[slot] >= cutoff:
+                break
+            self._release(entity_id)
+            evicted += 1
+        return evicted
+
+    def remove(self, entity_id: Hashable):
+        if entity_id in self._slots:
+            self._release(entity_id)
+
+    def _acquire(self, entity_id: Hashable) -> int:
+        slot = self._slots.get(entity_id)
+        if slot is not None:
+            self._slots.move_to_end(entity_id)
+            return slot
+
+        if not self._free:
+            oldest = next(iter(self._slots))
+            self._release(oldest)
+            self.evictions += 1
+        slot = self._free.pop()
+        self._slots[entity_id] = slot
+        return slot
+
+    def _release(self, entity_id: Hashable):
+        slot = self._slots.pop(entity_id)
+        self._buffers[slot] = 0
+        self._heads[slot] = 0
+        self._counts[slot] = 0
+        self._free.append(slot)
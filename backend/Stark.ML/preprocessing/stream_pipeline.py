@@ -0,0 +1,49 @@
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, Iterator
+
+
+def map_bounded(executor: Executor, fn: Callable[[Any], Any], items: Iterable,
+                max_in_flight: int = 8, ordered: bool = True) -> Iterator:
+    """
+    Apply fn to items on executor with at most max_in_flight tasks pending.
+
+    The source is only pulled when a slot frees up, so a fast producer is
+    throttled to the speed of the workers. With ordered=True results come
+    back in input order; otherwise as soon as each finishes. All pending
+    work is drained when the source is exhausted, the first task error is
+    raised to the caller, and outstanding tasks are cancelled if the
+    consumer stops early or an error occurs.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    pending = deque() if ordered else set()
+    try:
+        for item in items:
+            if len(pending) >= max_in_flight:
+                yield from _take(pending, ordered)
+            future = executor.submit(fn, item)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        while pending:
+            yield from _take(pending, ordered)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _take(pending, ordered: bool) -> Iterator:
+    if ordered:
+        future = pending.popleft()
+        yield future.result()
+        return
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.discard(future)
+    for future in done:
+        yield future.result()
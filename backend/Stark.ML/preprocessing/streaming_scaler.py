@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+
+class StreamingScaler:
+    """
+    Standardizes features with running statistics instead of refitting per
+    batch. Mean and variance are merged batch by batch (Welford / Chan et
+    al.), and the statistics freeze once warmup_samples rows have been seen
+    so every later batch is scaled identically.
+    """
+
+    def __init__(self, warmup_samples: Optional[int] = 10000, dtype=np.float32):
+        self.warmup_samples = warmup_samples
+        self.dtype = dtype
+        self.n_samples_seen_ = 0
+        self.mean_: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+        # (offset, inv_scale), replaced as one tuple so transform never mixes two states
+        self._params: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.frozen = False
+        self._lock = threading.Lock()
+
+    @property
+    def n_features(self) -> Optional[int]:
+        return None if self.mean_ is None else len(self.mean_)
+
+    @property
+    def var_(self) -> Optional[np.ndarray]:
+        if self.mean_ is None:
+            return None
+        return self._m2 / max(self.n_samples_seen_, 1)
+
+    def partial_fit(self, X: np.ndarray) -> 'StreamingScaler':
+        """Merge a batch into the running statistics; ignored once frozen"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.frozen or len(X) == 0:
+            return self
+
+        with self._lock:
+            self._check_width(X.shape[1], allow_init=True)
+            n_b = len(X)
+            mean_b = X.mean(axis=0)
+            m2_b = ((X - mean_b) ** 2).sum(axis=0)
+
+            if self.mean_ is None:
+                self.mean_ = mean_b
+                self._m2 = m2_b
+                self.n_samples_seen_ = n_b
+            else:
+                n_a = self.n_samples_seen_
+                n = n_a + n_b
+                delta = mean_b - self.mean_
+                self.mean_ = self.mean_ + delta * (n_b / n)
+                self._m2 = self._m2 + m2_b + delta ** 2 * (n_a * n_b / n)
+                self.n_samples_seen_ = n
+
+            self._refresh()
+            if self.warmup_samples is not None and self.n_samples_seen_ >= self.warmup_samples:
+                self.frozen = True
+        return self
+
+    def freeze(self):
+        self.frozen = True
+
+    def transform(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Scale X into out (allocated as a float32 array when not given). X may
+        itself be passed as out to scale in place.
+        """
+        params = self._params
+        if params is None:
+            raise RuntimeError("StreamingScaler has not seen any data yet")
+        offset, inv_scale = params
+        if X.shape[1] != len(offset):
+            raise ValueError(f"StreamingScaler was fitted on {len(offset)} features, got {X.shape[1]}")
+        if out is None:
+            out = np.empty(X.shape, dtype=self.dtype)
+        np.subtract(X, offset, out=out, casting='unsafe')
+        np.multiply(out, inv_scale, out=out)
+        return out
+
+    def partial_fit_transform(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        self.partial_fit(X)
+        return self.transform(X, out)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            'n_samples_seen': self.n_samples_seen_,
+            'mean': self.mean_,
+            'm2': self._m2,
+            'frozen': self.frozen,
+            'warmup_samples': self.warmup_samples
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> 'StreamingScaler':
+        with self._lock:
+            self.n_samples_seen_ = int(state['n_samples_seen'])
+            self.mean_ = None if state['mean'] is None else np.array(state['mean'], dtype=np.float64)
+            self._m2 = None if state['m2'] is None else np.array(state['m2'], dtype=np.float64)
+            self.frozen = bool(state['frozen'])
+            self.warmup_samples = state.get('warmup_samples', self.warmup_samples)
+            self._refresh()
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if self.mean_ is None:
+            self._params = None
+            return
+        scale = np.sqrt(self.var_)
+        scale[scale == 0] = 1.0
+        self._params = (self.mean_.astype(self.dtype), (1.0 / scale).astype(self.dtype))
+
+    def _check_width(self, width: int, allow_init: bool = False):
+        if self.mean_ is None and allow_init:
+            return
+        if width != self.n_features:
+            raise ValueError(
+                f"StreamingScaler was fitted on {self.n_features} features, got {width}"
+            )
@@ -0,0 +1,167 @@
+import math
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Sequence
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+NAT = np.iinfo(np.int64).min
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+TEMPORAL_FIELDS = (
+    'hour', 'minute', 'second', 'day_of_week', 'day', 'month', 'quarter', 'year',
+    'minute_norm',          # minute / 60
+    'second_norm',          # second / 3600
+    'is_business_hours',    # 9:00 <= t < 17:00
+    'is_weekend',
+    'hour_sin', 'hour_cos', 'day_of_week_sin', 'day_of_week_cos'
+)
+
+# Column layouts of the existing preprocessors
+DATA_PROCESSOR_FIELDS = ('hour', 'day_of_week', 'day', 'month', 'quarter', 'year', 'minute_norm')
+FEATURE_ENGINEER_FIELDS = ('hour', 'day_of_week', 'day', 'month', 'quarter', 'year', 'minute_norm',
+                           'second_norm', 'is_business_hours', 'is_weekend')
+REAL_TIME_FIELDS = ('hour', 'day_of_week', 'day', 'month', 'quarter')
+
+
+def parse_timestamps(values, unit: str = 's') -> np.ndarray:
+    """
+    Parse timestamps into naive UTC datetime64[ns].
+
+    Numeric values are epoch offsets in unit. Strings take numpy's ISO-8601
+    parser, falling back to pandas with an explicit ISO8601 format when
+    they carry UTC offsets; either way no per-element format inference
+    happens. Timezone-aware input is converted to UTC.
+    """
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(None).dt.as_unit('ns').to_numpy()
+    array = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+
+    if array.dtype.kind == 'M':
+        return array.astype('datetime64[ns]')
+    if array.dtype.kind in 'iuf':
+        return pd.to_datetime(array, unit=unit).as_unit('ns').to_numpy()
+
+    try:
+        with warnings.catch_warnings():
+            # numpy only warns on offsets such as 'Z'; treat them as a miss
+            warnings.simplefilter('error')
+            return array.astype('datetime64[ns]')
+    except (ValueError, TypeError, UserWarning, DeprecationWarning):
+        parsed = pd.to_datetime(array, format='ISO8601', utc=True)
+        return parsed.tz_convert(None).as_unit('ns').to_numpy()
+
+
+def temporal_features(timestamps, fields: Sequence[str] = FEATURE_ENGINEER_FIELDS,
+                      out: Optional[np.ndarray] = None, unit: str = 's') -> np.ndarray:
+    """
+    Calendar and cyclical features of each timestamp, one column per field,
+    written into out (allocated as float64 when not given; a column slice
+    of a larger buffer works). Everything is integer arithmetic on the
+    int64 nanosecond view; missing timestamps give NaN rows.
+    """
+    unknown = [field for field in fields if field not in TEMPORAL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown temporal fields: {unknown}")
+
+    ns = parse_timestamps(timestamps, unit).view(np.int64)
+    if out is None:
+        out = np.empty((len(ns), len(fields)))
+
+    missing = ns == NAT
+    days = ns // NS_PER_DAY
+    second_of_day = (ns - days * NS_PER_DAY) // NS_PER_SECOND
+    hour = second_of_day // 3600
+    day_of_week = (days + 3) % 7  # 1970-01-01 was a Thursday, Monday is 0
+    computed = {'hour': hour, 'day_of_week': day_of_week}
+
+    def field_value(field):
+        if field in computed:
+            return computed[field]
+        if field == 'minute':
+            value = second_of_day % 3600 // 60
+        elif field == 'second':
+            value = second_of_day % 60
+        elif field in ('day', 'month', 'year'):
+            year, month, day = _civil_from_days(days)
+            computed.update(year=year, month=month, day=day)
+            return computed[field]
+        elif field == 'quarter':
+            value = (field_value('month') - 1) // 3 + 1
+        elif field == 'minute_norm':
+            value = field_value('minute') / 60.0
+        elif field == 'second_norm':
+            value = field_value('second') / 3600.0
+        elif field == 'is_business_hours':
+            value = (hour >= 9) & (hour < 17)
+        elif field == 'is_weekend':
+            value = day_of_week >= 5
+        elif field.startswith('hour_'):
+            angle = second_of_day * (2 * np.pi / 86_400)
+            value = np.sin(angle) if field.endswith('sin') else np.cos(angle)
+        else:
+            angle = day_of_week * (2 * np.pi / 7)
+            value = np.sin(angle) if field.endswith('sin') else np.cos(angle)
+        computed[field] = value
+        return value
+
+    for j, field in enumerate(fields):
+        out[:, j] = field_value(field)
+    if missing.any():
+        out[missing] = np.nan
+    return out
+
+
+def epoch_seconds(timestamps, unit: str = 's') -> np.ndarray:
+    """UTC epoch seconds at microsecond resolution; missing timestamps give NaN"""
+    ns = parse_timestamps(timestamps, unit).view(np.int64)
+    seconds = (ns // 1000) / 1e6
+    seconds[ns == NAT] = np.nan
+    return seconds
+
+
+def _civil_from_days(days: np.ndarray):
+    """Proleptic Gregorian (year, month, day) from days since 1970-01-01"""
+    z = days + 719_468
+    era = z // 146_097
+    day_of_era = z - era * 146_097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36_524 - day_of_era // 146_096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = np.where(shifted_month < 10, shifted_month + 3, shifted_month - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Scalar counterpart of parse_timestamps for single events; None when missing"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    if isinstance(value, (int, float, np.number)):
+        return pd.Timestamp(value, unit='s')
+    stamp = pd.Timestamp(value)
+    return None if stamp is pd.NaT else stamp
+
+
+def to_utc(stamp: datetime) -> datetime:
+    """Naive UTC datetime; naive input is taken to be UTC already"""
+    if stamp.tzinfo is None:
+        return stamp
+    return stamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_epoch_seconds(stamp: datetime) -> float:
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return ((stamp - EPOCH) // MICROSECOND) / 1e6
@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+MANIFEST_FILE = 'manifest.json'
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+logger = logging.getLogger(__name__)
+
+
+def iter_file_chunks(path: str, chunk_rows: int = 100_000,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet or CSV file as DataFrames of at most chunk_rows rows.
+    Parquet is read batch by batch through pyarrow, so only one chunk is
+    ever decoded at a time.
+    """
+    if path.endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet training data requires the pyarrow package") from e
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns)
+
+
+def iter_table_chunks(connection, table: str = 'security_events', key: str = 'event_id',
+                      columns: Optional[List[str]] = None, chunk_rows: int = 50_000,
+                      rename: Optional[Mapping[str, str]] = None,
+                      paramstyle: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Page through a table by keyset (WHERE key > last ORDER BY key LIMIT n)
+    on a DB-API connection, e.g. psycopg2 against Postgres or sqlite3 as a
+    local stand-in. Unlike OFFSET paging every page is an index range scan,
+    so reading the tail of a large table costs the same as the head.
+    rename maps table columns to the names the feature engineer expects,
+    e.g. {'source_ip': 'ip_address'}.
+    """
+    for identifier in [table, key] + list(columns or []):
+        if not _IDENTIFIER.match(identifier):
+            raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    if paramstyle is None:
+        paramstyle = 'qmark' if type(connection).__module__.startswith('sqlite3') else 'format'
+    placeholder = '?' if paramstyle == 'qmark' else '%s'
+
+    select = ', '.join(columns) if columns else '*'
+    if columns and key not in columns:
+        select = f"{key}, {select}"
+    first_page = f"SELECT {select} FROM {table} ORDER BY {key} LIMIT {placeholder}"
+    next_page = f"SELECT {select} FROM {table} WHERE {key} > {placeholder} ORDER BY {key} LIMIT {placeholder}"
+
+    cursor = connection.cursor()
+    try:
+        last_key = None
+        while True:
+            if last_key is None:
+                cursor.execute(first_page, (chunk_rows,))
+            else:
+                cursor.execute(next_page, (last_key, chunk_rows))
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            names = [description[0] for description in cursor.description]
+            chunk = pd.DataFrame.from_records(rows, columns=names)
+            last_key = chunk[key].iloc[-1]
+            yield chunk.rename(columns=rename) if rename else chunk
+            if len(rows) < chunk_rows:
+                return
+    finally:
+        cursor.close()
+
+
+class FeatureShardStore:
+    """
+    Engineered training features on disk, one .npy shard per source chunk
+    plus a manifest. Shards are memory mapped when read, so a training run
+    only holds the batches it is currently feeding.
+
+        <directory>/manifest.json
+        <directory>/features-00000.npy, labels-00000.npy, ...
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+    @property
+    def width(self) -> int:
+        return self.manifest['width']
+
+    @property
+    def n_shards(self) -> int:
+        return len(self.manifest['shards'])
+
+    @property
+    def n_rows(self) -> int:
+        return sum(shard['rows'] for shard in self.manifest['shards'])
+
+    @classmethod
+    def build(cls, chunks: Iterable[pd.DataFrame], feature_engineer, directory: str,
+              label_column: str = 'is_threat', dtype=np.float32) -> 'FeatureShardStore':
+        """
+        Apply the feature engineer chunk by chunk and write each result as a
+        shard. An unfitted engineer is fitted on the first chunk. Rows
+        without a label are skipped.
+        """
+        tmp_dir = directory.rstrip(os.sep) + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        shards: List[Dict[str, Any]] = []
+        width = None
+
+        try:
+            for chunk in chunks:
+                chunk = chunk[chunk[label_column].notna()]
+                if chunk.empty:
+                    continue
+                labels = chunk[label_column].to_numpy(dtype=np.float32)
+                frame = chunk.drop(columns=[label_column])
+                if getattr(feature_engineer, 'categorical_schema', None) is None:
+                    logger.info("Fitting feature engineer on the first training chunk")
+                    feature_engineer.fit(frame)
+
+                features = np.asarray(feature_engineer.transform(frame), dtype=dtype)
+                if width is None:
+                    width = features.shape[1]
+                elif features.shape[1] != width:
+                    raise ValueError(f"Chunk {len(shards)} produced {features.shape[1]} features, expected {width}")
+
+                index = len(shards)
+                shard = {'features': f"features-{index:05d}.npy", 'labels': f"labels-{index:05d}.npy",
+                         'rows': len(features)}
+                np.save(os.path.join(tmp_dir, shard['features']), features)
+                np.save(os.path.join(tmp_dir, shard['labels']), labels)
+                shards.append(shard)
+
+            manifest = {'width': width or 0, 'dtype': np.dtype(dtype).name,
+                        'label_column': label_column, 'shards': shards}
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_dir, directory)
+        except Exception as e:
+            logger.error(f"Error building feature shards in {directory}: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        return cls(directory)
+
+    def arrays(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped (features, labels) of one shard"""
+        shard = self.manifest['shards'][index]
+        return (np.load(os.path.join(self.directory, shard['features']), mmap_mode='r'),
+                np.load(os.path.join(self.directory, shard['labels']), mmap_mode='r'))
+
+    def split(self, validation_fraction: float = 0.2) -> Tuple[List[int], List[int]]:
+        """Split shard indices so roughly validation_fraction of rows are held out, taking the last shards"""
+        target = self.n_rows * validation_fraction
+        validation, rows = [], 0
+        for index in range(self.n_shards - 1, 0, -1):
+            if rows >= target:
+                break
+            validation.insert(0, index)
+            rows += self.manifest['shards'][index]['rows']
+        train = [index for index in range(self.n_shards) if index not in validation]
+        return train, validation
+
+    def batches(self, batch_size: int = 32, shards: Optional[Sequence[int]] = None,
+                shuffle: bool = True, rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (features, labels) batches read from the memory maps. With shuffle,
+        shard order and row order within each shard are permuted; only one
+        shard's worth of indices is held in memory.
+        """
+        rng = rng or np.random.default_rng()
+        order = list(range(self.n_shards) if shards is None else shards)
+        if shuffle:
+            rng.shuffle(order)
+        for index in order:
+            features, labels = self.arrays(index)
+            rows = rng.permutation(len(features)) if shuffle else None
+            for start in range(0, len(features), batch_size):
+                if rows is None:
+                    selection = slice(start, start + batch_size)
+                else:
+                    # Sorted indices keep each gather sequential within the memory map
+                    selection = np.sort(rows[start:start + batch_size])
+                yield np.asarray(features[selection], dtype=np.float32), np.asarray(labels[selection])
+
+    def dataset(self, batch_size: int = 32, shards: Optional[Sequence[int]] = None, shuffle: bool = True,
+                as_sequences: bool = True, seed: Optional[int] = None):
+        """
+        tf.data pipeline over the shards with prefetching. as_sequences adds
+        a length-1 time axis, the (batch, timesteps, features) layout the
+        LSTM detectors take.
+        """
+        import tensorflow as tf
+
+        rng = np.random.default_rng(seed)
+
+        def generate():
+            for features, labels in self.batches(batch_size, shards, shuffle, rng):
+                yield (features[:, np.newaxis, :] if as_sequences else features), labels
+
+        feature_shape = (None, 1, self.width) if as_sequences else (None, self.width)
+        return tf.data.Dataset.from_generator(
+            generate,
+            output_signature=(
+                tf.TensorSpec(shape=feature_shape, dtype=tf.float32),
+                tf.TensorSpec(shape=(None,), dtype=tf.float32)
+            )
+        ).prefetch(tf.data.AUTOTUNE)
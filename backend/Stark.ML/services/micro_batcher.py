@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent callers and hands them to a batch
+    handler in one call, flushing when either the batch size cap or the
+    latency deadline of the oldest queued item is reached.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64, max_latency_ms: float = 5.0,
+                 name: str = 'micro-batcher'):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'items': 0, 'max_batch': 0}
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue a single item and return a future for its result"""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future))
+        return future
+
+    def close(self, wait: bool = True):
+        """Stop accepting items; queued items are still flushed"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._worker.join()
+
+    def get_stats(self) -> Dict[str, float]:
+        batches = self._stats['batches']
+        return {
+            'batches': batches,
+            'items': self._stats['items'],
+            'max_batch': self._stats['max_batch'],
+            'mean_batch_size': self._stats['items'] / batches if batches else 0.0
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Drain whatever is already queued even past the deadline
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[Any, Future]]):
+        # Skip callers that cancelled while waiting in the queue
+        live = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        self._stats['batches'] += 1
+        self._stats['items'] += len(live)
+        self._stats['max_batch'] = max(self._stats['max_batch'], len(live))
+
+        try:
+            results = self.handler([item for item, _ in live])
+            if len(results) != len(live):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(live)} items"
+                )
+        except Exception as e:
+            self.logger.error(f"Error processing micro-batch: {str(e)}")
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(live, results):
+            future.set_result(result)
@@ -1,52 +1,135 @@
+import time
+import asyncio
+import logging
 import numpy as np
 import tensorflow as tf
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 from ..models.deep_learning.hybrid_threat_model import HybridThreatModel
 from ..models.anomaly_detection.real_time_anomaly_detector import RealTimeAnomalyDetector
+from .micro_batcher import MicroBatcher
 
 class MLIntegrationService:
-    def __init__(self):
+    def __init__(self, max_batch_size: int = 64, max_batch_latency_ms: float = 5.0,
+                 request_timeout: Optional[float] = 30.0, serving_mode: bool = True,
+                 use_student: bool = True):
+        self.logger = logging.getLogger(__name__)
         self.threat_model = HybridThreatModel()
         self.anomaly_detector = RealTimeAnomalyDetector()
+        self._warm_start(use_student)
+        if serving_mode:
+            self.threat_model.enable_serving_mode()
         self.executor = ThreadPoolExecutor(max_workers=4)
         self.model_metrics = {}
+        self.request_timeout = request_timeout
+        self.batcher = MicroBatcher(
+            self._analyze_batch,
+            max_batch_size=max_batch_size,
+            max_latency_ms=max_batch_latency_ms,
+            name='ml-integration-batcher'
+        )
         
-    async def analyze_security_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_security_event(self, event_data: Dict[str, Any],
+                                     timeout: Optional[float] = None) -> Dict[str, Any]:
         """
-        Comprehensive security event analysis using multiple ML models
+        Comprehensive security event analysis using multiple ML models.
+        
+        Raises asyncio.TimeoutError if the analysis does not finish within
+        timeout (default request_timeout). On timeout or task cancellation the
+        queued event is cancelled and dropped from its micro-batch.
         """
-        # Run analyses in parallel
-        threat_future = self.executor.submit(
-            self.threat_model.analyze_threat, 
-            event_data
+        # Queue the event for the next micro-batch without blocking the loop
+        threat_result, anomaly_result = await asyncio.wait_for(
+            asyncio.wrap_future(self.batcher.submit(event_data)),
+            timeout if timeout is not None else self.request_timeout
         )
-        anomaly_future = self.executor.submit(
-            self.anomaly_detector.detect_anomalies,
-            [event_data]
-        )
-        
-        # Gather results
-        threat_result = threat_future.result()
-        anomaly_result = anomaly_future.result()
-        
+        return self._build_assessment(threat_result, anomaly_result)
+    
+    def analyze_security_event_sync(self, event_data: Dict[str, Any],
+                                    timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Blocking variant of analyze_security_event for scripts and batch jobs
+        """
+        return self.analyze_security_events_sync([event_data], timeout)[0]
+    
+    def analyze_security_events_sync(self, events: List[Dict[str, Any]],
+                                     timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of events from synchronous code, sharing micro-batches.
+        timeout (default request_timeout) bounds the whole list, not each event.
+        """
+        futures = [self.batcher.submit(event) for event in events]
+        timeout = timeout if timeout is not None else self.request_timeout
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            return [
+                self._build_assessment(*future.result(
+                    max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+                ))
+                for future in futures
+            ]
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def shutdown(self, wait: bool = True):
+        """Flush queued events and release worker threads"""
+        self.batcher.close(wait)
+        self.executor.shutdown(wait)
+        self.threat_model.embedding_cache.flush()
+    
+    def _warm_start(self, use_student: bool = True):
+        """
+        Restore the latest stored threat model weights, if any, and route the
+        deep model through its distilled student when one was distilled from
+        exactly that version. Otherwise the teacher serves alone.
+        """
+        if self.threat_model.model_store.latest_version(HybridThreatModel.MODEL_NAME):
+            self.threat_model.load()
+        if not use_student or not self.threat_model.has_stored_student():
+            return
+        student_version = self.threat_model.stored_student_version()
+        if student_version is None:
+            self.logger.warning(f"No stored student matches threat model version "
+                                f"{self.threat_model.teacher_version}; serving the teacher")
+            return
+        self.threat_model.load_student(student_version)
+    
+    def _build_assessment(self, threat_result: Dict, anomaly_result: Dict) -> Dict[str, Any]:
         # Combine analyses
         combined_risk = self._calculate_combined_risk(
             threat_result['threat_score'],
-            anomaly_result[0]['anomaly_score']
+            anomaly_result['anomaly_score']
         )
         
         return {
             'risk_assessment': {
                 'combined_risk_score': combined_risk,
                 'threat_analysis': threat_result,
-                'anomaly_analysis': anomaly_result[0],
-                'confidence': self._calculate_confidence(threat_result, anomaly_result[0])
+                'anomaly_analysis': anomaly_result,
+                'confidence': self._calculate_confidence(threat_result, anomaly_result)
             },
             'recommendations': self._generate_recommendations(combined_risk),
             'model_metrics': self.get_model_metrics()
         }
     
+    def _analyze_batch(self, events: List[Dict[str, Any]]) -> List[Tuple[Dict, Dict]]:
+        """
+        Run one batched pass per model over a micro-batch of events
+        """
+        # Run analyses in parallel
+        threat_future = self.executor.submit(
+            self.threat_model.analyze_threat_batch,
+            events
+        )
+        anomaly_future = self.executor.submit(
+            self.anomaly_detector.detect_anomalies,
+            events
+        )
+        
+        # Gather results
+        return list(zip(threat_future.result(), anomaly_future.result()))
+    
     def _calculate_combined_risk(self, threat_score: float, anomaly_score: float) -> float:
         """
         Calculate combined risk score using weighted average
@@ -63,6 +146,9 @@ class MLIntegrationService:
         Calculate overall confidence score
         """
         threat_confidence = threat_result.get('confidence', 0.5)
+        if not anomaly_result.get('scored', True):
+            # The detector was warming up or the event had no vector
+            return threat_confidence
         anomaly_confidence = anomaly_result.get('confidence', 0.5)
         
         return np.mean([threat_confidence, anomaly_confidence])
@@ -117,11 +203,12 @@ class MLIntegrationService:
         Retrain models with new data
         """
         try:
-            # Retrain threat model
-            threat_metrics = await self._retrain_threat_model(new_data)
-            
-            # Retrain anomaly detector
-            anomaly_metrics = await self._retrain_anomaly_detector(new_data)
+            # Retrain both models off the event loop
+            loop = asyncio.get_running_loop()
+            threat_metrics, anomaly_metrics = await asyncio.gather(
+                loop.run_in_executor(self.executor, self._retrain_threat_model, new_data),
+                loop.run_in_executor(self.executor, self._retrain_anomaly_detector, new_data)
+            )
             
             # Update metrics
             self.model_metrics.update(threat_metrics)
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from types import SimpleNamespace
+from unittest import mock
+from ..models.threat_detection import advanced_threat_analyzer
+from ..models.threat_detection.advanced_threat_analyzer import AdvancedThreatAnalyzer, THREAT_LEVELS
+
+class WordTokenizer:
+    """Stand-in for the BERT tokenizer: one id per word between [CLS] and [SEP]"""
+    
+    pad_token_id = 0
+    
+    def __call__(self, texts, truncation=True, max_length=512, return_attention_mask=True):
+        input_ids = [[101] + [sum(map(ord, word)) % 97 + 2 for word in text.split()] + [102] for text in texts]
+        return {'input_ids': [ids[:max_length] for ids in input_ids]}
+
+class MaskedBackend:
+    """Stand-in for the inference backend; each row depends only on its unpadded tokens"""
+    
+    def __init__(self):
+        self.widths = []
+        
+    def run(self, input_ids, attention_mask):
+        self.widths.append(input_ids.shape[1])
+        total = (input_ids * attention_mask).sum(axis=1).astype(np.float64)
+        count = attention_mask.sum(axis=1).astype(np.float64)
+        logits = np.stack([total / count, count, total % 7, -count, total % 3], axis=1) / 10
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32)
+
+class TestAdvancedThreatAnalyzer(unittest.TestCase):
+    def setUp(self):
+        encoder = SimpleNamespace(tokenizer=WordTokenizer(), model=None)
+        with mock.patch.object(advanced_threat_analyzer, 'get_bert_encoder', return_value=encoder):
+            self.analyzer = AdvancedThreatAnalyzer(backend='torch')
+        self.backend = MaskedBackend()
+        self.analyzer._backend = self.backend
+        rng = np.random.default_rng(11)
+        words = ['login', 'failed', 'admin', 'root', 'ssh', 'port', 'scan', 'upload', 'token', 'denied']
+        self.texts = [' '.join(rng.choice(words, size=n)) for n in rng.integers(1, 40, size=23)]
+        
+    def test_results_come_back_in_input_order(self):
+        results = self.analyzer.analyze_batch(self.texts, batch_size=4)
+        
+        self.assertEqual(len(results), len(self.texts))
+        expected = self.backend.run(*self._padded(self.texts))
+        for result, probs in zip(results, expected):
+            np.testing.assert_allclose(result['threat_probabilities'][0], probs, rtol=1e-6)
+            self.assertEqual(result['threat_level'], THREAT_LEVELS[int(np.argmax(probs))])
+            
+    def test_chunks_are_padded_to_their_longest_text(self):
+        self.analyzer.analyze_batch(self.texts, batch_size=4)
+        
+        lengths = sorted(len(text.split()) + 2 for text in self.texts)
+        self.assertEqual(self.backend.widths, [max(lengths[i:i + 4]) for i in range(0, len(lengths), 4)])
+        
+    def test_batch_matches_per_event_analysis(self):
+        batched = self.analyzer.analyze_batch(self.texts, batch_size=4)
+        singles = [self.analyzer.analyze(text) for text in self.texts]
+        
+        for batch_result, single in zip(batched, singles):
+            self.assertEqual(batch_result['threat_level'], single['threat_level'])
+            self.assertAlmostEqual(batch_result['confidence_score'], single['confidence_score'], places=6)
+            np.testing.assert_allclose(batch_result['threat_probabilities'], single['threat_probabilities'], rtol=1e-6)
+            self.assertEqual(batch_result['detailed_analysis']['recommendation'],
+                             single['detailed_analysis']['recommendation'])
+        
+    def test_empty_batch(self):
+        self.assertEqual(self.analyzer.analyze_batch([]), [])
+        self.assertEqual(self.backend.widths, [])
+        
+    def _padded(self, texts):
+        input_ids = WordTokenizer()(texts)['input_ids']
+        width = max(map(len, input_ids))
+        ids = np.zeros((len(texts), width), dtype=np.int64)
+        mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, row_ids in enumerate(input_ids):
+            ids[row, :len(row_ids)] = row_ids
+            mask[row, :len(row_ids)] = 1
+        return ids, mask
+
+if __name__ == '__main__':
+    unittest.main()
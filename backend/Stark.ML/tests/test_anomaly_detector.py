@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+import numpy as np
+from ..models.model_store import ModelStore
+from ..models.anomaly_detection.real_time_anomaly_detector import RealTimeAnomalyDetector
+
+class TestRealTimeAnomalyDetector(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.scale = rng.uniform(0.5, 5, size=128)
+        self.normal = rng.normal(10, 1, size=(3000, 128)) * self.scale
+        self.detector = RealTimeAnomalyDetector(warmup_events=500)
+        
+    def test_result_shape_and_warmup(self):
+        results = self.detector.detect_anomalies([np.random.rand(128) for _ in range(100)])
+        
+        self.assertEqual(len(results), 100)
+        self.assertTrue(all('is_anomaly' in r and 'anomaly_score' in r for r in results))
+        self.assertFalse(any(r['is_anomaly'] for r in results))
+        self.assertEqual(self.detector.n_seen, 100)
+        # Nothing was scored during warm-up, so nothing is reported with confidence
+        self.assertFalse(any(r['scored'] or r['confidence'] for r in results))
+        self.assertEqual(self.detector.score_event(np.random.rand(128))['confidence'], 0.0)
+        
+    def test_flags_outliers_not_inliers(self):
+        self.detector.detect_anomalies(list(self.normal[:2000]))
+        inliers = self.detector.detect_anomalies(list(self.normal[2000:]))
+        
+        outlier = self.normal[0].copy()
+        outlier[:20] += 8 * self.scale[:20]
+        result = self.detector.score_event(outlier)
+        
+        self.assertLess(np.mean([r['is_anomaly'] for r in inliers]), 0.01)
+        self.assertLess(np.mean([r['anomaly_score'] for r in inliers]), 0.5)
+        self.assertTrue(result['is_anomaly'])
+        self.assertGreater(result['anomaly_score'], 0.5)
+        
+    def test_anomalies_do_not_shift_baseline(self):
+        self.detector.partial_fit(self.normal[:1000])
+        mean = self.detector.mean.copy()
+        
+        self.detector.detect_anomalies(list(self.normal[:50] + 100 * self.scale))
+        np.testing.assert_array_equal(self.detector.mean, mean)
+        self.assertEqual(self.detector.get_stats()['anomalies'], 50)
+        
+    def test_batch_and_per_event_paths_agree(self):
+        per_event = RealTimeAnomalyDetector(warmup_events=500)
+        self.detector.partial_fit(self.normal[:1000])
+        per_event.partial_fit(self.normal[:1000])
+        
+        batched = self.detector.detect_anomalies(list(self.normal[1000:1064]))
+        scores, _ = per_event.score_batch(self.normal[1000:1064])
+        np.testing.assert_allclose([r['anomaly_score'] for r in batched], scores)
+        
+        singles = [per_event.score_event(row)['anomaly_score'] for row in self.normal[1064:1128]]
+        batched = [r['anomaly_score'] for r in self.detector.detect_anomalies(list(self.normal[1064:1128]))]
+        np.testing.assert_allclose(singles, batched, atol=0.05)
+        
+    def test_event_dicts(self):
+        self.detector.partial_fit(self.normal[:1000])
+        events = [
+            {'feature_vector': self.normal[1000]},
+            {'sequence_data': self.normal[1001:1011]},
+            {'description': 'no vector'}
+        ]
+        results = self.detector.detect_anomalies(events)
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[2]['anomaly_score'], 0.0)
+        self.assertEqual(self.detector.n_seen, 1002)
+        self.assertEqual([r['scored'] for r in results], [True, True, False])
+        self.assertEqual(results[2]['confidence'], 0.0)
+        with self.assertRaises(ValueError):
+            self.detector.detect_anomalies([np.zeros(64)])
+        
+    def test_save_load_round_trip(self):
+        self.detector.partial_fit(self.normal[:1000])
+        with tempfile.TemporaryDirectory() as root:
+            self.detector.model_store = ModelStore(root)
+            version = self.detector.save()
+            restored = RealTimeAnomalyDetector(model_store=ModelStore(root))
+            self.assertEqual(restored.load(), version)
+            
+        self.assertEqual(restored.warmup_events, 500)
+        self.assertEqual(restored.n_seen, 1000)
+        np.testing.assert_allclose(restored.score_batch(self.normal[1000:1100])[0],
+                                   self.detector.score_batch(self.normal[1000:1100])[0])
+
+if __name__ == '__main__':
+    unittest.main()
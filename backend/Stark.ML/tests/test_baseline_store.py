@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+import numpy as np
+from ..models.deep_learning.baseline_store import PatternBaselineStore
+
+class TestPatternBaselineStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rng = np.random.default_rng(5)
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def test_incremental_centroids(self):
+        store = PatternBaselineStore(self.tmp.name, width=4, alpha=0.5)
+        store.update_many(['alice', 'bob'], np.array([[1, 1, 1, 1], [0, 0, 0, 0]]))
+        store.update_many(['alice'], np.array([[3, 3, 3, 3]]))
+        store.update_many(['bob'], np.array([[4, 4, 4, 4]]), weights=np.array([2]))
+        
+        centroids, counts = store.get_many(['alice', 'bob', 'carol'])
+        np.testing.assert_allclose(centroids[0], 2.0)
+        np.testing.assert_allclose(centroids[1], 3.0)
+        self.assertTrue(np.isnan(centroids[2]).all())
+        np.testing.assert_array_equal(counts, [2, 3, 0])
+        self.assertEqual(centroids.dtype, np.float32)
+        self.assertNotIn('carol', store)
+        
+    def test_repeated_ids_apply_in_order(self):
+        store = PatternBaselineStore(width=2, alpha=0.5)
+        store.update_many(['u', 'u'], np.array([[2, 2], [4, 4]]))
+        
+        centroids, counts = store.get_many(['u'])
+        np.testing.assert_allclose(centroids[0], 3.0)
+        self.assertEqual(counts[0], 2)
+        
+    def test_evicted_baselines_come_back_from_cold_tier(self):
+        store = PatternBaselineStore(self.tmp.name, width=8, hot_capacity=10)
+        users = [f'user-{i}' for i in range(2500)]
+        patterns = self.rng.random((2500, 8)).astype(np.float32)
+        store.update_many(users, patterns)
+        
+        self.assertEqual(len(store), 2500)
+        self.assertGreater(store.get_stats()['evictions'], 0)
+        centroids, counts = store.get_many(users)
+        np.testing.assert_array_equal(centroids, patterns)
+        np.testing.assert_array_equal(counts, 1)
+        
+    def test_flush_and_reopen(self):
+        store = PatternBaselineStore(self.tmp.name, width=8, hot_capacity=100)
+        users = list(range(300))
+        patterns = self.rng.random((300, 8)).astype(np.float32)
+        store.update_many(users, patterns)
+        store.update_many(users[:50], patterns[:50] + 1)
+        store.flush()
+        
+        reopened = PatternBaselineStore(self.tmp.name, width=8, hot_capacity=100)
+        centroids, counts = reopened.get_many(users)
+        expected = patterns.copy()
+        expected[:50] += 0.1
+        np.testing.assert_allclose(centroids, expected, rtol=1e-6)
+        np.testing.assert_array_equal(counts[:50], 2)
+        self.assertEqual(reopened.get_stats()['cold_hits'], 300)
+        
+        with self.assertRaises(ValueError):
+            PatternBaselineStore(self.tmp.name, width=4).get_many([0])
+            
+    def test_evicted_baselines_survive_restart_without_flush(self):
+        store = PatternBaselineStore(self.tmp.name, width=8, hot_capacity=10)
+        users = [f'user-{i}' for i in range(3000)]
+        patterns = self.rng.random((3000, 8)).astype(np.float32)
+        store.update_many(users, patterns)
+        
+        # Only the 10 hot baselines were never written out
+        reopened = PatternBaselineStore(self.tmp.name, width=8, hot_capacity=10)
+        centroids, counts = reopened.get_many(users[:-10])
+        np.testing.assert_array_equal(centroids, patterns[:-10])
+        np.testing.assert_array_equal(counts, 1)
+        self.assertNotIn(users[-1], reopened)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from ..models.deep_learning import boosting
+from ..models.deep_learning.boosting import (
+    CompiledForest, boosting_summary, build_boosting_stage, compile_boosting_stage
+)
+
+class TestBoostingStage(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.X = rng.normal(size=(1500, 20)).astype(np.float32)
+        self.y = (self.X[:, :3].sum(axis=1) + rng.normal(scale=0.5, size=1500)) > 0
+        self.X[rng.random(self.X.shape) < 0.02] = np.nan
+        
+    def test_kinds(self):
+        self.assertIsInstance(build_boosting_stage('hist'), HistGradientBoostingClassifier)
+        self.assertIsInstance(build_boosting_stage('gradient_boosting'), GradientBoostingClassifier)
+        custom = GradientBoostingClassifier(n_estimators=5)
+        self.assertIs(build_boosting_stage(custom), custom)
+        with self.assertRaises(ValueError):
+            build_boosting_stage('xgboost')
+        
+        # The default is the original estimator, without early stopping
+        params = build_boosting_stage().get_params()
+        self.assertEqual((params['n_estimators'], params['n_iter_no_change']), (200, None))
+            
+    def test_early_stopping(self):
+        model = build_boosting_stage('hist', n_estimators=500, learning_rate=0.5).fit(self.X, self.y)
+        summary = boosting_summary(model)
+        self.assertEqual(summary['estimator'], 'HistGradientBoostingClassifier')
+        self.assertLess(summary['rounds'], 500)
+        
+    def test_compiled_forest_matches_predict_proba(self):
+        model = build_boosting_stage('hist', n_estimators=60).fit(self.X, self.y)
+        compiled = compile_boosting_stage(model, max_rows=16)
+        self.assertIsInstance(compiled, CompiledForest)
+        
+        for rows in (self.X[:1], self.X[:7], self.X[:16]):
+            np.testing.assert_allclose(compiled.predict_proba(rows), model.predict_proba(rows), rtol=1e-12, atol=1e-12)
+        # Larger batches are passed through to sklearn
+        np.testing.assert_array_equal(compiled.predict_proba(self.X[:100]), model.predict_proba(self.X[:100]))
+        
+    def test_compile_skips_other_estimators(self):
+        self.assertIsNone(compile_boosting_stage(build_boosting_stage('gradient_boosting', n_estimators=5)))
+        self.assertIsNone(compile_boosting_stage(build_boosting_stage('hist')))
+        
+    def test_compile_falls_back_on_unexpected_internals(self):
+        model = build_boosting_stage('hist', n_estimators=5).fit(self.X, self.y)
+        model._predictors = [[object()]]
+        with self.assertLogs(boosting.logger, level='WARNING'):
+            self.assertIsNone(compile_boosting_stage(model))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+import numpy as np
+from ..models.encoders.embedding_cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        # Room for exactly two 768-dim float32 vectors
+        self.cache = EmbeddingCache(max_memory_mb=2 * 768 * 4 / (1024 * 1024),
+                                    ttl_seconds=60, clock=lambda: self.now[0])
+        
+    def test_normalized_keys_hit(self):
+        vector = np.random.rand(768).astype(np.float32)
+        self.cache.put(self.cache.make_key('Failed login  for user X'), vector)
+        
+        cached = self.cache.get(self.cache.make_key(' failed LOGIN for user x'))
+        np.testing.assert_array_equal(cached, vector)
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+        
+    def test_lru_eviction_within_budget(self):
+        keys = [self.cache.make_key(f'event {i}') for i in range(3)]
+        for key in keys:
+            self.cache.put(key, np.zeros(768))
+            
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+        
+    def test_ttl_expiry(self):
+        key = self.cache.make_key('event')
+        self.cache.put(key, np.zeros(768))
+        self.now[0] = 61.0
+        
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.get_stats()['misses'], 1)
+        
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = EmbeddingCache(disk_path=path, disk_capacity=16)
+            key = cache.make_key('Port scan detected')
+            vector = np.random.rand(768).astype(np.float32)
+            cache.put(key, vector)
+            cache.flush()
+            
+            restarted = EmbeddingCache(disk_path=path, disk_capacity=16)
+            np.testing.assert_array_equal(restarted.get(key), vector)
+            self.assertEqual(restarted.get_stats()['disk_hits'], 1)
+            
+    def test_disk_tier_survives_restart_without_flush(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = EmbeddingCache(disk_path=path, disk_capacity=4)
+            vectors = np.random.rand(6, 768).astype(np.float32)
+            for i, vector in enumerate(vectors):
+                cache.put(cache.make_key(f'event {i}'), vector)
+            
+            restarted = EmbeddingCache(disk_path=path, disk_capacity=4)
+            self.assertIsNone(restarted.get(restarted.make_key('event 1')))
+            np.testing.assert_array_equal(restarted.get(restarted.make_key('event 5')), vectors[5])
+            # The ring continues where it stopped, overwriting the oldest entry
+            restarted.put(restarted.make_key('event 6'), vectors[0])
+            self.assertIsNone(restarted.get(restarted.make_key('event 2')))
+            self.assertIsNotNone(restarted.get(restarted.make_key('event 3')))
+            
+    def test_ttl_applies_to_disk_tier(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = EmbeddingCache(ttl_seconds=10, disk_path=path, disk_capacity=16, clock=lambda: self.now[0])
+            key = cache.make_key('Port scan detected')
+            cache.put(key, np.ones(768))
+            cache.clear()
+            self.now[0] = 5.0
+            self.assertIsNotNone(cache.get(key))
+            
+            self.now[0] = 100.0
+            self.assertIsNone(cache.get(key))
+            self.assertEqual(cache.get_stats()['disk_hits'], 1)
+            
+    def test_returned_vectors_are_read_only(self):
+        vector = np.zeros(768, dtype=np.float32)
+        key = self.cache.make_key('event')
+        self.cache.put(key, vector)
+        vector[0] = 1.0
+        
+        cached = self.cache.get(key)
+        self.assertEqual(cached[0], 0.0)
+        with self.assertRaises(ValueError):
+            cached[0] = 1.0
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from ..preprocessing.data_processor import DataProcessor
+
+def _events():
+    return [
+        {'user_id': 'alice', 'ip_address': '10.0.0.1', 'event_type': 'login', 'port': 22,
+         'bytes_sent': 512.0, 'timestamp': '2024-03-01T08:15:00'},
+        {'user_id': 'bob', 'ip_address': '10.0.0.2', 'event_type': 'file_access', 'port': 443,
+         'bytes_sent': 2048.0, 'timestamp': '2024-03-01T09:45:30'},
+        {'user_id': 'alice', 'ip_address': '10.0.0.1', 'event_type': 'logout', 'port': 22,
+         'bytes_sent': 128.0, 'timestamp': '2024-03-02T17:05:00'},
+        {'user_id': 'carol', 'ip_address': '10.0.0.3', 'event_type': 'port_scan', 'port': 8080,
+         'bytes_sent': 64.0, 'timestamp': '2024-06-30T23:59:59'},
+        {'user_id': 'bob', 'ip_address': '10.0.0.1', 'event_type': 'login', 'port': 3389,
+         'bytes_sent': 4096.0, 'timestamp': '2024-12-31T00:00:01'}
+    ]
+
+class TestFeaturePlan(unittest.TestCase):
+    def setUp(self):
+        self.processor = DataProcessor().fit(_events())
+        
+    def assert_parity(self, data):
+        fast = self.processor.process_security_data(data)
+        slow = self.processor.process_security_data(data, use_plan=False)
+        self.assertEqual(fast.shape, slow.shape)
+        np.testing.assert_allclose(fast, slow, rtol=1e-12, atol=1e-12, equal_nan=True)
+        
+    def test_single_event_parity(self):
+        for event in _events():
+            self.assert_parity(event)
+            
+    def test_batch_parity(self):
+        self.assert_parity(_events())
+        
+    def test_unseen_and_missing_values(self):
+        self.assert_parity({'user_id': 'mallory', 'event_type': 'exfiltration',
+                            'port': '8443', 'timestamp': '2025-01-05T03:30:00+02:00'})
+        self.assert_parity([{'ip_address': '10.0.0.9'}, {'user_id': 'alice', 'bytes_sent': None}])
+        
+    def test_missing_keys_get_imputed_behavioral_stats(self):
+        events = _events()
+        del events[1]['user_id']
+        events[3]['ip_address'] = None
+        self.assert_parity(events)
+        for use_plan in (True, False):
+            behavioral = self.processor.process_security_data(events, use_plan=use_plan)[:, -9:]
+            self.assertTrue(np.isfinite(behavioral).all())
+            np.testing.assert_array_equal(behavioral[1, :4], 0.0)
+            np.testing.assert_array_equal(behavioral[3, 4:], 0.0)
+        
+    def test_fixed_width(self):
+        width = self.processor.process_security_data(_events()).shape[1]
+        self.assertEqual(self.processor.process_security_data({'port': 22}).shape, (1, width))
+        
+    def test_plan_requires_fit(self):
+        with self.assertRaises(RuntimeError):
+            DataProcessor().feature_plan
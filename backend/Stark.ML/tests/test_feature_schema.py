@@ -0,0 +1,37 @@
+import pickle
+import unittest
+import numpy as np
+from ..preprocessing.feature_schema import CategoricalSchema
+
+class TestCategoricalSchema(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            {'event_type': 'login', 'protocol': 'tcp', 'port': 22},
+            {'event_type': 'logout', 'protocol': 'udp', 'port': 53},
+            {'event_type': 'login', 'protocol': 'tcp', 'port': 443}
+        ]
+        self.schema = CategoricalSchema().fit(self.events)
+        
+    def test_fixed_width_one_hot(self):
+        self.assertEqual(self.schema.columns, ['event_type', 'protocol'])
+        self.assertEqual(self.schema.width, 6)
+        
+        # A batch with a single, partly unseen category keeps the same width
+        encoded = self.schema.encode_one_hot([{'event_type': 'port_scan', 'protocol': 'tcp'}])
+        self.assertEqual(encoded.shape, (1, 6))
+        np.testing.assert_array_equal(encoded[0], [1, 0, 0, 0, 1, 0])
+        
+    def test_codes_and_oov(self):
+        codes = self.schema.encode_codes([{'event_type': 'logout'}, {'event_type': 'unknown'}])
+        
+        np.testing.assert_array_equal(codes[:, 0], [2, 0])
+        np.testing.assert_array_equal(codes[:, 1], [0, 0])
+        
+    def test_hash_buckets_are_stable(self):
+        schema = CategoricalSchema(['event_type'], hash_buckets=8).fit(self.events)
+        first = schema.encode_codes([{'event_type': 'port_scan'}])
+        restored = pickle.loads(pickle.dumps(schema))
+        
+        np.testing.assert_array_equal(first, restored.encode_codes([{'event_type': 'port_scan'}]))
+        self.assertLess(first[0, 0], 8)
+        self.assertEqual(restored.encode_codes([{'event_type': 'login'}])[0, 0], 8)
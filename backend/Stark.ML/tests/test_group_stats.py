@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..preprocessing.group_stats import GroupStats
+from ..preprocessing.feature_engineering import SecurityFeatureEngineer
+
+class TestGroupStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 500
+        values = rng.normal(size=n)
+        values[rng.random(n) < 0.1] = np.nan
+        keys = rng.choice(['a', 'b', 'c', 'd', None], size=n).astype(object)
+        self.df = pd.DataFrame({'key': keys, 'value': values})
+        self.groups = GroupStats(self.df['key'])
+        
+    def expected(self, how):
+        return self.df.groupby('key')['value'].transform(how).to_numpy(dtype=np.float64)
+        
+    def test_matches_pandas_transform(self):
+        described = self.groups.describe(self.df['value'], quantiles=(0.25, 0.75))
+        for j, how in enumerate(['mean', 'std', 'min', 'max']):
+            np.testing.assert_allclose(self.groups.broadcast(described[:, j]), self.expected(how), equal_nan=True)
+        for j, q in enumerate((0.25, 0.75)):
+            np.testing.assert_allclose(self.groups.broadcast(described[:, 4 + j]),
+                                       self.expected(lambda x: x.quantile(q)), equal_nan=True)
+        np.testing.assert_allclose(self.groups.broadcast(self.groups.count(self.df['value'])),
+                                   self.expected('count'), equal_nan=True)
+        np.testing.assert_allclose(self.groups.broadcast(self.groups.nunique(self.df['value'].round(1))),
+                                   self.df.assign(value=self.df['value'].round(1))
+                                   .groupby('key')['value'].transform('nunique').to_numpy(dtype=np.float64),
+                                   equal_nan=True)
+        
+    def test_feature_engineer_rows_align_with_events(self):
+        events = pd.DataFrame({
+            'user_id': ['alice', 'bob', 'alice', 'carol'],
+            'ip_address': ['10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.1'],
+            'event_type': ['login', 'login', 'logout', 'port_scan'],
+            'protocol': ['tcp', 'tcp', 'udp', 'tcp'],
+            'port': [22, 443, 53, 8080],
+            'timestamp': ['2024-01-01T09:00:00', '2024-01-01T10:00:00',
+                          '2024-01-01T11:00:00', '2024-01-06T12:00:00']
+        })
+        engineer = SecurityFeatureEngineer().fit(events)
+        features = engineer.transform(events)
+        
+        self.assertEqual(features.shape[0], len(events))
+        # Statistical block is the last 6 columns: port stats of each event's user
+        np.testing.assert_allclose(features[0, -6:], [37.5, np.std([22, 53], ddof=1), 22, 53, 29.75, 45.25])
+        np.testing.assert_array_equal(features[0, -6:], features[2, -6:])
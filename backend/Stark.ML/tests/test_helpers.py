@@ -0,0 +1,68 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from ..utils import helpers
+from ..utils.helpers import (
+    INVALID_TIMESTAMP, MISSING_EVENT_TYPE, MISSING_SOURCE_IP, MISSING_TIMESTAMP, VALID,
+    canonical_encoding, generate_event_id, generate_event_ids, validate_input_batch, validate_input_data
+)
+
+class TestHelpers(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            {'timestamp': '2024-01-01T10:00:00Z', 'source_ip': '10.0.0.1', 'event_type': 'login'},
+            {'source_ip': '10.0.0.1'},
+            {'timestamp': '2024-01-01T10:00:00', 'event_type': 'login'},
+            {'timestamp': 'yesterday', 'source_ip': '10.0.0.1', 'event_type': 'login'},
+            {'timestamp': 1704103200, 'source_ip': '10.0.0.1', 'event_type': 'login'},
+            {'timestamp': '2024-01-01T12:00:00+02:00', 'source_ip': '10.0.0.2'}
+        ]
+        
+    def test_batch_validation_matches_single_event(self):
+        mask, reasons = validate_input_batch(self.events)
+        
+        np.testing.assert_array_equal(reasons, [VALID, MISSING_TIMESTAMP, MISSING_SOURCE_IP,
+                                                INVALID_TIMESTAMP, INVALID_TIMESTAMP, MISSING_EVENT_TYPE])
+        np.testing.assert_array_equal(mask, [validate_input_data(event) for event in self.events])
+        
+    def test_column_batch_validation(self):
+        frame = pd.DataFrame(self.events)
+        _, reasons = validate_input_batch(frame)
+        np.testing.assert_array_equal(reasons, validate_input_batch(self.events)[1])
+        _, reasons = validate_input_batch({'timestamp': ['2024-01-01T00:00:00'], 'event_type': ['login']})
+        np.testing.assert_array_equal(reasons, [MISSING_SOURCE_IP])
+        
+    def test_event_ids(self):
+        event = {'b': 1, 'a': [1.5, 'x'], 'nested': {'z': None, 'y': True}}
+        self.assertEqual(generate_event_id(event), generate_event_id(dict(reversed(list(event.items())))))
+        self.assertEqual(len(generate_event_id(event)), 32)
+        self.assertEqual(generate_event_ids([event, {'b': 2}])[0], generate_event_id(event))
+        self.assertNotEqual(generate_event_id(event), generate_event_id({**event, 'b': 2}))
+        self.assertEqual(generate_event_id(event, algorithm='sha256'),
+                         helpers.hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest())
+        
+    def _without_orjson(self, fn):
+        original, helpers.orjson = helpers.orjson, None
+        try:
+            return fn()
+        finally:
+            helpers.orjson = original
+            
+    def test_canonical_encoding_without_orjson(self):
+        events = [
+            {'b': 1, 'a': [1.5, 'é'], 'c': datetime(2024, 1, 1)},
+            {'big': 1e16, 'small': 1e-7, 'tiny': 2.5e-5, 'nan': float('nan'), 'inf': float('-inf')},
+            {'n': np.int64(7), 'f': np.float32(0.1), 'v': np.array([1.5, 2.0]), 1: 'non-str key'},
+            {'big_int': 2 ** 70, 'neg': -2 ** 65}
+        ]
+        for event in events:
+            self.assertEqual(self._without_orjson(lambda: canonical_encoding(event)), canonical_encoding(event))
+            self.assertEqual(self._without_orjson(lambda: generate_event_id(event)), generate_event_id(event))
+            
+    def test_canonical_encoding_format(self):
+        encoded = canonical_encoding({'e': [1e16, 1e-7, 2.5e-5, 0.1], 'nan': float('nan'), 'int': 2 ** 70})
+        self.assertEqual(encoded, b'{"e":[1e16,1e-7,0.000025,0.1],"int":1180591620717411303424,"nan":null}')
+        prediction = helpers.format_prediction_output({'threat_score': 0.9, 'details': {'bytes': 2 ** 80}})
+        self.assertEqual(len(prediction['prediction_id']), 32)
@@ -0,0 +1,66 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+import torch
+import torch.nn as nn
+from types import SimpleNamespace
+from ..models.inference.backends import (
+    ThreatClassifierGraph, compare_backends, create_backend, export_onnx, weights_digest
+)
+
+class TinyEncoder(nn.Module):
+    """Stand-in for BERT: embedding, masked mean and a dense pooler"""
+    
+    def __init__(self, vocab_size=100, hidden=32):
+        super().__init__()
+        self.embedding = nn.Embedding(vocab_size, hidden)
+        self.pooler = nn.Linear(hidden, hidden)
+        
+    def forward(self, input_ids, attention_mask):
+        hidden = self.embedding(input_ids)
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return SimpleNamespace(pooler_output=torch.tanh(self.pooler(pooled)), last_hidden_state=hidden)
+
+class TestInferenceBackends(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.graph = ThreatClassifierGraph(TinyEncoder(), nn.Linear(32, 4))
+        rng = np.random.default_rng(0)
+        self.input_ids = rng.integers(0, 100, size=(16, 12))
+        self.attention_mask = np.ones_like(self.input_ids)
+        
+    def test_torch_int8_parity(self):
+        reference = create_backend('torch', self.graph, 'tiny')
+        candidate = create_backend('torch-int8', self.graph, 'tiny')
+        report = compare_backends(reference, candidate, self.input_ids, self.attention_mask, repeats=2)
+        
+        self.assertEqual(candidate.name, 'torch-int8')
+        self.assertLess(report['max_abs_diff'], 0.05)
+        self.assertGreaterEqual(report['argmax_agreement'], 0.9)
+        self.assertGreater(report['speedup'], 0)
+        
+    def test_export_path_keyed_by_weights(self):
+        digest = weights_digest(self.graph)
+        self.assertEqual(digest, weights_digest(self.graph))
+        with torch.no_grad():
+            self.graph.classifier.bias.add_(1.0)
+        self.assertNotEqual(digest, weights_digest(self.graph))
+        
+    def test_existing_export_is_reused(self):
+        with tempfile.TemporaryDirectory() as path:
+            export_path = os.path.join(path, 'tiny.onnx')
+            with open(export_path, 'wb') as f:
+                f.write(b'existing')
+            self.assertEqual(export_onnx(self.graph, export_path), export_path)
+            with open(export_path, 'rb') as f:
+                self.assertEqual(f.read(), b'existing')
+            self.assertEqual(os.listdir(path), ['tiny.onnx'])
+        
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend('tensorrt', self.graph, 'tiny')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import threading
+from ..services.micro_batcher import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.release = threading.Event()
+        
+        def handler(items):
+            self.release.wait(1.0)
+            self.batches.append(list(items))
+            return [item * 2 for item in items]
+        
+        self.batcher = MicroBatcher(handler, max_batch_size=8, max_latency_ms=50)
+        
+    def tearDown(self):
+        self.release.set()
+        self.batcher.close()
+        
+    def test_results_routed_to_callers(self):
+        futures = [self.batcher.submit(i) for i in range(20)]
+        self.release.set()
+        
+        # Each caller gets the result for its own item
+        self.assertEqual([f.result(timeout=5) for f in futures], [i * 2 for i in range(20)])
+        self.assertTrue(all(len(batch) <= 8 for batch in self.batches))
+        self.assertLess(len(self.batches), 20)
+        
+    def test_handler_error_propagates(self):
+        batcher = MicroBatcher(lambda items: 1 / 0, max_batch_size=4, max_latency_ms=1)
+        future = batcher.submit('event')
+        
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+        batcher.close()
+        
+    def test_submit_after_close(self):
+        self.release.set()
+        self.batcher.close()
+        
+        with self.assertRaises(RuntimeError):
+            self.batcher.submit(1)
@@ -0,0 +1,61 @@
+import os
+import gzip
+import json
+import unittest
+import tempfile
+import numpy as np
+from ..utils.ndjson_reader import NDJSONReader, parse_block
+from ..preprocessing.data_processor import DataProcessor
+
+def _lines(n: int):
+    return [json.dumps({'user_id': f"user_{i % 7}", 'ip_address': f"10.0.0.{i % 5}", 'event_type': 'login',
+                        'port': 22 + i, 'timestamp': f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}"})
+            for i in range(n)]
+
+class TestNDJSONReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        lines = _lines(500)
+        lines[10] = '{"user_id": "broken"'
+        lines[20] = '[1, 2, 3]'
+        self.content = ('\n'.join(lines) + '\n\n').encode()
+        self.path = os.path.join(self.tmp.name, 'events.ndjson')
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def test_blocks_split_on_line_boundaries(self):
+        reader = NDJSONReader(self.path, block_size=1000)
+        batches = list(reader)
+        
+        self.assertGreater(len(batches), 10)
+        self.assertEqual(reader.get_stats(), {'rows': 498, 'malformed': 2, 'offset': len(self.content)})
+        ports = [port for batch in batches for port in batch.columns['port']]
+        self.assertEqual(ports, [22 + i for i in range(500) if i not in (10, 20)])
+        
+    def test_resume_from_offset_and_gzip(self):
+        gz_path = self.path + '.gz'
+        with gzip.open(gz_path, 'wb') as f:
+            f.write(self.content)
+        first = next(iter(NDJSONReader(gz_path, block_size=4096)))
+        
+        resumed = NDJSONReader(gz_path, block_size=4096, start_offset=first.offset)
+        rows = sum(len(batch) for batch in resumed)
+        self.assertEqual(first.rows + rows, 498)
+        plain = NDJSONReader(self.path, block_size=4096, start_offset=first.offset)
+        self.assertEqual(sum(len(batch) for batch in plain), rows)
+        
+    def test_process_pool_matches_in_process(self):
+        serial = [batch.columns for batch in NDJSONReader(self.path, block_size=2000)]
+        parallel = [batch.columns for batch in NDJSONReader(self.path, block_size=2000, workers=2)]
+        self.assertEqual(serial, parallel)
+        
+    def test_batches_feed_data_processor(self):
+        batch = next(iter(NDJSONReader(self.path, columns=['user_id', 'ip_address', 'event_type', 'port', 'timestamp'])))
+        processor = DataProcessor().fit(batch.records())
+        np.testing.assert_allclose(processor.process_security_data(batch.to_frame()),
+                                   processor.process_security_data(batch.records()))
+        columns, rows, malformed = parse_block(b'{"a": 1}\n\nnot json\n{"b": 2}')
+        self.assertEqual((columns, rows, malformed), ({'a': [1, None], 'b': [None, 2]}, 2, 1))
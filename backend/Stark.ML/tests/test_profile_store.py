@@ -0,0 +1,77 @@
+import unittest
+import tempfile
+import numpy as np
+from ..models.model_store import ModelStore
+from ..preprocessing.profile_store import ProfileStore, ProfileTable
+from ..preprocessing.data_processor import DataProcessor
+
+def _event(user, ip, event_type, port, second):
+    return {'user_id': user, 'ip_address': ip, 'event_type': event_type, 'port': port,
+            'timestamp': f'2024-01-01T00:00:{second:02d}'}
+
+class TestProfileStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileStore(alpha=0.5, model_store=ModelStore(self.tmp.name))
+        self.names = self.store.feature_names()
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def feature(self, row, name):
+        return row[self.names.index(name)]
+        
+    def test_running_profile_spans_batches(self):
+        self.store.update_many([_event('alice', '10.0.0.1', 'login', 22, 0),
+                                _event('alice', '10.0.0.1', 'file_access', 22, 10)])
+        row = self.store.update(_event('alice', '10.0.0.1', 'login', 443, 30))
+        
+        self.assertEqual(self.feature(row, 'user_id__count'), 3)
+        self.assertAlmostEqual(self.feature(row, 'user_id__distinct_event_type'), 2, delta=0.1)
+        self.assertAlmostEqual(self.feature(row, 'ip_address__distinct_port'), 2, delta=0.1)
+        self.assertEqual(self.feature(row, 'user_id__last_seen') - self.feature(row, 'user_id__first_seen'), 30)
+        # Gaps 10 then 20 with alpha 0.5
+        self.assertAlmostEqual(self.feature(row, 'user_id__gap_mean'), 15.0)
+        self.assertAlmostEqual(self.feature(row, 'ip_address__port_mean'), 232.5)
+        np.testing.assert_array_equal(self.store.lookup({'user_id': 'alice', 'ip_address': '10.0.0.1'}), row)
+        
+    def test_hyperloglog_estimate(self):
+        table = ProfileTable('port', hll_precision=10)
+        for port in range(5000):
+            table.update('scanner', None, port)
+        out = np.empty(table.width)
+        self.assertAlmostEqual(table.features('scanner', out)[3] / 5000, 1.0, delta=0.1)
+        
+    def test_eviction_and_snapshot(self):
+        store = ProfileStore(max_entities=2, model_store=self.store.model_store)
+        for i, user in enumerate(['a', 'b', 'c']):
+            store.update(_event(user, '10.0.0.1', 'login', 22, i))
+        self.assertNotIn('a', store.tables['user_id'])
+        self.assertEqual(store.tables['user_id'].evictions, 1)
+        
+        store.save(version='v1')
+        restored = ProfileStore(model_store=self.store.model_store)
+        self.assertEqual(restored.load(), 'v1')
+        np.testing.assert_array_equal(restored.lookup({'user_id': 'c', 'ip_address': '10.0.0.1'}),
+                                      store.lookup({'user_id': 'c', 'ip_address': '10.0.0.1'}))
+        
+    def test_data_processor_uses_profiles(self):
+        processor = DataProcessor(profile_store=self.store).fit([
+            _event('alice', '10.0.0.1', 'login', 22, 0), _event('bob', '10.0.0.2', 'login', 443, 5)
+        ])
+        fast = processor.process_security_data(_event('alice', '10.0.0.1', 'logout', 22, 9))
+        self.assertEqual(fast.shape[1], processor.process_security_data(
+            _event('bob', '10.0.0.2', 'logout', 22, 9), use_plan=False).shape[1])
+        # fit() works on a copy, so only the processed event is counted
+        self.assertEqual(self.store.lookup({'user_id': 'alice'})[0], 1)
+        
+    def test_processed_profiles_are_finite(self):
+        events = [_event(f'u{i}', f'10.0.1.{i}', 'login', 22, i) for i in range(50)]
+        processor = DataProcessor(profile_store=self.store).fit(events)
+        self.assertEqual(len(self.store.tables['user_id']), 0)
+        
+        later = [_event('u1', '10.0.1.1', 'file_access', 443, 50 + i) for i in range(3)]
+        self.assertTrue(np.isfinite(processor.process_security_data(later)).all())
+        self.assertTrue(np.isfinite(processor.process_security_data(later, use_plan=False)).all())
+        anonymous = _event(None, None, 'login', 22, 59)
+        self.assertTrue(np.isfinite(processor.process_security_data(anonymous)[:, -self.store.width:]).all())
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from ..preprocessing.sequence_builder import SequenceAssembler
+
+class TestSequenceAssembler(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.assembler = SequenceAssembler(window=4, feature_dim=3, max_entities=2,
+                                           idle_ttl_seconds=10, clock=lambda: self.now[0])
+        
+    def test_window_is_latest_events_in_order(self):
+        for i in range(6):
+            window = self.assembler.push('alice', np.full(3, i, dtype=np.float32))
+            
+        np.testing.assert_array_equal(window[:, 0], [2, 3, 4, 5])
+        self.assertEqual(self.assembler.event_count('alice'), 6)
+        
+    def test_short_history_is_zero_padded(self):
+        window = self.assembler.push('alice', np.ones(3))
+        
+        np.testing.assert_array_equal(window[:, 0], [0, 0, 0, 1])
+        
+    def test_batch_windows_matches_views(self):
+        for i in range(5):
+            self.assembler.push('alice', np.full(3, i))
+            self.assembler.push('bob', np.full(3, 10 + i))
+            
+        batch = self.assembler.batch_windows(['bob', 'unknown', 'alice'])
+        self.assertEqual(batch.shape, (3, 4, 3))
+        np.testing.assert_array_equal(batch[0], self.assembler.get_window('bob'))
+        np.testing.assert_array_equal(batch[1], np.zeros((4, 3)))
+        np.testing.assert_array_equal(batch[2], self.assembler.get_window('alice'))
+        
+    def test_lru_and_idle_eviction(self):
+        self.assembler.push('alice', np.ones(3))
+        self.assembler.push('bob', np.ones(3))
+        self.assembler.push('alice', np.ones(3))
+        self.assembler.push('carol', np.ones(3))
+        
+        # bob was least recently seen when the table filled up
+        self.assertNotIn('bob', self.assembler)
+        np.testing.assert_array_equal(self.assembler.get_window('carol')[:, 0], [0, 0, 0, 1])
+        
+        self.now[0] = 20.0
+        self.assembler.push('carol', np.ones(3))
+        self.assertEqual(self.assembler.evict_idle(), 1)
+        self.assertEqual(len(self.assembler), 1)
@@ -0,0 +1,49 @@
+import time
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..preprocessing.stream_pipeline import map_bounded
+
+class TestMapBounded(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        
+    def tearDown(self):
+        self.executor.shutdown()
+        
+    def test_ordered_results_fully_drained(self):
+        def slow_for_early(i):
+            time.sleep(0.01 if i < 3 else 0)
+            return i * i
+        
+        results = list(map_bounded(self.executor, slow_for_early, range(20), max_in_flight=4))
+        self.assertEqual(results, [i * i for i in range(20)])
+        
+    def test_unordered_yields_everything(self):
+        results = list(map_bounded(self.executor, lambda i: i, range(50), max_in_flight=3, ordered=False))
+        self.assertEqual(sorted(results), list(range(50)))
+        
+    def test_source_is_throttled(self):
+        pulled = []
+        release = threading.Event()
+        
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+        
+        stream = map_bounded(self.executor, lambda i: release.wait(5) and i, source(), max_in_flight=2)
+        release.set()
+        self.assertEqual(next(stream), 0)
+        # Only the in-flight window plus the next item have been pulled
+        self.assertLessEqual(len(pulled), 3)
+        stream.close()
+        
+    def test_errors_propagate(self):
+        def fail_on_five(i):
+            if i == 5:
+                raise ValueError('bad batch')
+            return i
+        
+        with self.assertRaises(ValueError):
+            list(map_bounded(self.executor, fail_on_five, range(10), max_in_flight=2))
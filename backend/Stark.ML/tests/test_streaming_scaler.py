@@ -0,0 +1,43 @@
+import pickle
+import unittest
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from ..preprocessing.streaming_scaler import StreamingScaler
+
+class TestStreamingScaler(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.batches = [rng.normal(5, 3, size=(32, 6)) for _ in range(10)]
+        
+    def test_running_stats_match_full_fit(self):
+        scaler = StreamingScaler(warmup_samples=None)
+        for batch in self.batches:
+            scaler.partial_fit(batch)
+            
+        reference = StandardScaler().fit(np.concatenate(self.batches))
+        np.testing.assert_allclose(scaler.mean_, reference.mean_)
+        np.testing.assert_allclose(scaler.var_, reference.var_)
+        np.testing.assert_allclose(scaler.transform(self.batches[0]), reference.transform(self.batches[0]),
+                                   rtol=1e-5, atol=1e-5)
+        
+    def test_freezes_after_warmup(self):
+        scaler = StreamingScaler(warmup_samples=64)
+        for batch in self.batches[:2]:
+            scaler.partial_fit(batch)
+        mean = scaler.mean_.copy()
+        
+        scaler.partial_fit(self.batches[2] + 100)
+        self.assertTrue(scaler.frozen)
+        np.testing.assert_array_equal(scaler.mean_, mean)
+        
+    def test_in_place_transform_and_state_round_trip(self):
+        scaler = StreamingScaler().partial_fit(self.batches[0])
+        restored = StreamingScaler().set_state(pickle.loads(pickle.dumps(scaler.get_state())))
+        
+        buffer = self.batches[1].astype(np.float32)
+        result = restored.transform(buffer, out=buffer)
+        self.assertIs(result, buffer)
+        np.testing.assert_allclose(result, scaler.transform(self.batches[1]), rtol=1e-5, atol=1e-5)
+        
+        with self.assertRaises(ValueError):
+            scaler.transform(np.zeros((2, 3)))
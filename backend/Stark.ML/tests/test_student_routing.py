@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+from ..models.inference.student_routing import StudentRouter, compare_to_teacher
+
+class TestStudentRouter(unittest.TestCase):
+    def setUp(self):
+        self.data = np.linspace(0, 1, 11, dtype=np.float32).reshape(-1, 1, 1)
+        self.teacher_calls = []
+        
+    def _student(self, data):
+        return data.reshape(len(data), 1)
+    
+    def _teacher(self, data):
+        self.teacher_calls.append(len(data))
+        return np.full((len(data), 1), 0.99)
+    
+    def test_escalates_only_borderline_rows(self):
+        router = StudentRouter(self._student, self._teacher, threshold=0.5, escalation_margin=0.15)
+        scores = router(self.data)
+        
+        self.assertEqual(scores.shape, (11, 1))
+        np.testing.assert_allclose(scores[[4, 5, 6], 0], 0.99)
+        np.testing.assert_allclose(scores[:4, 0], self.data[:4, 0, 0])
+        self.assertEqual(self.teacher_calls, [3])
+        self.assertEqual(router.get_stats()['escalated'], 3)
+        self.assertAlmostEqual(router.get_stats()['escalation_rate'], 3 / 11)
+        
+    def test_zero_margin_serves_student_only(self):
+        router = StudentRouter(self._student, self._teacher, escalation_margin=0)
+        np.testing.assert_allclose(router(self.data)[:, 0], self.data[:, 0, 0])
+        self.assertEqual(self.teacher_calls, [])
+
+class TestCompareToTeacher(unittest.TestCase):
+    def test_report(self):
+        rng = np.random.default_rng(0)
+        teacher = rng.random(1000)
+        student = np.clip(teacher + rng.normal(0, 0.05, 1000), 0, 1)
+        labels = (teacher + rng.normal(0, 0.2, 1000)) > 0.5
+        
+        report = compare_to_teacher(teacher, student, 0.5, labels=labels, escalation_margin=0.1)
+        self.assertGreater(report['agreement'], 0.9)
+        self.assertGreater(report['auc_vs_teacher'], 0.95)
+        self.assertLess(abs(report['teacher_auc'] - report['student_auc']), 0.05)
+        self.assertGreaterEqual(report['routed_agreement'], report['agreement'])
+        self.assertGreater(report['escalation_rate'], 0)
+        
+    def test_single_class_auc_is_none(self):
+        report = compare_to_teacher(np.full(10, 0.9), np.full(10, 0.8))
+        self.assertIsNone(report['auc_vs_teacher'])
+        self.assertEqual(report['agreement'], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
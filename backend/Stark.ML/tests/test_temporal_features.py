@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..preprocessing.temporal_features import (
+    TEMPORAL_FIELDS, FEATURE_ENGINEER_FIELDS, parse_timestamps, temporal_features
+)
+
+class TestTemporalFeatures(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        seconds = rng.integers(-2_208_988_800, 4_102_444_800, 2000)  # 1900 to 2100
+        self.stamps = pd.Series(pd.to_datetime(seconds, unit='s'))
+        
+    def test_matches_pandas_calendar_fields(self):
+        strings = self.stamps.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        features = temporal_features(strings, TEMPORAL_FIELDS)
+        dt = self.stamps.dt
+        expected = {
+            'hour': dt.hour, 'minute': dt.minute, 'second': dt.second, 'day_of_week': dt.dayofweek,
+            'day': dt.day, 'month': dt.month, 'quarter': dt.quarter, 'year': dt.year,
+            'is_business_hours': (dt.hour >= 9) & (dt.hour < 17), 'is_weekend': dt.dayofweek >= 5
+        }
+        for field, values in expected.items():
+            np.testing.assert_array_equal(features[:, TEMPORAL_FIELDS.index(field)], values.to_numpy(dtype=float),
+                                          err_msg=field)
+        np.testing.assert_allclose(np.hypot(features[:, -4], features[:, -3]), 1.0)
+        
+    def test_epoch_offsets_and_missing(self):
+        values = ['2024-03-01T10:30:00Z', '2024-03-01T12:30:00+02:00', None]
+        parsed = parse_timestamps(values)
+        self.assertEqual(parsed[0], parsed[1])
+        self.assertTrue(np.isnat(parsed[2]))
+        np.testing.assert_array_equal(parse_timestamps(np.array([1709289000])), parsed[:1])
+        
+        features = temporal_features(values, ('hour', 'is_weekend'))
+        np.testing.assert_array_equal(features[:2], [[10, 0], [10, 0]])
+        self.assertTrue(np.isnan(features[2]).all())
+        
+    def test_writes_into_buffer_slice(self):
+        buffer = np.zeros((len(self.stamps), len(FEATURE_ENGINEER_FIELDS) + 2))
+        result = temporal_features(self.stamps, FEATURE_ENGINEER_FIELDS, out=buffer[:, 1:-1])
+        self.assertTrue(np.shares_memory(result, buffer))
+        np.testing.assert_array_equal(buffer[:, 0], 0)
+        np.testing.assert_array_equal(buffer[:, 1], self.stamps.dt.hour)
+        with self.assertRaises(ValueError):
+            temporal_features(self.stamps, ('fortnight',))
@@ -0,0 +1,77 @@
+import pickle
+import unittest
+import numpy as np
+from ..models.deep_learning.threat_cascade import (
+    FULL_STAGE, TABULAR_STAGE, TEXT_STAGE, ThreatCascade, tabular_features
+)
+
+class TestThreatCascade(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 600
+        self.labels = rng.random(n) < 0.3
+        # Half the events are separable from the sequence alone, the rest only through their text
+        easy = rng.random(n) < 0.5
+        sequences = rng.normal(size=(n, 4, 8)).astype(np.float32)
+        sequences[easy & self.labels, :, 0] += 4
+        self.text = rng.normal(size=(n, 6)).astype(np.float32)
+        self.text[~easy & self.labels, 0] += 4
+        self.tabular = tabular_features(sequences)
+        self.text_requests = []
+        
+    def _text_fn(self, indices):
+        self.text_requests.append(list(indices))
+        return self.text[indices]
+    
+    def test_tabular_features(self):
+        sequences = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+        features = tabular_features(sequences)
+        self.assertEqual(features.shape, (2, 12))
+        np.testing.assert_allclose(features[:, 8:], sequences[:, -1])
+        
+    def test_early_exit_and_stage_accounting(self):
+        cascade = ThreatCascade().fit(self.tabular, self.text, self.labels)
+        result = cascade.run(self.tabular, self._text_fn)
+        
+        stages = np.array([stage or FULL_STAGE for stage in result.stages])
+        decided = ~np.isnan(result.scores)
+        self.assertTrue((stages[decided] != FULL_STAGE).all())
+        self.assertGreater((stages == TABULAR_STAGE).sum(), 0)
+        self.assertGreater((stages == TEXT_STAGE).sum(), 0)
+        np.testing.assert_array_equal(result.pending, np.flatnonzero(~decided))
+        
+        # Text is only encoded once, for events the tabular stage left open
+        self.assertEqual(len(self.text_requests), 1)
+        self.assertFalse(set(self.text_requests[0]) & set(np.flatnonzero(stages == TABULAR_STAGE)))
+        
+        early = decided
+        accuracy = np.mean((result.scores[early] > 0.5) == self.labels[early])
+        self.assertGreater(accuracy, 0.95)
+        
+        cascade.record_full(len(result.pending))
+        stats = cascade.get_stats()
+        self.assertEqual(stats['events'], len(self.labels))
+        self.assertEqual(stats['decided_by'][FULL_STAGE], len(result.pending))
+        
+    def test_band_settings(self):
+        cascade = ThreatCascade().fit(self.tabular, self.text, self.labels)
+        
+        cascade.set_bands({TABULAR_STAGE: (0.0, 1.0), TEXT_STAGE: None})
+        self.assertEqual(len(cascade.run(self.tabular, self._text_fn).pending), len(self.labels))
+        self.assertEqual(self.text_requests, [])
+        
+        cascade.set_bands({TABULAR_STAGE: (0.5, 0.5)})
+        self.assertEqual(len(cascade.run(self.tabular, self._text_fn).pending), 0)
+        
+    def test_requires_fit_and_state_round_trip(self):
+        with self.assertRaises(RuntimeError):
+            ThreatCascade().run(self.tabular, self._text_fn)
+        
+        cascade = ThreatCascade({TEXT_STAGE: (0.2, 0.8)}).fit(self.tabular, self.text, self.labels)
+        restored = ThreatCascade().set_state(pickle.loads(pickle.dumps(cascade.get_state())))
+        self.assertEqual(restored.bands[TEXT_STAGE], (0.2, 0.8))
+        np.testing.assert_array_equal(restored.run(self.tabular, self._text_fn).scores,
+                                      cascade.run(self.tabular, self._text_fn).scores)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 from ..models.deep_learning.hybrid_threat_model import HybridThreatModel
+from ..models.deep_learning.neural_threat_detector import ThreatAnalysisBatch
 from ..models.anomaly_detection.real_time_anomaly_detector import RealTimeAnomalyDetector
 
 class TestThreatDetection(unittest.TestCase):
@@ -35,4 +36,14 @@ class TestThreatDetection(unittest.TestCase):
         # Assertions
         self.assertIsInstance(results, list)
         self.assertTrue(all('is_anomaly' in r for r in results))
-        self.assertTrue(all('anomaly_score' in r for r in results))
\ No newline at end of file
+        self.assertTrue(all('anomaly_score' in r for r in results))
+        
+    def test_float32_risk_levels_match_float64_thresholds(self):
+        scores = np.array([0.8, 0.6, 0.4, 0.2], dtype=np.float32)
+        analysis = ThreatAnalysisBatch(scores, np.abs(scores - 0.5) * 2, 0.85)
+        
+        # float32(0.8) is just above 0.8, as the per-row '>' comparisons saw it
+        expected = ['CRITICAL' if s > 0.8 else 'HIGH' if s > 0.6 else 'MEDIUM' if s > 0.4 else 'LOW'
+                    for s in scores.tolist()]
+        self.assertEqual(analysis.risk_level.tolist(), expected)
+        self.assertEqual(expected[0], 'CRITICAL')
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+from ..preprocessing.feature_engineering import SecurityFeatureEngineer
+from ..preprocessing.training_data import FeatureShardStore, iter_file_chunks, iter_table_chunks
+
+def _frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'event_id': [f"{i:08d}" for i in range(n)],
+        'user_id': rng.choice(['alice', 'bob', 'carol'], n),
+        'ip_address': rng.choice(['10.0.0.1', '10.0.0.2'], n),
+        'event_type': rng.choice(['login', 'logout', 'port_scan'], n),
+        'port': rng.integers(1, 1024, n),
+        'is_threat': rng.integers(0, 2, n)
+    })
+
+class TestTrainingData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frame = _frame(250)
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def test_keyset_paging_reads_every_row_once(self):
+        connection = sqlite3.connect(':memory:')
+        self.frame.to_sql('security_events', connection, index=False)
+        chunks = list(iter_table_chunks(connection, chunk_rows=100, columns=['user_id', 'is_threat'],
+                                        rename={'user_id': 'user'}))
+        
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        combined = pd.concat(chunks)
+        self.assertEqual(list(combined['event_id']), list(self.frame['event_id']))
+        self.assertIn('user', combined.columns)
+        with self.assertRaises(ValueError):
+            next(iter_table_chunks(connection, table='security_events; DROP TABLE x'))
+        
+    def test_build_shards_from_csv_chunks(self):
+        path = os.path.join(self.tmp.name, 'events.csv')
+        self.frame.to_csv(path, index=False)
+        directory = os.path.join(self.tmp.name, 'features')
+        store = FeatureShardStore.build(iter_file_chunks(path, chunk_rows=60),
+                                        SecurityFeatureEngineer(), directory)
+        
+        self.assertEqual(store.n_shards, 5)
+        self.assertEqual(store.n_rows, 250)
+        train, validation = store.split(0.2)
+        self.assertEqual(train + validation, list(range(5)))
+        self.assertTrue(validation)
+        
+        labels = np.concatenate([y for _, y in store.batches(batch_size=32, shuffle=True)])
+        np.testing.assert_array_equal(np.sort(labels), np.sort(self.frame['is_threat'].to_numpy(np.float32)))
+        features, _ = store.arrays(0)
+        self.assertEqual(features.shape, (60, store.width))
+        self.assertIsInstance(features, np.memmap)
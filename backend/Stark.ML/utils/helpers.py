@@ -1,12 +1,30 @@
 import numpy as np
-from typing import Dict, List, Union, Any
+import pandas as pd
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union, Any
 import json
+import math
 import logging
-from datetime import datetime
+from datetime import date, datetime, time
 import hashlib
 
+try:
+    import orjson
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+REQUIRED_FIELDS = ('timestamp', 'source_ip', 'event_type')
+
+# Reason codes returned by validate_input_batch; a row reports the first failing check
+VALID = 0
+MISSING_TIMESTAMP = 1
+MISSING_SOURCE_IP = 2
+MISSING_EVENT_TYPE = 3
+INVALID_TIMESTAMP = 4
+REASON_NAMES = ('valid', 'missing_timestamp', 'missing_source_ip', 'missing_event_type', 'invalid_timestamp')
+
 def calculate_threat_score(predictions: np.ndarray, weights: np.ndarray = None) -> float:
     """Calculate weighted threat score from multiple predictions"""
     if weights is None:
@@ -35,16 +53,177 @@ def validate_input_data(data: Dict[str, Any]) -> bool:
         logger.error(f"Error validating input data: {str(e)}")
         return False
 
-def generate_event_id(event_data: Dict[str, Any]) -> str:
-    """Generate unique event ID based on event data"""
-    event_string = json.dumps(event_data, sort_keys=True)
-    return hashlib.sha256(event_string.encode()).hexdigest()
+def validate_input_batch(batch: Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence], pd.DataFrame]
+                         ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Validate a list of events or a column batch in one pass without
+    per-row logging. Returns a boolean mask of valid rows and an int8
+    reason code per row (see REASON_NAMES). In a column batch a None/NaN
+    value counts as missing.
+    """
+    if not isinstance(batch, (pd.DataFrame, Mapping)):
+        reasons = np.fromiter(map(_event_reason, batch), dtype=np.int8, count=len(batch))
+        return reasons == VALID, reasons
+
+    n = len(batch) if isinstance(batch, pd.DataFrame) else (len(next(iter(batch.values()))) if batch else 0)
+    reasons = np.zeros(n, dtype=np.int8)
+    # Assign in reverse so the first missing field in REQUIRED_FIELDS wins
+    for code, field in reversed(list(enumerate(REQUIRED_FIELDS, start=MISSING_TIMESTAMP))):
+        if field not in batch:
+            reasons[:] = code
+        else:
+            reasons[pd.isna(np.asarray(batch[field], dtype=object))] = code
+
+    if 'timestamp' in batch:
+        parsed = np.fromiter(map(_is_iso_timestamp, batch['timestamp']), dtype=bool, count=n)
+        reasons[(reasons == VALID) & ~parsed] = INVALID_TIMESTAMP
+    return reasons == VALID, reasons
+
+def _event_reason(event: Mapping[str, Any]) -> int:
+    if 'timestamp' not in event:
+        return MISSING_TIMESTAMP
+    if 'source_ip' not in event:
+        return MISSING_SOURCE_IP
+    if 'event_type' not in event:
+        return MISSING_EVENT_TYPE
+    return VALID if _is_iso_timestamp(event['timestamp']) else INVALID_TIMESTAMP
+
+def _is_iso_timestamp(value: Any, _parse=datetime.fromisoformat) -> bool:
+    # Timestamps must be ISO-8601 strings, checked by the C parser
+    if value.__class__ is not str:
+        return False
+    try:
+        _parse(value.replace('Z', '+00:00'))
+        return True
+    except ValueError:
+        return False
+
+def canonical_encoding(data: Any) -> bytes:
+    """
+    Compact JSON with sorted keys, in orjson's output format: shortest
+    round-trip floats with bare exponents (1e16, 1e-7) and null for NaN and
+    infinities. numpy values are encoded as the equivalent Python values and
+    anything else non-JSON as its str(). Uses orjson when installed; the
+    pure Python encoder produces the same bytes, and also covers what orjson
+    rejects, such as integers beyond 64 bits.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=_ORJSON_OPTIONS, default=_canonical_default)
+        except TypeError:
+            pass
+    parts: List[str] = []
+    _encode_canonical(data, parts)
+    return ''.join(parts).encode('utf-8', 'surrogatepass')
+
+def _canonical_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def _format_float(value: float) -> str:
+    if math.isnan(value) or math.isinf(value):
+        return 'null'
+    text = float.__repr__(value)
+    if 'e' not in text:
+        return text
+    mantissa, exponent = text.split('e')
+    exponent = int(exponent)
+    if exponent == -5:
+        # orjson writes 1e-5 <= |x| < 1e-4 positionally, where repr switches to an exponent
+        sign = '-' if mantissa.startswith('-') else ''
+        return f"{sign}0.0000{mantissa.lstrip('-').replace('.', '')}"
+    return f"{mantissa}e{exponent}"
+
+def _format_key(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+    if key is None:
+        return 'null'
+    if isinstance(key, (bool, np.bool_)):
+        return 'true' if key else 'false'
+    if isinstance(key, (float, np.floating)):
+        return _format_float(float(key))
+    if isinstance(key, (datetime, date, time)):
+        return key.isoformat()
+    return str(key)
+
+def _encode_canonical(value: Any, parts: List[str]):
+    if isinstance(value, str):
+        parts.append(json.dumps(value, ensure_ascii=False))
+    elif value is None:
+        parts.append('null')
+    elif value is True or value is False:
+        parts.append('true' if value else 'false')
+    elif isinstance(value, int):
+        parts.append(int.__repr__(value))
+    elif isinstance(value, float):
+        parts.append(_format_float(value))
+    elif isinstance(value, dict):
+        items = sorted(((_format_key(k), v) for k, v in value.items()), key=lambda item: item[0])
+        parts.append('{')
+        for i, (k, v) in enumerate(items):
+            if i:
+                parts.append(',')
+            parts.append(json.dumps(k, ensure_ascii=False))
+            parts.append(':')
+            _encode_canonical(v, parts)
+        parts.append('}')
+    elif isinstance(value, (list, tuple)):
+        parts.append('[')
+        for i, v in enumerate(value):
+            if i:
+                parts.append(',')
+            _encode_canonical(v, parts)
+        parts.append(']')
+    else:
+        _encode_canonical(_canonical_default(value), parts)
+
+def _hash_blake2b(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _hash_xxh3(payload: bytes) -> str:
+    try:
+        import xxhash
+    except ImportError as e:
+        raise ImportError("The xxh3 event id algorithm requires the xxhash package") from e
+    return xxhash.xxh3_128_hexdigest(payload)
+
+ID_ALGORITHMS = {
+    'blake2b': _hash_blake2b,
+    'xxh3': _hash_xxh3
+}
+
+def generate_event_id(event_data: Dict[str, Any], algorithm: str = 'blake2b') -> str:
+    """
+    Generate unique event ID based on event data: a 128-bit digest of the
+    canonical encoding. algorithm='sha256' reproduces the original IDs
+    (SHA-256 over json.dumps with sorted keys).
+    """
+    if algorithm == 'sha256':
+        event_string = json.dumps(event_data, sort_keys=True)
+        return hashlib.sha256(event_string.encode()).hexdigest()
+    return ID_ALGORITHMS[algorithm](canonical_encoding(event_data))
+
+def generate_event_ids(events: Sequence[Dict[str, Any]], algorithm: str = 'blake2b') -> List[str]:
+    """Batch form of generate_event_id"""
+    if algorithm == 'sha256':
+        return [generate_event_id(event, 'sha256') for event in events]
+    digest = ID_ALGORITHMS[algorithm]
+    encode = canonical_encoding
+    return [digest(encode(event)) for event in events]
 
-def format_prediction_output(predictions: Dict[str, Any]) -> Dict[str, Any]:
-    """Format prediction output for API response"""
+def format_prediction_output(predictions: Dict[str, Any], prediction_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Format prediction output for API response. Pass prediction_id when the
+    caller already has one (e.g. the event id) to skip hashing the
+    prediction.
+    """
     try:
         return {
-            'prediction_id': generate_event_id(predictions),
+            'prediction_id': prediction_id or generate_event_id(predictions),
             'timestamp': datetime.utcnow().isoformat() + 'Z',
             'threat_score': float(predictions.get('threat_score', 0)),
             'confidence': float(predictions.get('confidence', 0)),
@@ -90,9 +269,12 @@ def generate_recommendations(predictions: Dict[str, Any]) -> List[str]:
     return recommendations
 
 def parse_log_entry(log_entry: str) -> Dict[str, Any]:
-    """Parse log entry into structured data"""
+    """
+    Parse log entry into structured data. For whole log files use
+    utils.ndjson_reader, which parses blocks of lines in parallel.
+    """
     try:
-        return json.loads(log_entry)
+        return orjson.loads(log_entry) if orjson is not None else json.loads(log_entry)
     except json.JSONDecodeError:
         logger.error("Invalid log entry format")
         return {}